@@ -3,6 +3,7 @@ from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
 from db import db
+from utils.schema_utils import add_missing_columns
 from routes import coaches_bp, clients_bp, workouts_bp, exercises_bp, load_weights_bp
 
 load_dotenv()
@@ -25,6 +26,45 @@ def create_app():
 
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # City -> time zone resolution: offline gazetteer first, Nominatim only as an opt-out fallback
+    app.config['CITY_GAZETTEER_PATH'] = os.getenv('CITY_GAZETTEER_PATH')
+    app.config['TIMEZONE_GEOCODER_FALLBACK'] = os.getenv('TIMEZONE_GEOCODER_FALLBACK', '1').lower() not in ('0', 'false', 'no')
+    # seconds an unresolvable city is remembered before Nominatim is asked again
+    app.config['TIMEZONE_MISS_TTL'] = float(os.getenv('TIMEZONE_MISS_TTL', '3600'))
+    # 'sync' resolves on the request; 'deferred' commits with a pending time zone for the background worker
+    app.config['TIMEZONE_RESOLUTION_MODE'] = os.getenv('TIMEZONE_RESOLUTION_MODE', 'sync').lower()
+    app.config['TIMEZONE_WORKER_INTERVAL'] = float(os.getenv('TIMEZONE_WORKER_INTERVAL', '5'))
+    app.config['TIMEZONE_WORKER_BATCH_SIZE'] = int(os.getenv('TIMEZONE_WORKER_BATCH_SIZE', '100'))
+
+    # token_required identity cache (seconds; 0 disables). Hits are re-checked against coaches.auth_version,
+    # so updates/deletes in other workers take effect immediately; the TTL only bounds memory churn.
+    app.config['AUTH_CACHE_TTL'] = float(os.getenv('AUTH_CACHE_TTL', '30'))
+    app.config['AUTH_CACHE_SIZE'] = int(os.getenv('AUTH_CACHE_SIZE', '1024'))
+
+    # PBKDF2 hashing/verification pool (0 workers = inline, the default). Full queue -> 503 instead of piling up.
+    # The pool and its queue bound are per web process: they only help with threaded/async workers
+    # (gunicorn gthread/gevent), where one process serves several logins at once. With sync workers
+    # the bound can never be reached and the pool only adds processes and an IPC round trip.
+    app.config['PASSWORD_POOL_WORKERS'] = int(os.getenv('PASSWORD_POOL_WORKERS', '0'))
+    app.config['PASSWORD_POOL_MAX_QUEUE'] = int(os.getenv('PASSWORD_POOL_MAX_QUEUE', '8'))
+    app.config['PASSWORD_POOL_TIMEOUT'] = float(os.getenv('PASSWORD_POOL_TIMEOUT', '10'))
+    # Changing this re-hashes each coach's password on their next successful login
+    app.config['PASSWORD_HASH_ITERATIONS'] = int(os.getenv('PASSWORD_HASH_ITERATIONS', '0')) or None
+
+    # Exercise catalog snapshot: seconds between catalog_version checks (0 = every request)
+    app.config['CATALOG_CHECK_INTERVAL'] = float(os.getenv('CATALOG_CHECK_INTERVAL', '5'))
+    # 'auto' | 'json_subquery' | 'per_collection' (see utils/exercise_catalog.LOAD_STRATEGIES)
+    app.config['CATALOG_LOAD_STRATEGY'] = os.getenv('CATALOG_LOAD_STRATEGY', 'auto').lower()
+
+    # /clients/<id>/progression results kept per process (LRU entries, validated by clients.workouts_version)
+    app.config['PROGRESSION_CACHE_SIZE'] = int(os.getenv('PROGRESSION_CACHE_SIZE', '256'))
+
+    # Local-day bucketing for calendar endpoints: 'auto' | 'sql' | 'offsets' (see utils/workout_calendar.py)
+    app.config['CALENDAR_BUCKETING'] = os.getenv('CALENDAR_BUCKETING', 'auto').lower()
+
+    # In-process cache stats under /debug/*-cache and /debug/catalog (off unless set or in debug mode)
+    app.config['DEBUG_ENDPOINTS'] = os.getenv('DEBUG_ENDPOINTS', '0').lower() in ('1', 'true', 'yes')
+
     # --- CORS setup (supports multiple comma-separated origins) ---
     origins_env = os.getenv("CORS_ORIGINS", "*")
     if origins_env == "*":
@@ -37,6 +77,16 @@ def create_app():
     db.init_app(app)
     with app.app_context():
         db.create_all()
+        added = add_missing_columns(db.engine, db.metadata)
+        if ('clients', 'workouts_count') in added:
+            from models import Client
+            Client.recount_workouts()
+        from models import CatalogVersion
+        CatalogVersion.ensure()
+        from utils.workout_rollups import ensure as ensure_workout_rollups
+        ensure_workout_rollups()
+        from utils.client_search import install as install_client_search
+        app.config['CLIENT_SEARCH_BACKEND'] = install_client_search(db.engine)
 
     # blueprints
     app.register_blueprint(coaches_bp, url_prefix='/coaches')
@@ -45,6 +95,54 @@ def create_app():
     app.register_blueprint(exercises_bp, url_prefix='/exercises')
     app.register_blueprint(load_weights_bp, url_prefix='/load-weights')
 
+    @app.cli.command('resolve-timezones')
+    def resolve_timezones_command():
+        """Resolve every client/coach whose time zone is still pending."""
+        from utils.timezone_worker import resolve_pending
+        total = 0
+        while True:
+            n = resolve_pending()
+            if not n:
+                break
+            total += n
+        print(f"Resolved {total} pending cities")
+
+    @app.cli.command('backfill-locations')
+    def backfill_locations_command():
+        """Derive coordinates + H3 cells from city for coaches/clients that have none."""
+        from models import Client, Coach
+        from utils.geo_utils import backfill_locations
+        print(f"Updated {backfill_locations((Coach, Client))} rows")
+
+    @app.cli.command('repair-workout-counts')
+    def repair_workout_counts_command():
+        """Recompute clients.workouts_count from the workouts table."""
+        from models import Client
+        print(f"Recounted {Client.recount_workouts()} clients")
+
+    @app.cli.command('rebuild-workout-rollups')
+    def rebuild_workout_rollups_command():
+        """Recompute workout_rollups (per client/exercise/day and week) from the workouts table."""
+        from utils.workout_rollups import rebuild
+        n = rebuild()
+        db.session.commit()
+        print(f"Wrote {n} rollup rows")
+
+    @app.cli.command('rebuild-client-search')
+    def rebuild_client_search_command():
+        """Refill the SQLite FTS5 client search table from clients."""
+        from utils.client_search import rebuild
+        with db.engine.begin() as conn:
+            print(f"Indexed {rebuild(conn)} clients")
+
+    @app.cli.command('bump-catalog')
+    def bump_catalog_command():
+        """Mark the exercise catalog as changed after editing it outside the ORM (SQL, seed scripts)."""
+        from models import CatalogVersion
+        db.session.execute(CatalogVersion.bump_statement())
+        db.session.commit()
+        print(f"Catalog version is now {CatalogVersion.current()}")
+
     @app.get('/health')
     def health():
         return {"status": "ok"}
@@ -64,6 +162,22 @@ def create_app():
             return {"ok": True, "db_url": url}
         except Exception as e:
             return {"ok": False, "error": str(e)}, 500
+
+    if app.debug or app.config['DEBUG_ENDPOINTS']:
+        @app.get('/debug/auth-cache')
+        def debug_auth_cache():
+            from utils.auth_cache import auth_cache
+            return auth_cache.stats()
+
+        @app.get('/debug/progression-cache')
+        def debug_progression_cache():
+            from utils.progression import progression_cache
+            return progression_cache.stats()
+
+        @app.get('/debug/catalog')
+        def debug_catalog():
+            from utils.exercise_catalog import exercise_catalog
+            return exercise_catalog.stats()
     # -------------------------------
 
     return app
@@ -0,0 +1,202 @@
+# benchmarks/_common.py
+"""
+Shared helpers for the benchmark scripts. Each script builds the app against a
+throwaway SQLite file (or BENCH_DATABASE_URL) so it never touches real data.
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def make_app():
+    url = os.getenv('BENCH_DATABASE_URL')
+    if not url:
+        fd, path = tempfile.mkstemp(prefix='proft-bench-', suffix='.db')
+        os.close(fd)
+        url = f'sqlite:///{path}'
+    os.environ['DATABASE_URL'] = url
+    from app import create_app
+    return create_app()
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def timed(fn, repeat):
+    """Run fn `repeat` times; return per-call latencies in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return samples
+
+
+def report(label, samples):
+    print(f"{label:<40} n={len(samples):<7} p50={percentile(samples, 50):9.3f} ms  "
+          f"p99={percentile(samples, 99):9.3f} ms")
+
+
+@contextmanager
+def count_queries(engine):
+    """Yields a one-item list holding the number of SQL statements executed inside the block."""
+    from sqlalchemy import event
+
+    counter = [0]
+
+    def _inc(*_args, **_kwargs):
+        counter[0] += 1
+
+    event.listen(engine, 'before_cursor_execute', _inc)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', _inc)
+
+
+def seed_coaches(db, n, clients_per_coach=0, batch=20000):
+    """Bulk-insert coaches with ids 1..n (and optionally clients) with Core executemany."""
+    coaches, clients = [], []
+    for i in range(1, n + 1):
+        coaches.append({
+            'id': i, 'name': 'c', 'last_name': 'c', 'profile_name': f'p{i}', 'phone': '0',
+            'email': f'c{i}@bench', 'password_hash': 'x', 'city': 'Madrid',
+            'time_zone': 'Europe/Madrid', 'training_speciality': 's',
+        })
+        for j in range(clients_per_coach):
+            clients.append({
+                'name': 'k', 'last_name': 'k', 'profile_name': f'k{i}-{j}', 'phone': '0',
+                'email': f'k{i}-{j}@bench', 'city': 'Madrid', 'time_zone': 'Europe/Madrid',
+                'coach_id': i,
+            })
+        if len(coaches) >= batch or len(clients) >= batch:
+            _flush(db, coaches, clients)
+            coaches, clients = [], []
+    _flush(db, coaches, clients)
+    db.session.commit()
+
+
+def _flush(db, coaches, clients):
+    from models import Client, Coach
+
+    if coaches:
+        db.session.execute(Coach.__table__.insert(), coaches)
+    if clients:
+        db.session.execute(Client.__table__.insert(), clients)
+
+
+def seed_exercises(db, n, batch=20000):
+    """One load type + n exercises with ids 1..n (no tag collections)."""
+    from models import Exercise, LoadType
+
+    db.session.execute(LoadType.__table__.insert(), [{'id': 1, 'name': 'Barbell'}])
+    rows = []
+    for i in range(1, n + 1):
+        rows.append({
+            'id': i, 'name': f'Exercise {i}', 'load_type_id': 1, 'type_training': 'strength',
+            'movement_category': 'compound', 'body_part': ('upper', 'lower', 'core')[i % 3],
+            'muscle_action': 'concentric', 'movement_pattern': ('push', 'pull', 'squat', 'hinge')[i % 4],
+            'plane_motion': ('sagittal', 'frontal', 'transverse')[i % 3], 'joint_involvement': 'multi',
+            'joint_position': 'neutral', 'resistance_modality': ('free', 'machine', 'cable')[i % 3],
+        })
+        if len(rows) >= batch:
+            db.session.execute(Exercise.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(Exercise.__table__.insert(), rows)
+    db.session.commit()
+
+
+def workout_row(client_id, exercise_id, created_at, rnd):
+    reps, sets, weight = rnd.randint(3, 12), rnd.randint(2, 5), rnd.randint(20, 140)
+    tempo = rnd.randint(2, 6)
+    tut = tempo * reps * sets
+    total_rest = (sets - 1) * 90
+    return {
+        'client_id': client_id, 'exercise_id': exercise_id, 'units': 'kg',
+        'rm': weight + 20, 'rm_percentage': 75, 'max_repetitions': reps + 2, 'rir_repetitions': 2,
+        'cc_tempo': 1, 'iso_tempo_one': 0, 'ecc_tempo': tempo - 1, 'iso_tempo_two': 0,
+        'reps': reps, 'sets': sets, 'exercise_time': 0, 'rom': 1,
+        'weight': weight, 'repetitions': reps, 'total_tempo': tempo, 'tut': tut,
+        'total_rest': total_rest, 'density': round(weight * reps * sets / (tut + total_rest), 2),
+        'created_at': created_at,
+    }
+
+
+def seed_workouts(db, n, client_ids, exercise_ids, days=730, batch=20000, seed=7, schedule_days=0):
+    """
+    n workouts spread over `days` days up to now, round-robin over client_ids,
+    random exercises. With schedule_days, each also gets a random scheduled_for
+    within that many days from today. Bypasses the routes, so run
+    Client.recount_workouts() afterwards if counts matter.
+    """
+    import random
+    from datetime import datetime, timedelta
+    from models import Workout
+
+    rnd = random.Random(seed)
+    start = datetime.utcnow() - timedelta(days=days)
+    step = timedelta(days=days) / max(n, 1)
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    rows = []
+    for i in range(n):
+        rows.append(workout_row(client_ids[i % len(client_ids)], rnd.choice(exercise_ids), start + step * i, rnd))
+        if schedule_days:
+            rows[-1]['scheduled_for'] = today + timedelta(minutes=rnd.randrange(schedule_days * 1440))
+        if len(rows) >= batch:
+            db.session.execute(Workout.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(Workout.__table__.insert(), rows)
+    db.session.commit()
+
+
+def seed_exercise_tags(db, n_exercises, per_collection=4, vocabulary=40, seed=11):
+    """
+    Tag exercises 1..n with `per_collection` muscular groups, primary/secondary
+    muscles, joint actions and equipment each (with mg/pm percentages).
+    """
+    import random
+    from models import Equipment, JointAction, Muscle, MuscularGroup
+    from models.association_model import (
+        exercise_equipment, exercise_joint_action, exercise_muscular_group,
+        exercise_primary_muscle, exercise_secondary_muscle,
+    )
+
+    rnd = random.Random(seed)
+    for model in (Muscle, MuscularGroup, JointAction, Equipment):
+        db.session.execute(model.__table__.insert(),
+                           [{'id': i, 'name': f'{model.__name__} {i}'} for i in range(1, vocabulary + 1)])
+
+    links = {t: [] for t in ('mg', 'pm', 'sm', 'ja', 'eq')}
+    ids = range(1, vocabulary + 1)
+    for ex in range(1, n_exercises + 1):
+        for mg in rnd.sample(ids, per_collection):
+            links['mg'].append({'exercise_id': ex, 'muscular_group_id': mg, 'mg_percentage': rnd.uniform(5, 60)})
+        primary = rnd.sample(ids, per_collection * 2)
+        for m in primary[:per_collection]:
+            links['pm'].append({'exercise_id': ex, 'muscle_id': m, 'pm_percentage': rnd.uniform(5, 60)})
+        for m in primary[per_collection:]:
+            links['sm'].append({'exercise_id': ex, 'muscle_id': m})
+        for ja in rnd.sample(ids, per_collection):
+            links['ja'].append({'exercise_id': ex, 'joint_action_id': ja})
+        for eq in rnd.sample(ids, per_collection):
+            links['eq'].append({'exercise_id': ex, 'equipment_id': eq})
+
+    for table, key in ((exercise_muscular_group, 'mg'), (exercise_primary_muscle, 'pm'),
+                       (exercise_secondary_muscle, 'sm'), (exercise_joint_action, 'ja'),
+                       (exercise_equipment, 'eq')):
+        if links[key]:
+            db.session.execute(table.insert(), links[key])
+    db.session.commit()
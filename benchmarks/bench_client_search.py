@@ -0,0 +1,83 @@
+# benchmarks/bench_client_search.py
+"""
+GET /clients/?search= through the search index (FTS5 on SQLite, pg_trgm on
+Postgres via BENCH_DATABASE_URL) vs. the five-column ILIKE scan, global and
+coach-scoped. Exits non-zero if a search for a coach key ('c7') matches
+anything: the terms must only hit the client columns.
+
+    python benchmarks/bench_client_search.py [--clients 1000000] [--coaches 2000] [--repeat 20]
+"""
+import argparse
+import random
+import sys
+import time
+
+from _common import make_app, report, seed_coaches, timed
+
+FIRST = ('Ana', 'Juan', 'María', 'José', 'Lucía', 'Carlos', 'Elena', 'Pedro', 'Sofía', 'Javier',
+         'Laura', 'Miguel', 'Carmen', 'David', 'Paula', 'Andrés', 'Marta', 'Pablo', 'Irene', 'Diego')
+LAST = ('García', 'López', 'Martínez', 'Sánchez', 'Pérez', 'Gómez', 'Fernández', 'Díaz', 'Ruiz',
+        'Hernández', 'Jiménez', 'Moreno', 'Álvarez', 'Romero', 'Navarro', 'Torres', 'Domínguez',
+        'Vázquez', 'Ramos', 'Gil', 'Serrano', 'Blanco', 'Molina', 'Castro', 'Ortega', 'Rubio')
+CITIES = ('Madrid', 'Barcelona', 'Valencia', 'Sevilla', 'Bilbao', 'Málaga', 'Zaragoza', 'Lisboa',
+          'Porto', 'México', 'Bogotá', 'Lima', 'Santiago', 'Buenos Aires', 'Montevideo')
+SEARCHES = ('ana', 'gar', 'lucia fern', 'sevilla', 'jimenez12')
+
+
+def seed_clients(db, n, coaches, batch=50_000, seed=3):
+    from models import Client
+
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(1, n + 1):
+        first, last = rnd.choice(FIRST), rnd.choice(LAST)
+        rows.append({
+            'name': first, 'last_name': last, 'profile_name': f'{first.lower()}{i}', 'phone': '0',
+            'email': f'{last.lower()}{i % 1000}.{i}@mail.test', 'city': rnd.choice(CITIES),
+            'time_zone': 'Europe/Madrid', 'coach_id': rnd.randint(1, coaches),
+        })
+        if len(rows) >= batch:
+            db.session.execute(Client.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(Client.__table__.insert(), rows)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=1_000_000)
+    parser.add_argument('--coaches', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+
+    with app.app_context():
+        seed_coaches(db, args.coaches)
+        t0 = time.perf_counter()
+        seed_clients(db, args.clients, args.coaches)
+        print(f"seeded {args.clients} clients (index kept in sync on insert) "
+              f"in {time.perf_counter() - t0:.1f} s; backend={app.config['CLIENT_SEARCH_BACKEND']}")
+
+    client = app.test_client()
+    backend = app.config['CLIENT_SEARCH_BACKEND']
+    for term in SEARCHES:
+        for scope in ('', '&coach_id=7'):
+            url = f'/clients/?search={term}{scope}&limit=20'
+            app.config['CLIENT_SEARCH_BACKEND'] = backend
+            hits = len(client.get(url).json)
+            report(f'index  {term!r:<12}{scope:<12}({hits})', timed(lambda: client.get(url), args.repeat))
+            app.config['CLIENT_SEARCH_BACKEND'] = None  # ILIKE fallback
+            hits = len(client.get(url).json)
+            report(f'ilike  {term!r:<12}{scope:<12}({hits})', timed(lambda: client.get(url), max(1, args.repeat // 4)))
+    app.config['CLIENT_SEARCH_BACKEND'] = backend
+
+    leaked = len(client.get('/clients/?search=c7&limit=20').json)
+    print(f"search=c7 matches {leaked} clients: {'ok' if not leaked else 'FAIL'}")
+    sys.exit(0 if not leaked else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_client_stats.py
+"""
+GET /clients/<id>/stats from workout_rollups vs. what the browser does today
+(download /workouts/by-client/<id> and bucket it by week), plus the cost the
+rollup upsert adds to POST /workouts/. Exits non-zero if the incrementally
+maintained rollups drift from a full rebuild.
+
+    python benchmarks/bench_client_stats.py [--workouts 200000] [--clients 50] [--repeat 20]
+"""
+import argparse
+import random
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from _common import make_app, report, seed_coaches, seed_exercises, seed_workouts, timed, workout_row
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workouts', type=int, default=200_000)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+    from models import Client, WorkoutRollup
+    from utils.workout_rollups import rebuild
+
+    with app.app_context():
+        seed_coaches(db, 1, clients_per_coach=args.clients)
+        seed_exercises(db, 100)
+        client_ids = db.session.execute(db.select(Client.id)).scalars().all()
+        seed_workouts(db, args.workouts, client_ids, list(range(1, 101)))
+        Client.recount_workouts()
+        rows = rebuild()
+        db.session.commit()
+        print(f"{args.workouts} workouts -> {rows} rollup rows")
+
+    client = app.test_client()
+    cid = client_ids[0]
+
+    def from_history():
+        history = client.get(f'/workouts/by-client/{cid}').json
+        weeks = defaultdict(lambda: [0, 0.0, 0, 0])
+        for w in history:
+            day = datetime.fromisoformat(w['created_at']).date()
+            b = weeks[day - timedelta(days=day.weekday())]
+            b[0] += 1
+            b[1] += w['weight'] * w['reps'] * w['sets']
+            b[2] += w['tut']
+            b[3] += w['total_rest']
+        return sorted(weeks.items())
+
+    report('GET /clients/<id>/stats (week)', timed(lambda: client.get(f'/clients/{cid}/stats'), args.repeat))
+    report('GET /clients/<id>/stats?by_exercise=1',
+           timed(lambda: client.get(f'/clients/{cid}/stats?by_exercise=1'), args.repeat))
+    report('history download + bucketing', timed(from_history, max(1, args.repeat // 4)))
+
+    rnd = random.Random(21)
+
+    def body():
+        row = workout_row(cid, rnd.randint(1, 100), None, rnd)
+        return {k: v for k, v in row.items() if k not in ('tut', 'total_tempo', 'total_rest', 'density', 'created_at')}
+
+    report('POST /workouts/ (+ rollup upsert)', timed(lambda: client.post('/workouts/', json=body()), args.repeat * 5))
+
+    def key(r):
+        return tuple(r[:4]) + tuple(round(x, 6) for x in r[4:])
+
+    with app.app_context():
+        table = WorkoutRollup.__table__
+        incremental = sorted(key(r) for r in db.session.execute(db.select(*table.c)))
+        rebuild()
+        rebuilt = sorted(key(r) for r in db.session.execute(db.select(*table.c)))
+        db.session.rollback()
+    ok = incremental == rebuilt
+    print(f"incremental rollups == rebuild: {'ok' if ok else 'FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
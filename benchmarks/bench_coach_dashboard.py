@@ -0,0 +1,105 @@
+# benchmarks/bench_coach_dashboard.py
+"""
+GET /coaches/me/dashboard for one coach with many clients, against the
+current home screen (/coaches/<id>/clients, then each client's history) and
+against computing the same numbers straight from workouts with a
+ROW_NUMBER() window. Exits non-zero if the dashboard issues more than its two
+queries (the token's coach comes from the auth cache) or disagrees with the
+workouts-table version.
+
+    python benchmarks/bench_coach_dashboard.py [--clients 500] [--workouts 10000] [--days 365] [--repeat 20]
+
+--workouts is per client (500 x 10k = 5M rows by default; seeding takes a few minutes).
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+from _common import count_queries, make_app, report, seed_coaches, seed_exercises, seed_workouts, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--workouts', type=int, default=10_000, help='per client')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--old-sample', type=int, default=10, help='clients fetched on the old path')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+    from models import Client, Coach, Workout
+    from utils.workout_rollups import rebuild
+
+    with app.app_context():
+        t0 = time.perf_counter()
+        seed_coaches(db, 1, clients_per_coach=args.clients)
+        seed_exercises(db, 100)
+        client_ids = db.session.execute(db.select(Client.id).order_by(Client.id)).scalars().all()
+        seed_workouts(db, args.clients * args.workouts, client_ids, list(range(1, 101)), days=args.days)
+        Client.recount_workouts()
+        rebuild()
+        db.session.commit()
+        print(f"seeded {args.clients} clients x {args.workouts} workouts in {time.perf_counter() - t0:.0f} s")
+        token = db.session.get(Coach, 1).generate_token()
+        engine = db.engine
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    url = '/coaches/me/dashboard'
+    dashboard = client.get(url, headers=headers).json
+    with count_queries(engine) as n:
+        client.get(url, headers=headers)
+    report(f'GET {url}', timed(lambda: client.get(url, headers=headers), args.repeat))
+
+    def old_home_screen(sample):
+        client.get('/coaches/1/clients', headers=headers)
+        for cid in client_ids[:sample]:
+            client.get(f'/workouts/by-client/{cid}?fields=created_at,weight,reps,sets,density')
+
+    samples = timed(lambda: old_home_screen(args.old_sample), 1)
+    print(f"old: /clients + {args.old_sample} histories {samples[0]:.0f} ms "
+          f"-> ~{samples[0] * args.clients / args.old_sample / 1000:.1f} s for all {args.clients}")
+
+    with app.app_context():
+        today = datetime.utcnow().date()
+        since = datetime.combine(today - timedelta(days=27), datetime.min.time())
+        since_7 = datetime.combine(today - timedelta(days=6), datetime.min.time())
+        coach_clients = db.select(Client.id).where(Client.coach_id == 1)
+        volume = Workout.weight * Workout.reps * Workout.sets
+        ranked = (db.select(Workout.client_id, Workout.created_at,
+                            db.func.row_number().over(partition_by=Workout.client_id,
+                                                      order_by=Workout.created_at.desc()).label('rn'))
+                  .where(Workout.client_id.in_(coach_clients))
+                  .subquery())
+        last_q = db.select(ranked.c.client_id, ranked.c.created_at).where(ranked.c.rn == 1)
+        recent_q = (db.select(Workout.client_id,
+                              db.func.count(),
+                              db.func.sum(volume),
+                              db.func.sum(db.case((Workout.created_at >= since_7, 1), else_=0)),
+                              db.func.sum(db.case((Workout.created_at >= since_7, volume), else_=0)))
+                    .where(Workout.client_id.in_(coach_clients), Workout.created_at >= since)
+                    .group_by(Workout.client_id))
+
+        def from_workouts():
+            return (dict(db.session.execute(last_q).all()),
+                    {r[0]: r[1:] for r in db.session.execute(recent_q)})
+
+        report('workouts + ROW_NUMBER() window', timed(from_workouts, max(1, args.repeat // 5)))
+        last, recent = from_workouts()
+
+    ok = n[0] <= 2
+    for d in dashboard['clients']:
+        count_28, volume_28, count_7, volume_7 = recent.get(d['id'], (0, 0, 0, 0))
+        expected_last = last.get(d['id'])
+        ok &= (d['workouts_28d'], d['workouts_7d']) == (count_28, count_7)
+        ok &= abs(d['volume_28d'] - (volume_28 or 0)) < 0.01 and abs(d['volume_7d'] - (volume_7 or 0)) < 0.01
+        ok &= d['last_workout_at'] == (expected_last.isoformat() if expected_last else None)
+    print(f"dashboard queries={n[0]}, matches workouts table: {'ok' if ok else 'FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_coaches_list.py
+"""
+GET /coaches/ query count + latency, set-based listing vs. the old
+Coach.query.all() + per-coach lazy `clients` path.
+
+    python benchmarks/bench_coaches_list.py [--coaches 10000] [--clients-per-coach 3]
+
+Exits non-zero if the listing issues more than EXPECTED_QUERIES statements
+for any page size (query-count regression check).
+"""
+import argparse
+import sys
+
+from _common import count_queries, make_app, report, seed_coaches, timed
+
+EXPECTED_QUERIES = 2  # coach page + client ids
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--coaches', type=int, default=10_000)
+    parser.add_argument('--clients-per-coach', type=int, default=3)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+    from models import Coach
+
+    with app.app_context():
+        seed_coaches(db, args.coaches, args.clients_per_coach)
+
+    client = app.test_client()
+    failed = False
+    for limit in (1, 100, 500):
+        with app.app_context():
+            engine = db.engine
+        with count_queries(engine) as n:
+            r = client.get(f'/coaches/?limit={limit}&offset=10')
+        ok = r.status_code == 200 and len(r.json) == limit and n[0] <= EXPECTED_QUERIES
+        failed |= not ok
+        print(f"limit={limit:<4} rows={len(r.json):<4} queries={n[0]}  {'ok' if ok else 'FAIL'}")
+
+    report('GET /coaches/?limit=500', timed(lambda: client.get('/coaches/?limit=500'), 20))
+
+    def old_path():
+        with app.app_context():
+            return [c.to_dict() for c in Coach.query.order_by(Coach.id).limit(500).all()]
+
+    with app.app_context():
+        engine = db.engine
+    with count_queries(engine) as n:
+        old_path()
+    print(f"old path, 500 coaches: queries={n[0]}")
+    report('old Coach.to_dict() x 500', timed(old_path, 20))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
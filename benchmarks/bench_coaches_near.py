@@ -0,0 +1,84 @@
+# benchmarks/bench_coaches_near.py
+"""
+"Coaches near me": H3 cell-set lookup vs. scan-everything-and-measure.
+
+    python benchmarks/bench_coaches_near.py [--n 1000000] [--k 2] [--res 7]
+
+Synthetic coaches are spread uniformly over the Iberian peninsula bounding box.
+"""
+import argparse
+import random
+
+from _common import make_app, report, timed
+
+
+def seed(db, Coach, n, batch=20000):
+    from utils.geo_utils import H3_RESOLUTIONS
+    from h3.api import basic_int as h3
+
+    rnd = random.Random(42)
+    table = Coach.__table__
+    rows = []
+    for i in range(n):
+        lat, lng = rnd.uniform(36.0, 43.7), rnd.uniform(-9.3, 3.3)
+        row = {
+            'name': 'c', 'last_name': 'c', 'profile_name': f'p{i}', 'phone': '0',
+            'email': f'c{i}@bench', 'password_hash': 'x', 'city': 'bench',
+            'time_zone': 'Europe/Madrid', 'time_zone_status': 'resolved',
+            'training_speciality': 's', 'latitude': lat, 'longitude': lng,
+        }
+        for res in H3_RESOLUTIONS:
+            row[f'h3_r{res}'] = h3.latlng_to_cell(lat, lng, res)
+        rows.append(row)
+        if len(rows) == batch:
+            db.session.execute(table.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(table.insert(), rows)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n', type=int, default=1_000_000)
+    parser.add_argument('--k', type=int, default=2)
+    parser.add_argument('--res', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+    from models import Coach
+    from utils.geo_utils import cells_near, h3_column, haversine_km
+    from h3.api import basic_int as h3
+
+    with app.app_context():
+        print(f"seeding {args.n} coaches ...")
+        seed(db, Coach, args.n)
+
+        # roughly the disk radius, so both paths answer the same question
+        radius_km = (2 * args.k + 1) * h3.average_hexagon_edge_length(args.res, 'km')
+        points = [(40.4168, -3.7038), (41.3874, 2.1686), (37.3891, -5.9845)]
+        pick = iter(points * (args.repeat + 1))
+
+        col = h3_column(Coach, args.res)
+
+        def h3_lookup():
+            lat, lng = next(pick)
+            cells = cells_near(lat, lng, args.k, args.res)
+            return db.session.execute(
+                db.select(Coach.id, Coach.latitude, Coach.longitude).where(col.in_(cells))
+            ).all()
+
+        def full_scan():
+            lat, lng = next(pick)
+            rows = db.session.execute(db.select(Coach.id, Coach.latitude, Coach.longitude)).all()
+            return [r for r in rows if haversine_km(lat, lng, r[1], r[2]) <= radius_km]
+
+        print(f"k={args.k} res={args.res} matches≈{len(h3_lookup())}")
+        report('h3 cell-set lookup', timed(h3_lookup, args.repeat))
+        report('full scan + haversine', timed(full_scan, max(3, args.repeat // 10)))
+
+
+if __name__ == '__main__':
+    main()
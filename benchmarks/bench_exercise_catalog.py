@@ -0,0 +1,73 @@
+# benchmarks/bench_exercise_catalog.py
+"""
+Exercise catalog reads served from the in-memory snapshot vs. the old
+eager_options() ORM queries, plus snapshot build time.
+
+    python benchmarks/bench_exercise_catalog.py [--exercises 500] [--repeat 50]
+
+Exits non-zero if a warm catalog read (list, full list, detail) issues any SQL
+(query-count regression check).
+"""
+import argparse
+import sys
+
+from _common import count_queries, make_app, report, seed_exercise_tags, seed_exercises, timed
+
+EXPECTED_QUERIES = 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--exercises', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    app = make_app()
+    from flask import jsonify
+    from db import db
+    from models import CatalogVersion, Exercise
+    from routes.exercises_routes import eager_options
+    from utils.exercise_catalog import load_snapshot
+
+    with app.app_context():
+        seed_exercises(db, args.exercises)
+        seed_exercise_tags(db, args.exercises)
+        engine = db.engine
+        version = CatalogVersion.current()
+        report(f'build snapshot, {args.exercises} exercises', timed(lambda: load_snapshot(version), 5))
+
+    client = app.test_client()
+    urls = ('/exercises/', '/exercises/?full=1', '/exercises/?full=1&page_size=500',
+            '/exercises/1/', '/exercises/?fields=name,body_part,equipments')
+    for url in urls:
+        client.get(url)  # warm: first read builds the snapshot
+    failed = False
+    for url in urls:
+        with count_queries(engine) as n:
+            r = client.get(url)
+        ok = r.status_code == 200 and n[0] <= EXPECTED_QUERIES
+        failed |= not ok
+        print(f"{url:<45} queries={n[0]}  {'ok' if ok else 'FAIL'}")
+        report(f'GET {url}', timed(lambda: client.get(url), args.repeat))
+
+    with app.test_request_context():
+        def old_detail():
+            q = Exercise.query
+            for opt in eager_options():
+                q = q.options(opt)
+            return jsonify(q.get_or_404(1).to_dict()).get_data()
+
+        def old_page():
+            q = Exercise.query
+            for opt in eager_options():
+                q = q.options(opt)
+            return jsonify([e.to_dict() for e in q.order_by(Exercise.id.asc()).limit(100).all()]).get_data()
+
+        report('ORM eager_options detail', timed(old_detail, args.repeat))
+        report('ORM eager_options page (100)', timed(old_page, max(1, args.repeat // 10)))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
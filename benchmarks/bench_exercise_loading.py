@@ -0,0 +1,109 @@
+# benchmarks/bench_exercise_loading.py
+"""
+Rows fetched, statements and latency for loading a page of richly tagged
+exercises with every collection, per loading strategy:
+
+  cartesian joinedload  the old eager_options(): five collection joins in one SELECT
+  orm selectin          eager_options() now: joined load_type + one IN query per collection
+  per_collection        utils/exercise_catalog: Core, one query per collection
+  json_subquery         utils/exercise_catalog: one row per exercise, collections as JSON
+
+    python benchmarks/bench_exercise_loading.py [--exercises 500] [--tags 4] [--repeat 5]
+
+"rows" re-runs every captured statement on a raw DBAPI cursor and counts
+what it returns, i.e. what crossed the wire before any deduplication.
+"""
+import argparse
+
+from _common import make_app, report, seed_exercise_tags, seed_exercises, timed
+
+
+def capture(engine, fn):
+    """Run fn once; return the (statement, parameters) it sent to the database."""
+    from sqlalchemy import event
+
+    sent = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        sent.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', _record)
+    try:
+        fn()
+    finally:
+        event.remove(engine, 'before_cursor_execute', _record)
+    return sent
+
+
+def rows_fetched(engine, sent):
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        total = 0
+        for statement, parameters in sent:
+            cursor.execute(statement, parameters)
+            total += len(cursor.fetchall())
+        return total
+    finally:
+        raw.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--exercises', type=int, default=500)
+    parser.add_argument('--tags', type=int, default=4, help='items per collection per exercise')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app()
+    from sqlalchemy.orm import joinedload
+    from db import db
+    from models import Exercise
+    from routes.exercises_routes import eager_options
+    from utils.exercise_catalog import LOAD_STRATEGIES, load_strategy
+
+    cartesian = (
+        joinedload(Exercise.load_type),
+        joinedload(Exercise.muscular_groups),
+        joinedload(Exercise.primary_muscles),
+        joinedload(Exercise.secondary_muscles),
+        joinedload(Exercise.joint_actions),
+        joinedload(Exercise.equipments),
+    )
+
+    def orm_page(options):
+        def run():
+            items = Exercise.query.options(*options).order_by(Exercise.id.asc()).limit(args.exercises).all()
+            result = [e.to_dict() for e in items]
+            db.session.expunge_all()
+            return result
+        return run
+
+    with app.app_context():
+        seed_exercises(db, args.exercises)
+        seed_exercise_tags(db, args.exercises, per_collection=args.tags)
+        engine = db.engine
+        print(f"{args.exercises} exercises x 5 collections x {args.tags} items; "
+              f"auto strategy here: {load_strategy()}")
+
+        cases = [
+            ('cartesian joinedload', orm_page(cartesian)),
+            ('orm selectin', orm_page(eager_options())),
+            ('per_collection', LOAD_STRATEGIES['per_collection']),
+            ('json_subquery', LOAD_STRATEGIES['json_subquery']),
+        ]
+        expected = None
+        for label, fn in cases:
+            sent = capture(engine, fn)
+            result = fn()
+            normalized = sorted(
+                ({k: (sorted(v, key=lambda i: i['id']) if isinstance(v, list) else v) for k, v in d.items()}
+                 for d in result), key=lambda d: d['id'])
+            expected = expected or normalized
+            same = 'same output' if normalized == expected else 'OUTPUT DIFFERS'
+            print(f"{label:<22} statements={len(sent):<3} rows={rows_fetched(engine, sent):<8} {same}")
+            report(f'  {label}', timed(fn, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
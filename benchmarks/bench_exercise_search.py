@@ -0,0 +1,62 @@
+# benchmarks/bench_exercise_search.py
+"""
+Faceted exercise search: bitmap index build time, FacetIndex.search latency
+(filter + all facet counts) and GET /exercises/search end to end.
+
+    python benchmarks/bench_exercise_search.py [--exercises 20000] [--repeat 200]
+
+Exits non-zero if a warm search issues any SQL (query-count regression check).
+"""
+import argparse
+import sys
+
+from _common import count_queries, make_app, report, seed_exercise_tags, seed_exercises, timed
+
+QUERIES = (
+    {},
+    {'body_part': (['upper'], False)},
+    {'body_part': (['upper', 'lower'], False), 'plane_motion': (['sagittal'], False)},
+    {'equipment': ([1, 2, 3], False), 'primary_muscle': ([4], False)},
+    {'equipment': ([1, 2], True), 'movement_pattern': (['push', 'pull'], False)},
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--exercises', type=int, default=20_000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+    from utils.exercise_catalog import exercise_catalog
+    from utils.exercise_search import FacetIndex
+
+    with app.app_context():
+        seed_exercises(db, args.exercises)
+        seed_exercise_tags(db, args.exercises, per_collection=3)
+        engine = db.engine
+        snapshot = exercise_catalog.snapshot()
+
+    report(f'FacetIndex build, {args.exercises} exercises', timed(lambda: FacetIndex(snapshot), 3))
+    index = FacetIndex(snapshot)
+    for filters in QUERIES:
+        bits, _ = index.search(filters)
+        label = ' & '.join(f"{k}={'+' if all_ else '|'}{v}" for k, (v, all_) in filters.items()) or 'no filter'
+        report(f'search {label[:32]} ({bits.bit_count()})', timed(lambda: index.search(filters), args.repeat))
+        report('  first page of ids (100)', timed(lambda: index.ids(bits, 0, 100), args.repeat))
+
+    client = app.test_client()
+    url = '/exercises/search?body_part=upper,lower&equipment=1,2,3&primary_muscle=4'
+    client.get(url)  # warm: builds the index
+    with count_queries(engine) as n:
+        r = client.get(url)
+    ok = r.status_code == 200 and n[0] == 0
+    print(f"GET {url}  queries={n[0]}  {'ok' if ok else 'FAIL'}")
+    report('GET /exercises/search', timed(lambda: client.get(url), args.repeat))
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_exercise_similarity.py
+"""
+Top-k substitutes over the exercise x muscle matrix: build time, top-k
+latency with and without the equipment constraint, and a pure-Python
+cosine loop over the same vectors for comparison.
+
+    python benchmarks/bench_exercise_similarity.py [--exercises 50000] [--k 10] [--repeat 50]
+"""
+import argparse
+import math
+
+from _common import make_app, report, seed_exercise_tags, seed_exercises, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--exercises', type=int, default=50_000)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+    from utils.exercise_catalog import exercise_catalog
+    from utils.exercise_similarity import SimilarityIndex, load_percentages
+
+    with app.app_context():
+        seed_exercises(db, args.exercises)
+        seed_exercise_tags(db, args.exercises)
+        snapshot = exercise_catalog.snapshot()
+        report('load percentages (2 queries)', timed(load_percentages, 3))
+        percentages = load_percentages()
+
+    report(f'build matrix, {args.exercises} exercises', timed(lambda: SimilarityIndex(snapshot, percentages), 3))
+    index = SimilarityIndex(snapshot, percentages)
+    print(f"matrix {index.matrix.shape[0]} x {index.matrix.shape[1]} float32, "
+          f"{index.matrix.nbytes / 2**20:.1f} MiB")
+
+    target = args.exercises // 2
+    report(f'top-{args.k}', timed(lambda: index.similar(target, args.k), args.repeat))
+    report(f'top-{args.k}, equipment constraint', timed(
+        lambda: index.similar(target, args.k, set(range(1, 21))), args.repeat))
+
+    # pure Python over the same normalized rows
+    vectors = [list(map(float, row)) for row in index.matrix]
+    ids = snapshot.ids
+
+    def python_topk():
+        q = vectors[target - 1]
+        scored = [(sum(a * b for a, b in zip(q, v)), ids[j]) for j, v in enumerate(vectors) if j != target - 1]
+        return sorted(scored, reverse=True)[:args.k]
+
+    report(f'pure Python top-{args.k}', timed(python_topk, max(1, args.repeat // 25)))
+
+    fast = [i for i, _ in index.similar(target, args.k)]
+    slow = [i for _, i in python_topk()]
+    fast_scores = [s for _, s in index.similar(target, args.k)]
+    slow_scores = [s for s, _ in python_topk()]
+    same = all(math.isclose(a, b, rel_tol=1e-4) for a, b in zip(fast_scores, slow_scores))
+    print(f"top-{args.k} matches pure Python: {'yes' if same else 'NO'} (ids {fast[:5]} vs {slow[:5]})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_keyset_pagination.py
+"""
+Page latency vs. depth: OFFSET pagination vs. keyset cursors.
+
+    python benchmarks/bench_keyset_pagination.py [--workouts 300000] [--clients 150000]
+
+For each depth the cursor is built from the row just before that position,
+so both modes return the same page.
+"""
+import argparse
+
+from _common import make_app, report, seed_coaches, seed_exercises, seed_workouts, timed
+
+DEPTHS = (0, 10_000, 100_000)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workouts', type=int, default=300_000)
+    parser.add_argument('--clients', type=int, default=150_000)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+    from models import Client, Workout
+    from utils.pagination import encode_cursor
+
+    with app.app_context():
+        print(f"seeding {args.clients} clients, {args.workouts} workouts ...")
+        seed_coaches(db, 1, clients_per_coach=args.clients)
+        seed_exercises(db, 50)
+        seed_workouts(db, args.workouts, list(range(1, 101)), list(range(1, 51)))
+
+        def workout_cursor(depth):
+            if depth == 0:
+                return ''
+            row = db.session.execute(
+                db.select(Workout.created_at, Workout.id)
+                .order_by(Workout.created_at.desc(), Workout.id.desc())
+                .offset(depth - 1).limit(1)
+            ).one()
+            return encode_cursor(row[0].isoformat(), row[1])
+
+        def client_cursor(depth):
+            if depth == 0:
+                return ''
+            last_id = db.session.execute(
+                db.select(Client.id).order_by(Client.id.desc()).offset(depth - 1).limit(1)
+            ).scalar_one()
+            return encode_cursor(last_id)
+
+        cursors = {d: (workout_cursor(d), client_cursor(d)) for d in DEPTHS}
+
+    client = app.test_client()
+    lim = args.limit
+    for depth in DEPTHS:
+        wc, cc = cursors[depth]
+        report(f'workouts offset={depth}', timed(lambda: client.get(f'/workouts/?limit={lim}&offset={depth}'), args.repeat))
+        report(f'workouts cursor @{depth}', timed(lambda: client.get(f'/workouts/?limit={lim}&cursor={wc}'), args.repeat))
+        report(f'clients offset={depth}', timed(lambda: client.get(f'/clients/?limit={lim}&offset={depth}'), args.repeat))
+        report(f'clients cursor @{depth}', timed(lambda: client.get(f'/clients/?limit={lim}&cursor={cc}'), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
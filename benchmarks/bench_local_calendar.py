@@ -0,0 +1,98 @@
+# benchmarks/bench_local_calendar.py
+"""
+GET /coaches/me/calendar for a coach whose clients live in many time zones:
+offset-table bucketing (utils/local_time.py) vs. fetching the same rows and
+converting each one with zoneinfo in Python (no JSON). Exits non-zero if the two disagree on any bucket.
+With BENCH_DATABASE_URL pointing at Postgres, the in-SQL bucketing
+(CALENDAR_BUCKETING=sql) is timed as well.
+
+    python benchmarks/bench_local_calendar.py [--clients 500] [--workouts 200000] [--repeat 10]
+"""
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from _common import make_app, report, seed_coaches, seed_exercises, seed_workouts, timed
+
+ZONES = ('Europe/Madrid', 'America/New_York', 'America/Santiago', 'America/Los_Angeles', 'Asia/Kolkata',
+         'Asia/Tokyo', 'Australia/Sydney', 'Australia/Lord_Howe', 'Pacific/Auckland', 'Pacific/Apia',
+         'America/St_Johns', 'Asia/Kathmandu', 'Africa/Cairo', 'Europe/London', 'UTC')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--workouts', type=int, default=200_000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+    from models import Client, Coach, Workout
+
+    with app.app_context():
+        seed_coaches(db, 1, clients_per_coach=args.clients)
+        seed_exercises(db, 50)
+        client_ids = db.session.execute(db.select(Client.id).order_by(Client.id)).scalars().all()
+        for i, cid in enumerate(client_ids):
+            db.session.execute(db.update(Client).where(Client.id == cid).values(time_zone=ZONES[i % len(ZONES)]))
+        db.session.commit()
+        seed_workouts(db, args.workouts, client_ids, list(range(1, 51)), days=args.days)
+        token = db.session.get(Coach, 1).generate_token()
+        dialect = db.engine.dialect.name
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    start, end = date.today() - timedelta(days=args.days), date.today()
+    params = {'from': start.isoformat(), 'to': end.isoformat()}
+    results = {}
+    strategies = ('offsets', 'sql') if dialect == 'postgresql' else ('offsets',)
+    for strategy in strategies:
+        app.config['CALENDAR_BUCKETING'] = strategy
+        for period in ('day', 'week'):
+            q = {**params, 'period': period}
+            results[strategy, period] = client.get('/coaches/me/calendar', headers=headers, query_string=q).json
+            report(f'{strategy:<8} period={period}', timed(
+                lambda: client.get('/coaches/me/calendar', headers=headers, query_string=q), args.repeat))
+
+    def per_row(period):
+        with app.app_context():
+            rows = db.session.execute(
+                db.select(Workout.client_id, Client.time_zone, Workout.created_at, Workout.weight,
+                          Workout.reps, Workout.sets)
+                .join(Client, Client.id == Workout.client_id)
+                .where(Workout.created_at >= start - timedelta(days=1))
+            ).all()
+        zones = {}
+        out = defaultdict(lambda: [0, 0.0])
+        for cid, zone, created_at, weight, reps, sets in rows:
+            tz = zones.get(zone) or zones.setdefault(zone, ZoneInfo(zone))
+            day = created_at.replace(tzinfo=timezone.utc).astimezone(tz).date()
+            if not start <= day <= end:
+                continue
+            if period == 'week':
+                day -= timedelta(days=day.weekday())
+            b = out[cid, day.isoformat()]
+            b[0] += 1
+            b[1] += weight * reps * sets
+        return out
+
+    ok = True
+    for period in ('day', 'week'):
+        expected = per_row(period)
+        report(f'fetch + per-row zoneinfo {period}', timed(lambda: per_row(period), max(1, args.repeat // 5)))
+        for strategy in strategies:
+            got = {(c['client_id'], i['date']): [i['workouts'], i['volume']]
+                   for c in results[strategy, period]['clients'] for i in c['items']}
+            same = got.keys() == expected.keys() and all(
+                got[k][0] == v[0] and abs(got[k][1] - v[1]) < 0.01 for k, v in expected.items())
+            ok &= same
+            print(f"{strategy} period={period} matches per-row zoneinfo: {'ok' if same else 'FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
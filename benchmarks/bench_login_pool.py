@@ -0,0 +1,78 @@
+# benchmarks/bench_login_pool.py
+"""
+Login throughput with PBKDF2 inline vs. in the bounded process pool.
+
+    python benchmarks/bench_login_pool.py [--concurrency 8] [--requests 8] [--iterations 200000]
+
+Threads stand in for gthread workers hammering /coaches/login; 503s (shed
+load) are counted separately from successful logins.
+"""
+import argparse
+import threading
+import time
+
+from _common import make_app, percentile
+
+
+def run(app, concurrency, per_thread):
+    latencies, statuses = [], []
+    lock = threading.Lock()
+
+    def worker():
+        client = app.test_client()
+        for _ in range(per_thread):
+            t0 = time.perf_counter()
+            r = client.post('/coaches/login', json={'email': 'bench@x', 'password': 'pw'})
+            ms = (time.perf_counter() - t0) * 1000
+            with lock:
+                latencies.append(ms)
+                statuses.append(r.status_code)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0, latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=8, help='logins per thread')
+    parser.add_argument('--iterations', type=int, default=200_000)
+    parser.add_argument('--pool-workers', type=int, default=2)
+    parser.add_argument('--max-queue', type=int, default=8)
+    args = parser.parse_args()
+
+    app = make_app()
+    app.config['PASSWORD_HASH_ITERATIONS'] = args.iterations
+    from db import db
+    from models import Coach
+    from utils import password_pool
+
+    with app.app_context():
+        app.config['PASSWORD_POOL_WORKERS'] = 0
+        coach = Coach(name='b', last_name='b', profile_name='bench', phone='0', email='bench@x',
+                      city='Madrid', time_zone='Europe/Madrid', training_speciality='s')
+        coach.password = 'pw'
+        db.session.add(coach)
+        db.session.commit()
+
+    for label, workers in (('inline', 0), (f'pool({args.pool_workers})', args.pool_workers)):
+        app.config['PASSWORD_POOL_WORKERS'] = workers
+        app.config['PASSWORD_POOL_MAX_QUEUE'] = args.max_queue
+        password_pool._pool.shutdown()
+        if workers:
+            run(app, 1, 1)  # spin up the pool outside the measurement
+        elapsed, lat, statuses = run(app, args.concurrency, args.requests)
+        ok = statuses.count(200)
+        print(f"{label:<10} ok={ok:<5} shed(503)={statuses.count(503):<5} "
+              f"throughput={ok / elapsed:7.1f} logins/s  p50={percentile(lat, 50):8.1f} ms  "
+              f"p99={percentile(lat, 99):8.1f} ms")
+    password_pool._pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# benchmarks/bench_progression.py
+"""
+GET /clients/<id>/progression over a long history: cold (columnar fetch +
+NumPy analysis), warm (memoized, one version probe) and after a new workout
+(recomputed), against a straightforward per-row Python implementation of the
+same rules. Exits non-zero if the two disagree or a warm hit issues more
+than one query.
+
+    python benchmarks/bench_progression.py [--workouts 100000] [--exercises 20] [--repeat 10]
+"""
+import argparse
+import math
+import random
+import sys
+from collections import OrderedDict
+
+from _common import count_queries, make_app, report, seed_coaches, seed_exercises, seed_workouts, timed, workout_row
+
+
+def python_progression(rows, window, plateau_window, tolerance):
+    """Reference: rows of (exercise_id, created_at, weight, reps, rir) sorted by exercise, time."""
+    sessions = OrderedDict()
+    for ex, created_at, weight, reps, rir in rows:
+        r = reps + max(rir, 0)
+        if weight <= 0 or reps <= 0:
+            continue
+        est = weight if r == 1 else weight * (1 + r / 30.0)
+        key = (ex, created_at.date())
+        if key not in sessions or est > sessions[key]:
+            sessions[key] = est
+    out = {}
+    for (ex, day), est in sessions.items():
+        out.setdefault(ex, []).append(est)
+    result = {}
+    for ex, ests in out.items():
+        flags, rolling = [], []
+        for i, est in enumerate(ests):
+            lo = max(0, i - window + 1)
+            rolling.append(sum(ests[lo:i + 1]) / (i + 1 - lo))
+            if i - plateau_window >= 0:
+                prior = max(ests[:i - plateau_window + 1])
+                recent = max(ests[i - plateau_window + 1:i + 1])
+                flags.append(recent <= prior * (1 + tolerance))
+            else:
+                flags.append(False)
+        result[ex] = (ests, rolling, flags)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workouts', type=int, default=100_000)
+    parser.add_argument('--exercises', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+    from models import Client, Workout
+    from utils.progression import (
+        DEFAULT_PLATEAU_WINDOW, DEFAULT_TOLERANCE, DEFAULT_WINDOW, analyze, load_columns, progression_cache,
+    )
+
+    with app.app_context():
+        seed_coaches(db, 1, clients_per_coach=1)
+        seed_exercises(db, args.exercises)
+        cid = db.session.execute(db.select(Client.id)).scalar()
+        seed_workouts(db, args.workouts, [cid], list(range(1, args.exercises + 1)), days=3650)
+        Client.recount_workouts()
+
+    client = app.test_client()
+    url = f'/clients/{cid}/progression'
+
+    def cold():
+        progression_cache.clear()
+        return client.get(url)
+
+    with app.app_context():
+        engine = db.engine
+        report(f'cold ({args.workouts} rows)', timed(cold, args.repeat))
+        report('  fetch only (load_columns)', timed(lambda: load_columns(cid), args.repeat))
+        columns = load_columns(cid)
+        report('  NumPy analyze only', timed(lambda: analyze(columns), args.repeat))
+        client.get(url)
+        with count_queries(engine) as n:
+            client.get(url)
+        report('warm (memoized)', timed(lambda: client.get(url), args.repeat * 10))
+        report('warm, one exercise', timed(lambda: client.get(f'{url}?exercise_id=3'), args.repeat * 10))
+
+        rows = db.session.execute(
+            db.select(Workout.exercise_id, Workout.created_at, Workout.weight, Workout.reps, Workout.rir_repetitions)
+            .where(Workout.client_id == cid).order_by(Workout.exercise_id, Workout.created_at, Workout.id)
+        ).all()
+        reference = python_progression(rows, DEFAULT_WINDOW, DEFAULT_PLATEAU_WINDOW, DEFAULT_TOLERANCE)
+        report('per-row Python reference', timed(
+            lambda: python_progression(rows, DEFAULT_WINDOW, DEFAULT_PLATEAU_WINDOW, DEFAULT_TOLERANCE),
+            max(1, args.repeat // 2)))
+        result = {e['exercise_id']: e for e in analyze(columns)}
+    same = result.keys() == reference.keys()
+    for ex, (ests, rolling, flags) in reference.items():
+        series = result[ex]['series']
+        same &= len(series) == len(ests) and all(
+            math.isclose(s['e1rm'], e, abs_tol=0.051) and s['plateau'] == f
+            and math.isclose(s['rolling'], r, abs_tol=0.051)
+            for s, e, r, f in zip(series, ests, rolling, flags))
+    print(f"NumPy == per-row reference: {'ok' if same else 'FAIL'}")
+
+    rnd = random.Random(4)
+    body = {k: v for k, v in workout_row(cid, 3, None, rnd).items()
+            if k not in ('tut', 'total_tempo', 'total_rest', 'density', 'created_at')}
+    client.post('/workouts/', json=body)
+    before = progression_cache.stats()['misses']
+    client.get(url)
+    recomputed = progression_cache.stats()['misses'] == before + 1
+
+    failed = n[0] != 1 or not recomputed
+    print(f"warm queries={n[0]}  recomputed after new workout: {'ok' if recomputed else 'FAIL'}")
+
+    sys.exit(1 if failed or not same else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_projection_lists.py
+"""
+Per-endpoint time + allocation: ORM hydration (Model.query ... .all() + dicts)
+vs. the column projections the list endpoints now run.
+
+    python benchmarks/bench_projection_lists.py [--rows 5000] [--repeat 20]
+
+Each path is called inside a request context; "peak" is the tracemalloc peak
+of one call and "objs" the number of ORM instances loaded into the session
+by it (0 for the projection paths).
+"""
+import argparse
+import tracemalloc
+
+from _common import make_app, report, seed_coaches, seed_exercises, seed_workouts, timed
+
+
+def seed_load_weights(db, n):
+    from models import LoadWeight
+
+    rows = [{'value': 0.5 * i, 'unit': 'kg', 'load_type_id': 1} for i in range(1, n + 1)]
+    db.session.execute(LoadWeight.__table__.insert(), rows)
+    db.session.commit()
+
+
+def measure(app, db, label, url, fn, repeat):
+    from sqlalchemy import event
+    from sqlalchemy.orm import Mapper
+
+    loaded = [0]
+
+    def _on_load(*_args):
+        loaded[0] += 1
+
+    with app.test_request_context(url):
+        fn()  # warm up (compiled encoders, statement cache)
+        db.session.expunge_all()
+        event.listen(Mapper, 'load', _on_load)
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        event.remove(Mapper, 'load', _on_load)
+        objs = loaded[0]
+        samples = timed(fn, repeat)
+        db.session.expunge_all()
+    report(label, samples)
+    print(f"{'':<40} peak={peak / 1024:9.1f} KiB  objs={objs}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    from flask import jsonify
+    from db import db
+    from models import Client, Exercise, LoadWeight, Workout
+    from routes.clients_routes import _client_to_dict, list_clients
+    from routes.exercises_routes import list_exercises
+    from routes.load_weigths_routes import list_load_weights
+    from routes.workouts_routes import list_workouts
+
+    n = args.rows
+    with app.app_context():
+        seed_coaches(db, 1, clients_per_coach=n)
+        seed_exercises(db, n)
+        seed_workouts(db, n, [1], list(range(1, n + 1)))
+        seed_load_weights(db, n)
+
+    # page sizes are the endpoints' maximums
+    cases = [
+        ('clients', '/clients/?limit=200',
+         lambda: jsonify([_client_to_dict(c) for c in
+                          Client.query.order_by(Client.id.desc()).limit(200).all()]).get_data(),
+         list_clients),
+        ('workouts', '/workouts/?limit=200',
+         lambda: jsonify([w.to_dict() for w in
+                          Workout.query.order_by(Workout.created_at.desc(), Workout.id.desc())
+                          .limit(200).all()]).get_data(),
+         list_workouts),
+        ('load-weights', '/load-weights/?load_type_id=1&page_size=2000',
+         lambda: jsonify([lw.to_dict() for lw in
+                          LoadWeight.query.filter_by(unit='kg', load_type_id=1)
+                          .order_by(LoadWeight.value.asc()).limit(2000).all()]).get_data(),
+         list_load_weights),
+        ('exercises (minimal)', '/exercises/?page_size=500',
+         lambda: jsonify([{'id': e.id, 'name': e.name, 'load_type_id': e.load_type_id} for e in
+                          Exercise.query.order_by(Exercise.id.asc()).limit(500).all()]).get_data(),
+         list_exercises),
+    ]
+
+    for name, url, old, view in cases:
+        measure(app, db, f'{name}: ORM objects', url, old, args.repeat)
+        measure(app, db, f'{name}: projection', url, lambda: view().get_data(), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_serializers.py
+"""
+Serialization cost after the query: ORM objects + to_dict + jsonify vs.
+column SELECT + compiled row encoder + fast JSON (orjson when installed).
+
+    python benchmarks/bench_serializers.py [--workouts 20000] [--exercises 500]
+"""
+import argparse
+
+from _common import (make_app, report, seed_coaches, seed_exercise_tags, seed_exercises,
+                     seed_workouts, timed)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workouts', type=int, default=20000)
+    parser.add_argument('--exercises', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app = make_app()
+    from flask import jsonify
+    from sqlalchemy.orm import joinedload
+    from db import db
+    from models import Exercise, Workout
+    from routes.exercises_routes import eager_options
+    from utils import serializers
+
+    with app.app_context():
+        seed_coaches(db, 1, clients_per_coach=1)
+        seed_exercises(db, args.exercises)
+        seed_exercise_tags(db, args.exercises)
+        seed_workouts(db, args.workouts, [1], list(range(1, args.exercises + 1)))
+
+    print(f"fast JSON encoder: {'orjson' if serializers.orjson else 'stdlib json'}")
+    client = app.test_client()
+
+    with app.test_request_context():
+        def old_workouts():
+            items = (Workout.query.options(joinedload(Workout.exercise))
+                     .filter_by(client_id=1).order_by(Workout.id.desc()).all())
+            return jsonify([w.to_dict() for w in items]).get_data()
+
+        def old_exercises():
+            q = Exercise.query
+            for opt in eager_options():
+                q = q.options(opt)
+            items = q.order_by(Exercise.id.asc()).limit(args.exercises).all()
+            return jsonify([e.to_dict() for e in items]).get_data()
+
+        report(f'to_dict + jsonify, {args.workouts} workouts', timed(old_workouts, args.repeat))
+        report(f'to_dict + jsonify, {args.exercises} exercises', timed(old_exercises, max(1, args.repeat // 5)))
+
+    report('GET /workouts/by-client/1', timed(lambda: client.get('/workouts/by-client/1'), args.repeat))
+    report('GET /workouts/by-client/1?fields=..', timed(
+        lambda: client.get('/workouts/by-client/1?fields=created_at,weight,reps,sets'), args.repeat))
+    report(f'GET /exercises/?full=1&page_size={args.exercises}', timed(
+        lambda: client.get(f'/exercises/?full=1&page_size={args.exercises}'), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/bench_timezone_resolver.py
+"""
+p50/p99 of city -> time zone resolution.
+
+    python benchmarks/bench_timezone_resolver.py [--live]
+
+--live also times the old path (a Nominatim HTTP call + TimezoneFinder per
+lookup); it needs network access and is rate limited by Nominatim, so keep
+--live-n small.
+"""
+import argparse
+
+from _common import make_app, timed, report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', type=int, default=5000)
+    parser.add_argument('--live', action='store_true')
+    parser.add_argument('--live-n', type=int, default=10)
+    args = parser.parse_args()
+
+    app = make_app()
+    from utils import timezone_utils as tzu
+
+    with app.app_context():
+        cities = [e['name'] for e in tzu.Gazetteer.from_csv(tzu.DEFAULT_GAZETTEER_PATH)._index.values()]
+        cities = list(dict.fromkeys(cities))
+        it = iter(cities * (args.n // len(cities) + 1))
+
+        # cold: empty LRU + empty resolved_cities -> gazetteer + insert
+        tzu.clear_cache()
+        report('gazetteer (cold, persists row)', timed(lambda: tzu.get_time_zone_for_city(next(it)), len(cities)))
+
+        # warm DB: rows exist, LRU dropped
+        tzu.clear_cache()
+        it = iter(cities)
+        report('resolved_cities table hit', timed(lambda: tzu.get_time_zone_for_city(next(it)), len(cities)))
+
+        # hot: LRU
+        it = iter(cities * (args.n // len(cities) + 1))
+        report('in-process LRU hit', timed(lambda: tzu.get_time_zone_for_city(next(it)), args.n))
+
+        if args.live:
+            it = iter(cities)
+            report('current path (Nominatim + TimezoneFinder)',
+                   timed(lambda: tzu._geocode_time_zone(next(it)), min(args.live_n, len(cities))))
+
+
+if __name__ == '__main__':
+    main()
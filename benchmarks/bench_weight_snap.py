@@ -0,0 +1,90 @@
+# benchmarks/bench_weight_snap.py
+"""
+Weight ladders: GET /exercises/<id>/weights and /load-weights/ from the
+cached ladders vs. the old per-request queries, and snapping a program's
+worth of targets with one POST /load-weights/snap vs. one lookup per target.
+
+    python benchmarks/bench_weight_snap.py [--weights 800] [--targets 200] [--repeat 50]
+
+Exits non-zero if warm ladder reads issue any SQL (query-count regression check).
+"""
+import argparse
+import random
+import sys
+
+from _common import count_queries, make_app, report, seed_exercises, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--weights', type=int, default=800, help='weights per unit (load type 1)')
+    parser.add_argument('--targets', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    app = make_app()
+    from flask import jsonify
+    from db import db
+    from models import Exercise, LoadWeight
+    from routes.exercises_routes import eager_options
+
+    with app.app_context():
+        seed_exercises(db, 50)
+        rows = [{'value': 0.5 * i, 'unit': unit, 'load_type_id': 1}
+                for unit in ('kg', 'lbs') for i in range(1, args.weights + 1)]
+        db.session.execute(LoadWeight.__table__.insert(), rows)
+        db.session.commit()
+        engine = db.engine
+
+    rnd = random.Random(5)
+    targets = [{'rm': rnd.uniform(40, 200), 'rm_percentage': rnd.choice((60, 65, 70, 75, 80, 85))}
+               for _ in range(args.targets)]
+    client = app.test_client()
+    body = {'exercise_id': 1, 'unit': 'kg', 'targets': targets}
+
+    urls = ('/exercises/1/weights', '/load-weights/?load_type_id=1', '/load-weights/by-exercise/1/')
+    for url in urls:
+        client.get(url)  # warm: builds the catalog snapshot + ladders
+    failed = False
+    for url in urls:
+        with count_queries(engine) as n:
+            r = client.get(url)
+        ok = r.status_code == 200 and n[0] == 0
+        failed |= not ok
+        print(f"{url:<35} queries={n[0]}  {'ok' if ok else 'FAIL'}")
+        report(f'GET {url}', timed(lambda: client.get(url), args.repeat))
+    report(f'POST /load-weights/snap x{args.targets}', timed(lambda: client.post('/load-weights/snap', json=body),
+                                                            args.repeat))
+
+    with app.test_request_context():
+        def old_weights():
+            q = Exercise.query
+            for opt in eager_options():
+                q = q.options(opt)
+            ex = q.get_or_404(1)
+            ws = (LoadWeight.query.filter(LoadWeight.load_type_id == ex.load_type_id, LoadWeight.unit == 'kg')
+                  .order_by(LoadWeight.value.asc()).all())
+            return jsonify([w.to_dict() for w in ws]).get_data()
+
+        def old_snap_each():
+            # one nearest-weight lookup per target, as a client without /snap would do
+            out = []
+            for t in targets:
+                target = t['rm'] * t['rm_percentage'] / 100.0
+                below = (db.session.query(LoadWeight.value)
+                         .filter(LoadWeight.load_type_id == 1, LoadWeight.unit == 'kg', LoadWeight.value <= target)
+                         .order_by(LoadWeight.value.desc()).limit(1).scalar())
+                above = (db.session.query(LoadWeight.value)
+                         .filter(LoadWeight.load_type_id == 1, LoadWeight.unit == 'kg', LoadWeight.value >= target)
+                         .order_by(LoadWeight.value.asc()).limit(1).scalar())
+                out.append((below, above))
+            return out
+
+        report('old exercise_weights (eager + query)', timed(old_weights, args.repeat))
+        report(f'old per-target SQL x{args.targets}', timed(old_snap_each, max(1, args.repeat // 10)))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/bench_worker_startup.py
+"""
+Per-worker startup time and memory for the time zone machinery (Linux only).
+
+    python benchmarks/bench_worker_startup.py [--workers 4]
+
+1. import cost of the app with lazy init vs. the old eager TimezoneFinder build
+2. forked "workers" that each geocode once, with and without the polygon data
+   preloaded in the parent: Pss (proportional share) drops when pages are shared.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from _common import ROOT, make_app
+
+IMPORT_SNIPPET = """
+import os, sys, time, tempfile
+sys.path.insert(0, {root!r})
+os.environ['DATABASE_URL'] = 'sqlite:///' + tempfile.mkstemp(suffix='.db')[1]
+t0 = time.perf_counter()
+import app
+if {eager}:
+    from utils.timezone_utils import get_timezone_finder, get_geolocator
+    get_timezone_finder(); get_geolocator()
+elapsed = (time.perf_counter() - t0) * 1000
+rss = [l for l in open('/proc/self/status') if l.startswith('VmRSS')][0].split()[1]
+print(f'{{elapsed:.1f}} {{rss}}')
+"""
+
+
+def _smaps(pid):
+    out = {}
+    with open(f'/proc/{pid}/smaps_rollup') as fh:
+        for line in fh:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:', 'Private_Dirty:'):
+                out[parts[0][:-1]] = int(parts[1])
+    return out
+
+
+def import_cost(eager):
+    code = IMPORT_SNIPPET.format(root=ROOT, eager=eager)
+    res = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    ms, rss = res.stdout.split()
+    return float(ms), int(rss)
+
+
+def forked_workers(n, preload):
+    from utils import timezone_utils as tzu
+    tzu._timezone_finder = None
+    if preload:
+        tzu.preload_timezone_finder()
+        import gc
+        gc.freeze()
+
+    children = []
+    for _ in range(n):
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(r)
+            t0 = time.perf_counter()
+            tzu.get_timezone_finder().timezone_at(lng=-3.70, lat=40.41)
+            os.write(w, f'{(time.perf_counter() - t0) * 1000:.1f}'.encode())
+            os.close(w)
+            time.sleep(2)
+            os._exit(0)
+        os.close(w)
+        children.append((pid, r))
+
+    rows = []
+    for pid, r in children:
+        first_ms = float(os.read(r, 64).decode())
+        os.close(r)
+        rows.append((first_ms, _smaps(pid)))
+    for pid, _ in children:
+        os.waitpid(pid, 0)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    for eager in (False, True):
+        ms, rss = import_cost(eager)
+        label = 'eager (old import-time build)' if eager else 'lazy import'
+        print(f'{label:<32} startup={ms:8.1f} ms  VmRSS={rss / 1024:7.1f} MiB')
+
+    make_app()
+    for preload in (False, True):
+        rows = forked_workers(args.workers, preload)
+        pss = sum(s['Pss'] for _, s in rows) / len(rows) / 1024
+        priv = sum(s['Private_Dirty'] for _, s in rows) / len(rows) / 1024
+        first = sum(ms for ms, _ in rows) / len(rows)
+        label = 'workers, master preload' if preload else 'workers, no preload'
+        print(f'{label:<32} first geocode={first:7.1f} ms  Pss={pss:7.1f} MiB  Private_Dirty={priv:7.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
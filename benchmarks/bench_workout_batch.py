@@ -0,0 +1,85 @@
+# benchmarks/bench_workout_batch.py
+"""
+Bulk workout import: one POST /workouts/batch vs. the same rows sent one by
+one to POST /workouts/, in rows per second. Also checks that the batch path
+issues a handful of statements rather than one per row (id check, INSERT
+executemany in multi-row chunks, workouts_count UPDATE) and that both paths
+derive the same metrics.
+
+    python benchmarks/bench_workout_batch.py [--rows 5000] [--single 500] [--clients 200]
+"""
+import argparse
+import random
+import sys
+import time
+
+from _common import count_queries, make_app, seed_coaches, seed_exercises, workout_row
+
+DERIVED = ('total_tempo', 'tut', 'total_rest', 'density')
+
+
+def payload(row):
+    """A request body: inputs only, the server derives the rest."""
+    body = {k: v for k, v in row.items() if k not in DERIVED and k != 'created_at'}
+    body['rest_per_set'] = 90
+    return body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000, help='rows per batch call')
+    parser.add_argument('--single', type=int, default=500, help='rows posted one at a time')
+    parser.add_argument('--clients', type=int, default=200)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+    from models import Client, Workout
+
+    with app.app_context():
+        seed_coaches(db, 1, clients_per_coach=args.clients)
+        seed_exercises(db, 200)
+        client_ids = db.session.execute(db.select(Client.id)).scalars().all()
+        engine = db.engine
+
+    rnd = random.Random(13)
+    bodies = [payload(workout_row(rnd.choice(client_ids), rnd.randint(1, 200), None, rnd))
+              for _ in range(max(args.rows, args.single))]
+    client = app.test_client()
+
+    t0 = time.perf_counter()
+    single_ids = []
+    for body in bodies[:args.single]:
+        r = client.post('/workouts/', json=body)
+        assert r.status_code == 201, r.json
+        single_ids.append(r.json['id'])
+    single = time.perf_counter() - t0
+
+    with count_queries(engine) as n:
+        t0 = time.perf_counter()
+        r = client.post('/workouts/batch', json={'workouts': bodies[:args.rows]})
+        batch = time.perf_counter() - t0
+    assert r.status_code == 201, r.json
+    batch_ids = r.json['ids']
+
+    print(f"single-row POST x{args.single:<6} {args.single / single:10.0f} rows/s")
+    print(f"batch POST     x{args.rows:<6} {args.rows / batch:10.0f} rows/s  "
+          f"({batch * 1000:.1f} ms, {n[0]} statements)")
+
+    failed = n[0] > 3 + args.rows // 500  # id check + chunked insert + count update
+    with app.app_context():
+        fields = [getattr(Workout, f) for f in DERIVED]
+        one = db.session.execute(db.select(*fields).where(Workout.id.in_(single_ids)).order_by(Workout.id)).all()
+        many = db.session.execute(db.select(*fields).where(Workout.id.in_(batch_ids[:args.single]))
+                                  .order_by(Workout.id)).all()
+        same = [tuple(a) for a in one] == [tuple(b) for b in many]
+        counts = db.session.execute(db.select(db.func.sum(Client.workouts_count))).scalar()
+        total = db.session.execute(db.select(db.func.count(Workout.id))).scalar()
+    print(f"derived metrics match single-row endpoint: {'ok' if same else 'FAIL'}")
+    print(f"workouts_count sum == workouts: {'ok' if counts == total else 'FAIL'}")
+    failed |= not same or counts != total
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# benchmarks/bench_workout_lists.py
+"""
+SQL statement count + latency for the workout list endpoints.
+
+    python benchmarks/bench_workout_lists.py [--workouts 5000] [--exercises 500]
+
+Exits non-zero if /workouts/by-client/<id> or /workouts/ issue more than
+EXPECTED_QUERIES statements (query-count regression check).
+"""
+import argparse
+import sys
+
+from _common import count_queries, make_app, report, seed_coaches, seed_exercises, seed_workouts, timed
+
+# by-client: client exists check + workouts (exercise names joined in)
+EXPECTED_QUERIES = 2
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workouts', type=int, default=5000)
+    parser.add_argument('--exercises', type=int, default=500)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+
+    with app.app_context():
+        seed_coaches(db, 1, clients_per_coach=1)
+        seed_exercises(db, args.exercises)
+        seed_workouts(db, args.workouts, [1], list(range(1, args.exercises + 1)))
+        engine = db.engine
+
+    client = app.test_client()
+    failed = False
+    for url in ('/workouts/by-client/1', '/workouts/?client_id=1&limit=200'):
+        with count_queries(engine) as n:
+            r = client.get(url)
+        ok = r.status_code == 200 and n[0] <= EXPECTED_QUERIES
+        failed |= not ok
+        print(f"{url:<36} rows={len(r.json):<6} queries={n[0]}  {'ok' if ok else 'FAIL'}")
+        report(url, timed(lambda: client.get(url), 5))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
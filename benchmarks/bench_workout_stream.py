@@ -0,0 +1,58 @@
+# benchmarks/bench_workout_stream.py
+"""
+/workouts/by-client/<id>: buffered JSON vs. streamed NDJSON.
+Reports time-to-first-byte, total time and peak Python heap (tracemalloc).
+
+    python benchmarks/bench_workout_stream.py [--workouts 1000000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from _common import make_app, seed_coaches, seed_exercises, seed_workouts
+
+
+def measure(client, url, **kwargs):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    resp = client.get(url, buffered=False, **kwargs)
+    it = iter(resp.response)
+    first = next(it, b'')
+    ttfb = time.perf_counter() - t0
+    size = len(first)
+    for chunk in it:
+        size += len(chunk)
+    resp.close()
+    total = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ttfb * 1000, total * 1000, peak / 2**20, size / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workouts', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    app = make_app()
+    from db import db
+
+    with app.app_context():
+        print(f"seeding {args.workouts} workouts ...")
+        seed_coaches(db, 1, clients_per_coach=1)
+        seed_exercises(db, 200)
+        seed_workouts(db, args.workouts, [1], list(range(1, 201)))
+
+    client = app.test_client()
+    for label, url, kw in (
+        ('buffered JSON', '/workouts/by-client/1', {}),
+        ('NDJSON ?stream=1', '/workouts/by-client/1?stream=1', {}),
+        ('NDJSON Accept header', '/workouts/by-client/1', {'headers': {'Accept': 'application/x-ndjson'}}),
+    ):
+        ttfb, total, peak, size = measure(client, url, **kw)
+        print(f"{label:<22} ttfb={ttfb:9.1f} ms  total={total:9.1f} ms  "
+              f"peak heap={peak:8.1f} MiB  body={size:7.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+# gunicorn.conf.py (picked up automatically by `gunicorn app:app` from the project root)
+import gc
+import os
+
+
+def on_starting(server):
+    """
+    TIMEZONE_PRELOAD=1: load the TimezoneFinder polygon data once in the master.
+    Workers are forked afterwards and share those pages copy-on-write instead of
+    each building their own copy on first geocode.
+    """
+    if os.getenv('TIMEZONE_PRELOAD', '0').lower() not in ('1', 'true', 'yes'):
+        return
+    from utils.timezone_utils import preload_timezone_finder
+    preload_timezone_finder()
+    # keep the cyclic GC from touching (and un-sharing) the preloaded objects in workers
+    gc.freeze()
+    server.log.info("Preloaded TimezoneFinder in master (pid %s)", os.getpid())
@@ -6,8 +6,11 @@ from .equipment_model import Equipment
 from .muscular_group_model import MuscularGroup
 from .joint_action import JointAction 
 from .workout_model import Workout
+from .workout_rollup_model import WorkoutRollup
 from .load_type_model import LoadType
 from .load_weight_model import LoadWeight
+from .resolved_city_model import ResolvedCity
+from .catalog_version_model import CatalogVersion
 from .association_model import(
     exercise_primary_muscle, 
     exercise_secondary_muscle, 
@@ -0,0 +1,43 @@
+from db import db
+from datetime import datetime
+
+
+class CatalogVersion(db.Model):
+    """
+    Single row (id=1) bumped whenever exercise reference data changes
+    (exercises, load types, load weights, muscles, muscular groups, joint
+    actions, equipment). Each process compares it with its in-memory catalog
+    snapshot (utils/exercise_catalog.py) and rebuilds when it moved.
+    """
+    __tablename__ = 'catalog_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def ensure():
+        """Create the row if missing (called once at startup)."""
+        if db.session.get(CatalogVersion, 1) is None:
+            db.session.add(CatalogVersion(id=1, version=1))
+            db.session.commit()
+
+    @staticmethod
+    def current():
+        return db.session.execute(
+            db.select(CatalogVersion.version).where(CatalogVersion.id == 1)
+        ).scalar() or 0
+
+    @staticmethod
+    def bump_statement():
+        """UPDATE for the caller's connection/transaction (Core, no ORM flush involved)."""
+        table = CatalogVersion.__table__
+        return (table.update()
+                .where(table.c.id == 1)
+                .values(version=table.c.version + 1, updated_at=datetime.utcnow()))
+
+    def to_dict(self):
+        return {
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
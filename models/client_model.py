@@ -2,6 +2,10 @@ from db import db
 
 class Client(db.Model):
     __tablename__ = 'clients'
+    __table_args__ = (
+        # coach-scoped listing / keyset pagination (ORDER BY id DESC)
+        db.Index('ix_clients_coach_id_id', 'coach_id', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -11,6 +15,14 @@ class Client(db.Model):
     email = db.Column(db.String(100), nullable=True)
     city = db.Column(db.String(100), nullable=False)
     time_zone = db.Column(db.String(100), nullable=False)
+    # 'resolved' | 'pending' (deferred resolution queued) | 'failed'
+    time_zone_status = db.Column(db.String(10), nullable=False, default='resolved', server_default='resolved', index=True)
+    # Coordinates + precomputed H3 cells (see utils/geo_utils.H3_RESOLUTIONS) for "near" lookups
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    h3_r5 = db.Column(db.BigInteger, nullable=True, index=True)
+    h3_r7 = db.Column(db.BigInteger, nullable=True, index=True)
+    h3_r9 = db.Column(db.BigInteger, nullable=True, index=True)
 
     #Foreign key to Coach
     coach_id = db.Column(db.Integer, db.ForeignKey('coaches.id'), nullable=False)
@@ -18,6 +30,47 @@ class Client(db.Model):
     #Foreign key to Workouts
     workouts = db.relationship('Workout', back_populates='client', cascade='all, delete-orphan')
 
+    # Denormalized len(workouts); maintained in routes/workouts_routes.py, repaired by recount_workouts()
+    workouts_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Moves on every workout write of this client; validates per-client caches (utils/progression.py)
+    workouts_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    @staticmethod
+    def bump_workouts_count(client_id, delta):
+        """Atomic in-SQL increment (and workouts_version bump), part of the caller's transaction."""
+        (db.session.query(Client)
+         .filter(Client.id == client_id)
+         .update({Client.workouts_count: Client.workouts_count + delta,
+                  Client.workouts_version: Client.workouts_version + 1}, synchronize_session=False))
+
+    @staticmethod
+    def touch_workouts(client_id):
+        """A workout of this client changed in place: bump workouts_version only."""
+        Client.bump_workouts_count(client_id, 0)
+
+    @staticmethod
+    def bump_workouts_counts(deltas):
+        """bump_workouts_count for many clients ({client_id: delta}) as one executemany UPDATE."""
+        if not deltas:
+            return
+        table = Client.__table__
+        stmt = (table.update()
+                .where(table.c.id == db.bindparam('client_id'))
+                .values(workouts_count=table.c.workouts_count + db.bindparam('delta'),
+                        workouts_version=table.c.workouts_version + 1))
+        db.session.execute(stmt, [{'client_id': cid, 'delta': d} for cid, d in deltas.items()])
+
+    @staticmethod
+    def recount_workouts():
+        """Recompute every workouts_count from the workouts table; returns rows updated."""
+        from models.workout_model import Workout  # local import to avoid circulars
+        actual = (db.select(db.func.count(Workout.id))
+                  .where(Workout.client_id == Client.id)
+                  .scalar_subquery())
+        result = db.session.execute(db.update(Client).values(workouts_count=actual))
+        db.session.commit()
+        return result.rowcount
+
 
     def to_dict(self):
         return {
@@ -29,6 +82,9 @@ class Client(db.Model):
             'email': self.email,
             'city': self.city,
             'time_zone': self.time_zone,
+            'time_zone_status': self.time_zone_status,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'coach_id': self.coach_id,
-            'workouts_count': len(self.workouts) if self.workouts is not None else 0
+            'workouts_count': self.workouts_count or 0
         }
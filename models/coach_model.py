@@ -1,5 +1,5 @@
 from db import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.password_pool import hash_password, needs_rehash, verify_password
 from flask import current_app
 import jwt
 from datetime import datetime, timedelta
@@ -16,7 +16,17 @@ class Coach(db.Model):
     password_hash = db.Column(db.String(128), nullable=False)
     city = db.Column(db.String(100), nullable=False)
     time_zone = db.Column(db.String(100), nullable=False)
+    # 'resolved' | 'pending' (deferred resolution queued) | 'failed'
+    time_zone_status = db.Column(db.String(10), nullable=False, default='resolved', server_default='resolved', index=True)
+    # Coordinates + precomputed H3 cells (see utils/geo_utils.H3_RESOLUTIONS) for "near" lookups
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    h3_r5 = db.Column(db.BigInteger, nullable=True, index=True)
+    h3_r7 = db.Column(db.BigInteger, nullable=True, index=True)
+    h3_r9 = db.Column(db.BigInteger, nullable=True, index=True)
     training_speciality = db.Column(db.String(100), nullable=False)
+    # Bumped on every update; token_required compares it to its cached snapshot (see utils/auth_cache.py)
+    auth_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     # One coach to many clients
     clients = db.relationship('Client', backref='coach', lazy=True)
@@ -27,10 +37,14 @@ class Coach(db.Model):
 
     @password.setter
     def password(self, plain_password):
-        self.password_hash = generate_password_hash(plain_password, method='pbkdf2:sha256')
+        # runs in the bounded hashing pool; may raise PasswordPoolBusy (-> 503)
+        self.password_hash = hash_password(plain_password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return needs_rehash(self.password_hash)
 
     def generate_token(self, expires_in=3600):
         payload = {
@@ -40,16 +54,24 @@ class Coach(db.Model):
         return jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm='HS256')
 
     @staticmethod
-    def verify_token(token):
+    def decode_token(token):
+        """Verified payload ({'coach_id', 'exp'}) or None."""
         try:
-            payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            return payload['coach_id']
+            return jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
 
-    def to_dict(self):
+    @staticmethod
+    def verify_token(token):
+        payload = Coach.decode_token(token)
+        return payload['coach_id'] if payload else None
+
+    def to_dict(self, client_ids=None):
+        """client_ids: precomputed id list (set-based listing); falls back to the lazy relationship."""
+        if client_ids is None:
+            client_ids = [client.id for client in self.clients]
         return {
             'id': self.id,
             'name': self.name,
@@ -59,6 +81,9 @@ class Coach(db.Model):
             'email': self.email,
             'city': self.city,
             'time_zone': self.time_zone,
+            'time_zone_status': self.time_zone_status,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'training_speciality': self.training_speciality,
-            'clients': [client.id for client in self.clients]
+            'clients': client_ids
         }
@@ -0,0 +1,29 @@
+from db import db
+from datetime import datetime
+
+
+class ResolvedCity(db.Model):
+    """
+    Persistent city -> time zone cache. One row per normalized city string,
+    filled from the bundled gazetteer or (optionally) the Nominatim fallback.
+    """
+    __tablename__ = 'resolved_cities'
+
+    id = db.Column(db.Integer, primary_key=True)
+    city_key = db.Column(db.String(200), nullable=False, unique=True, index=True)
+    time_zone = db.Column(db.String(100), nullable=False)
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    source = db.Column(db.String(20), nullable=False)  # 'gazetteer' or 'nominatim'
+    resolved_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'city_key': self.city_key,
+            'time_zone': self.time_zone,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'source': self.source,
+            'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None,
+        }
@@ -8,6 +8,13 @@ class Workout(db.Model):
     It stores key metrics like weight, tempo, TUT (time under tension), rest, and density.
     """
     __tablename__ = 'workouts'
+    __table_args__ = (
+        # keyset pagination: newest first, per client and globally
+        db.Index('ix_workouts_client_created_id', 'client_id', 'created_at', 'id'),
+        db.Index('ix_workouts_created_id', 'created_at', 'id'),
+        # /workouts/schedule: one range scan per client
+        db.Index('ix_workouts_client_scheduled', 'client_id', 'scheduled_for'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -45,6 +52,12 @@ class Workout(db.Model):
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # optional planning/feedback fields (nullable, so add_missing_columns can add them to old databases)
+    scheduled_for = db.Column(db.DateTime, nullable=True)
+    notes = db.Column(db.Text, nullable=True)
+    duration_sec = db.Column(db.Integer, nullable=True)
+    rpe = db.Column(db.Float, nullable=True)
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -70,5 +83,9 @@ class Workout(db.Model):
             "tut": self.tut,
             "total_rest": self.total_rest,
             "density": self.density,
-            "created_at": self.created_at.isoformat() if self.created_at else None
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "scheduled_for": self.scheduled_for.isoformat() if self.scheduled_for else None,
+            "notes": self.notes,
+            "duration_sec": self.duration_sec,
+            "rpe": self.rpe,
         }
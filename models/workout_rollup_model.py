@@ -0,0 +1,35 @@
+from db import db
+
+
+class WorkoutRollup(db.Model):
+    """
+    Per-client training totals per exercise and period (UTC day or ISO week
+    starting Monday). Kept in step with the workouts table by
+    utils/workout_rollups.py in the same transaction as every workout
+    create/update/delete; `flask rebuild-workout-rollups` recomputes it.
+    """
+    __tablename__ = 'workout_rollups'
+
+    client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), primary_key=True)
+    period = db.Column(db.String(5), primary_key=True)  # 'day' | 'week'
+    period_start = db.Column(db.Date, primary_key=True)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercises.id'), primary_key=True)
+
+    workouts = db.Column(db.Integer, nullable=False, default=0)
+    volume = db.Column(db.Float, nullable=False, default=0.0)  # sum of weight * reps * sets
+    tut = db.Column(db.Integer, nullable=False, default=0)
+    total_rest = db.Column(db.Integer, nullable=False, default=0)
+    density_sum = db.Column(db.Float, nullable=False, default=0.0)  # / workouts = mean density
+
+    def to_dict(self):
+        return {
+            'client_id': self.client_id,
+            'exercise_id': self.exercise_id,
+            'period': self.period,
+            'period_start': self.period_start.isoformat(),
+            'workouts': self.workouts,
+            'volume': self.volume,
+            'tut': self.tut,
+            'total_rest': self.total_rest,
+            'density': round(self.density_sum / self.workouts, 2) if self.workouts else 0.0,
+        }
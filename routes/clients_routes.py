@@ -1,12 +1,23 @@
 # clients_routes.py
 
+from datetime import date
 from flask import Blueprint, request, jsonify
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
 from db import db
 from models.client_model import Client
 from models.coach_model import Coach  # to validate coach_id exists
-from utils.timezone_utils import get_time_zone_for_city
+from models.workout_rollup_model import WorkoutRollup
+from utils.timezone_worker import STATUS_PENDING, notify_pending, time_zone_for_write
+from utils.client_search import ilike_filter, ranked_matches
+from utils.serializers import FieldsError, RowSerializer, json_response
+from utils.pagination import CursorError, cursor_page, decode_cursor
+from utils.geo_utils import apply_location, haversine_km, near_query, nearest_first, parse_near_args
+from utils.workout_rollups import PERIODS, series
+from utils.local_time import local_today
+from utils.workout_calendar import CalendarError, calendar, parse_range
+from utils.progression import (
+    DEFAULT_PLATEAU_WINDOW, DEFAULT_TOLERANCE, DEFAULT_WINDOW, FORMULAS, client_progression,
+)
 
 clients_bp = Blueprint("clients", __name__, url_prefix="/clients")
 
@@ -29,10 +40,26 @@ def _client_to_dict(c: Client) -> dict:
         "email": c.email,
         "city": c.city,
         "time_zone": c.time_zone,
+        "time_zone_status": c.time_zone_status,
         "coach_id": c.coach_id,
+        "workouts_count": c.workouts_count or 0,
     }
 
 
+# Same keys as Client.to_dict, read straight from columns for list endpoints
+CLIENT_FIELDS = (
+    "id", "name", "last_name", "profile_name", "phone", "email", "city",
+    "time_zone", "time_zone_status", "latitude", "longitude", "coach_id", "workouts_count",
+)
+CLIENT_ROWS = RowSerializer(Client, {name: getattr(Client, name) for name in CLIENT_FIELDS})
+
+
+@clients_bp.errorhandler(FieldsError)
+@clients_bp.errorhandler(CalendarError)
+def fields_error(e):
+    return jsonify({"error": str(e)}), 400
+
+
 # ---------- create ----------
 
 @clients_bp.route("/", methods=["POST"])
@@ -57,10 +84,8 @@ def create_client():
     if not coach:
         return jsonify({"error": f"Coach {data['coach_id']} not found"}), 404
 
-    # derive time zone from city
-    tz = get_time_zone_for_city(data["city"])
-    if not tz:
-        return jsonify({"error": f"Unknown city '{data['city']}' – cannot determine time zone"}), 400
+    # derive time zone from city (may be left pending in deferred mode)
+    tz, tz_status = time_zone_for_write(data["city"])
 
     # pre-check duplicates for nice UX (DB constraint is still the source of truth)
     if Client.query.filter_by(email=data["email"]).first():
@@ -76,8 +101,12 @@ def create_client():
         email=data["email"],
         city=data["city"],
         time_zone=tz,           # <-- auto-set
+        time_zone_status=tz_status,
         coach_id=data["coach_id"]
     )
+    location_error = apply_location(c, data, city_changed=True)
+    if location_error:
+        return jsonify({"error": location_error}), 400
 
     try:
         db.session.add(c)
@@ -93,6 +122,9 @@ def create_client():
             return jsonify({"error": f"Coach {data['coach_id']} not found"}), 404
         return jsonify({"error": "Constraint failed"}), 400
 
+    if tz_status == STATUS_PENDING:
+        notify_pending()
+
     return jsonify(_client_to_dict(c)), 201
 
 
@@ -103,54 +135,80 @@ def list_clients():
     """
     List clients.
       - ?coach_id=7
-      - ?search=ana
+      - ?search=ana garc  -> every word must prefix-match name, last_name, profile_name,
+        email or city; best matches first (with ?cursor= results stay in id order)
       - ?limit=50&offset=0
-      - ?include_counts=1   -> adds workouts_count via efficient aggregation (optional)
+      - ?cursor=  (empty for the first page) -> keyset pagination on id, newest first;
+        returns {"items": [...], "next_cursor": "..."|null}
+    workouts_count is always included (stored column, see Client.recount_workouts).
+    ?include_counts=1 is still accepted for older callers.
+    ?fields=name,email -> only those columns are SELECTed.
+    Rows are read as plain column tuples (no ORM objects / identity map).
     """
-    q = Client.query
+    names, _ = CLIENT_ROWS.parse_fields(request.args.get("fields"), CLIENT_FIELDS)
+    q = CLIENT_ROWS.select(names)
 
     coach_id = request.args.get("coach_id", type=int)
     if coach_id is not None:
-        q = q.filter(Client.coach_id == coach_id)
+        q = q.where(Client.coach_id == coach_id)
+
+    limit = max(1, min(request.args.get("limit", default=50, type=int), 200))
+    offset = max(0, request.args.get("offset", default=0, type=int))
+    cursor = request.args.get("cursor")
 
+    # indexed search (FTS5 / pg_trgm, see utils/client_search.py); ILIKE only as a fallback
     search = request.args.get("search", type=str)
+    matches = None
     if search:
-        like = f"%{search.strip()}%"
-        q = q.filter(
-            db.or_(
-                Client.name.ilike(like),
-                Client.last_name.ilike(like),
-                Client.profile_name.ilike(like),
-                Client.email.ilike(like),
-                Client.city.ilike(like),
-            )
-        )
+        # offset mode is ranked: only the best offset+limit matches are needed
+        matches = ranked_matches(search, coach_id, top=None if cursor is not None else offset + limit)
+        if matches is not None:
+            q = q.join(matches, matches.c.id == Client.id)
+        else:
+            q = q.where(ilike_filter(search))
+
+    if cursor is not None:
+        if cursor:
+            try:
+                (last_id,) = decode_cursor(cursor, (int,))
+            except CursorError as e:
+                return jsonify({"error": str(e)}), 400
+            q = q.where(Client.id < last_id)
+        rows = db.session.execute(q.order_by(Client.id.desc()).limit(limit + 1))
+        return json_response(cursor_page(CLIENT_ROWS.rows_to_dicts(names, rows), limit, lambda d: (d["id"],)))
+
+    order = (matches.c.rank, Client.id.desc()) if matches is not None else (Client.id.desc(),)
+    rows = db.session.execute(q.order_by(*order).offset(offset).limit(limit))
+    return json_response(CLIENT_ROWS.rows_to_dicts(names, rows))
+
+
+@clients_bp.route("/near", methods=["GET"])
+def clients_near():
+    """
+    Clients within k H3 rings of a point.
+      - ?lat=40.41&lng=-3.70   or   ?city=Madrid
+      - ?k=1 (0..30), ?res=7 (5 | 7 | 9)
+      - ?coach_id=7
+      - ?limit=100 (max 500), nearest first
+    Served from the indexed h3_r<res> column; distances are computed only for the matches.
+    """
+    try:
+        lat, lng, k, res, limit = parse_near_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    limit = max(1, min(request.args.get("limit", default=50, type=int), 200))
-    offset = max(0, request.args.get("offset", default=0, type=int))
-    include_counts = request.args.get("include_counts", default=0, type=int) == 1
-
-    if include_counts:
-        # if your model has a Workout FK, this computes counts without loading all rows
-        from models.workout_model import Workout  # local import to avoid circulars
-        rows = (
-            db.session.query(Client, func.count(Workout.id).label("workouts_count"))
-            .outerjoin(Workout, Workout.client_id == Client.id)
-            .group_by(Client.id)
-            .order_by(Client.id.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
-        )
-        items = []
-        for client, workouts_count in rows:
-            d = _client_to_dict(client)
-            d["workouts_count"] = int(workouts_count or 0)
-            items.append(d)
-        return jsonify(items), 200
-
-    clients = q.order_by(Client.id.desc()).offset(offset).limit(limit).all()
-    return jsonify([_client_to_dict(c) for c in clients]), 200
+    q = near_query(Client, lat, lng, k, res)
+    coach_id = request.args.get("coach_id", type=int)
+    if coach_id is not None:
+        q = q.filter(Client.coach_id == coach_id)
+
+    items = []
+    for c in nearest_first(q, Client, lat, lng, limit).all():
+        d = _client_to_dict(c)
+        d["distance_km"] = round(haversine_km(lat, lng, c.latitude, c.longitude), 3)
+        items.append(d)
+    items.sort(key=lambda d: d["distance_km"])
+    return jsonify(items), 200
 
 
 # ---------- read ----------
@@ -161,6 +219,87 @@ def get_client(client_id: int):
     return jsonify(_client_to_dict(c)), 200
 
 
+@clients_bp.route("/<int:client_id>/stats", methods=["GET"])
+def client_stats(client_id: int):
+    """
+    ?period=week|day (default week) &exercise_id= &from=YYYY-MM-DD &to=YYYY-MM-DD &by_exercise=1
+    -> {"client_id", "period", "items": [{"period_start", "workouts", "volume",
+        "tut", "total_rest", "density"}, ...]} oldest first. Volume is
+    weight * reps * sets, density the mean per workout. Served from
+    workout_rollups only; the workouts table is not read.
+    """
+    if db.session.execute(db.select(Client.id).where(Client.id == client_id)).first() is None:
+        return jsonify({"error": "Client not found"}), 404
+    period = request.args.get("period", "week")
+    if period not in PERIODS:
+        return jsonify({"error": f"period must be one of: {', '.join(PERIODS)}"}), 400
+    try:
+        start, end = (date.fromisoformat(request.args[k]) if request.args.get(k) else None for k in ("from", "to"))
+    except ValueError:
+        return jsonify({"error": "from/to must be dates (YYYY-MM-DD)"}), 400
+    items = series(
+        client_id, period,
+        exercise_id=request.args.get("exercise_id", type=int),
+        start=start, end=end,
+        by_exercise=request.args.get("by_exercise", "").lower() in ("1", "true", "yes"),
+    )
+    return json_response({"client_id": client_id, "period": period, "items": items})
+
+
+@clients_bp.route("/<int:client_id>/calendar", methods=["GET"])
+def client_calendar(client_id: int):
+    """
+    ?from=YYYY-MM-DD &to=YYYY-MM-DD (local dates, default: the 28 days up to
+    the client's today) &period=day|week
+    -> {"client_id", "time_zone", "period", "from", "to", "items": [{"date",
+        "workouts", "volume", "tut", "total_rest", "density"}, ...]}
+    Workouts bucketed by the client's local day (or ISO week), see
+    utils/workout_calendar.py.
+    """
+    row = db.session.execute(db.select(Client.time_zone).where(Client.id == client_id)).first()
+    if row is None:
+        return jsonify({"error": "Client not found"}), 404
+    start, end, period = parse_range(request.args, local_today(row.time_zone))
+    found = calendar([client_id], start, end, period).get(client_id)
+    return json_response({
+        "client_id": client_id,
+        "time_zone": row.time_zone,
+        "period": period,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "items": found["items"] if found else [],
+    })
+
+
+@clients_bp.route("/<int:client_id>/progression", methods=["GET"])
+def client_progression_view(client_id: int):
+    """
+    ?exercise_id= &formula=epley|brzycki &window=4 &plateau_window=6 &tolerance=0.01
+    -> {"client_id", "formula", "exercises": [{"exercise_id", "sessions", "best_e1rm",
+        "latest_e1rm", "latest_rolling", "plateau", "series": [{"date", "e1rm",
+        "rolling", "plateau", "weight", "reps", "rir"}, ...]}, ...]}
+    Estimated 1RM (reps in reserve counted as reps) of the best set per
+    exercise and day; see utils/progression.py. Memoized per client until
+    its workouts change.
+    """
+    formula = request.args.get("formula", "epley").lower()
+    if formula not in FORMULAS:
+        return jsonify({"error": f"formula must be one of: {', '.join(FORMULAS)}"}), 400
+    window = request.args.get("window", default=DEFAULT_WINDOW, type=int)
+    plateau_window = request.args.get("plateau_window", default=DEFAULT_PLATEAU_WINDOW, type=int)
+    tolerance = request.args.get("tolerance", default=DEFAULT_TOLERANCE, type=float)
+    if not (1 <= window <= 52 and 1 <= plateau_window <= 52 and 0 <= tolerance < 1):
+        return jsonify({"error": "window and plateau_window must be 1-52, tolerance in [0, 1)"}), 400
+
+    exercises = client_progression(client_id, formula, window, plateau_window, tolerance)
+    if exercises is None:
+        return jsonify({"error": "Client not found"}), 404
+    exercise_id = request.args.get("exercise_id", type=int)
+    if exercise_id is not None:
+        exercises = [e for e in exercises if e["exercise_id"] == exercise_id]
+    return json_response({"client_id": client_id, "formula": formula, "exercises": exercises})
+
+
 # ---------- update ----------
 
 @clients_bp.route("/<int:client_id>", methods=["PUT", "PATCH"])
@@ -205,10 +344,13 @@ def update_client(client_id: int):
 
     # re-derive time zone if city changed
     if "city" in data:
-        tz = get_time_zone_for_city(c.city)
-        if not tz:
-            return jsonify({"error": f"Unknown city '{c.city}' – cannot determine time zone"}), 400
+        tz, tz_status = time_zone_for_write(c.city)
         c.time_zone = tz
+        c.time_zone_status = tz_status
+
+    location_error = apply_location(c, data, city_changed="city" in data)
+    if location_error:
+        return jsonify({"error": location_error}), 400
 
     try:
         db.session.commit()
@@ -223,6 +365,9 @@ def update_client(client_id: int):
             return jsonify({"error": "Coach not found"}), 404
         return jsonify({"error": "Constraint failed"}), 400
 
+    if c.time_zone_status == STATUS_PENDING:
+        notify_pending()
+
     return jsonify(_client_to_dict(c)), 200
 
 
@@ -231,6 +376,7 @@ def update_client(client_id: int):
 @clients_bp.route("/<int:client_id>", methods=["DELETE"])
 def delete_client(client_id: int):
     c = Client.query.get_or_404(client_id)
+    db.session.execute(db.delete(WorkoutRollup).where(WorkoutRollup.client_id == client_id))
     db.session.delete(c)
     db.session.commit()
     return jsonify({"status": "deleted", "id": client_id}), 200
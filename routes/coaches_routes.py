@@ -1,15 +1,36 @@
 # coaches_routes.py
+from datetime import datetime
 from flask import Blueprint, request, jsonify, current_app
 from sqlalchemy.exc import IntegrityError
 from functools import wraps
 
 from db import db
 from models.coach_model import Coach
-from utils.timezone_utils import get_time_zone_for_city
+from models.client_model import Client
+from models.workout_model import Workout
+from utils.timezone_worker import STATUS_PENDING, notify_pending, time_zone_for_write
+from utils.auth_cache import auth_cache
+from utils.password_pool import PasswordPoolBusy
+from utils.serializers import json_response
+from utils.geo_utils import apply_location, haversine_km, near_query, nearest_first, parse_near_args
+from utils.workout_rollups import window_totals
+from utils.local_time import local_today
+from utils.workout_calendar import CalendarError, calendar, parse_range
 
 coaches_bp = Blueprint("coaches", __name__, url_prefix="/coaches")  # added url_prefix
 
 
+@coaches_bp.errorhandler(CalendarError)
+def calendar_error(e):
+    return jsonify({"error": str(e)}), 400
+
+
+@coaches_bp.errorhandler(PasswordPoolBusy)
+def password_pool_busy(_e):
+    db.session.rollback()
+    return jsonify({"error": "Server busy, please retry"}), 503, {"Retry-After": "1"}
+
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -22,22 +43,75 @@ def token_required(f):
         if not token:
             return jsonify({"message": "Token is missing"}), 401
 
-        coach_id = Coach.verify_token(token)
-        if not coach_id:
-            return jsonify({"message": "Invalid or expired token"}), 401
-
-        coach = Coach.query.get(coach_id)
-        if not coach:
-            return jsonify({"message": "Coach not found"}), 404
+        coach_id = auth_cache.coach_id_for_token(token)
+        if coach_id is None:
+            payload = Coach.decode_token(token)
+            if not payload or not payload.get("coach_id"):
+                return jsonify({"message": "Invalid or expired token"}), 401
+            coach_id = payload["coach_id"]
+            auth_cache.put_token(token, coach_id, payload["exp"])
+
+        coach = auth_cache.get_coach(coach_id)
+        if coach is None:
+            coach = Coach.query.get(coach_id)
+            if not coach:
+                return jsonify({"message": "Coach not found"}), 404
+            auth_cache.put_coach(coach)
 
         return f(coach, *args, **kwargs)
     return decorated
 
 
+def _client_ids_by_coach(coach_ids):
+    """{coach_id: [client ids]} for a page of coaches in one query (ids only, no Client objects)."""
+    out = {cid: [] for cid in coach_ids}
+    if not coach_ids:
+        return out
+    rows = db.session.execute(
+        db.select(Client.coach_id, Client.id)
+        .where(Client.coach_id.in_(coach_ids))
+        .order_by(Client.id.asc())
+    )
+    for coach_id, client_id in rows:
+        out[coach_id].append(client_id)
+    return out
+
+
 @coaches_bp.route("/", methods=["GET"])
 def get_all_coaches():
-    coaches = Coach.query.all()
-    return jsonify([c.to_dict() for c in coaches]), 200
+    """
+    List coaches, paginated: ?limit=100 (max 500) &offset=0.
+    Always two queries (coach page + their client ids), independent of page size.
+    """
+    limit = max(1, min(request.args.get("limit", default=100, type=int), 500))
+    offset = max(0, request.args.get("offset", default=0, type=int))
+
+    coaches = Coach.query.order_by(Coach.id.asc()).offset(offset).limit(limit).all()
+    client_ids = _client_ids_by_coach([c.id for c in coaches])
+    return jsonify([c.to_dict(client_ids=client_ids[c.id]) for c in coaches]), 200
+
+
+@coaches_bp.route("/near", methods=["GET"])
+def coaches_near():
+    """
+    Coaches within k H3 rings of a point: ?lat=&lng= or ?city=, plus ?k=1&res=7,
+    nearest first, at most ?limit=100 (max 500).
+    Uses the indexed h3_r<res> cell column instead of scanning and measuring every row.
+    """
+    try:
+        lat, lng, k, res, limit = parse_near_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    coaches = nearest_first(near_query(Coach, lat, lng, k, res), Coach, lat, lng, limit).all()
+    client_ids = _client_ids_by_coach([c.id for c in coaches])
+    items = []
+    for c in coaches:
+        d = c.to_dict(client_ids=client_ids[c.id])
+        d["distance_km"] = round(haversine_km(lat, lng, c.latitude, c.longitude), 3)
+        items.append(d)
+    items.sort(key=lambda d: d["distance_km"])
+    return jsonify(items), 200
 
 
 @coaches_bp.route("/<int:coach_id>", methods=["GET"])
@@ -76,9 +150,7 @@ def register_coach():
     if Coach.query.filter_by(profile_name=data["profile_name"]).first():
         return jsonify({"error": "Profile name already exists"}), 409
 
-    time_zone = get_time_zone_for_city(data["city"])
-    if not time_zone:
-        return jsonify({"error": f"Unknown city '{data['city']}' – cannot determine time zone"}), 400
+    time_zone, tz_status = time_zone_for_write(data["city"])
 
     try:
         coach = Coach(
@@ -89,12 +161,18 @@ def register_coach():
             email=data["email"],
             city=data["city"],
             time_zone=time_zone,
+            time_zone_status=tz_status,
             training_speciality=data["training_speciality"],
         )
         coach.password = data["password"]
+        location_error = apply_location(coach, data, city_changed=True)
+        if location_error:
+            return jsonify({"error": location_error}), 400
 
         db.session.add(coach)
         db.session.commit()
+        if tz_status == STATUS_PENDING:
+            notify_pending()
         return jsonify(coach.to_dict()), 201
 
     except IntegrityError as ie:
@@ -127,10 +205,16 @@ def update_coach(coach_id):
         coach.password = data["password"]  # re-hash
 
     if "city" in data:
-        tz = get_time_zone_for_city(data["city"])
-        if not tz:
-            return jsonify({"error": f"Unknown city '{data['city']}' – cannot determine time zone"}), 400
+        tz, tz_status = time_zone_for_write(data["city"])
         coach.time_zone = tz
+        coach.time_zone_status = tz_status
+
+    location_error = apply_location(coach, data, city_changed="city" in data)
+    if location_error:
+        return jsonify({"error": location_error}), 400
+
+    # other workers' cached snapshots of this coach stop matching (see utils/auth_cache.py)
+    coach.auth_version = Coach.auth_version + 1
 
     try:
         db.session.commit()
@@ -143,6 +227,13 @@ def update_coach(coach_id):
             return jsonify({"error": "Profile name already exists"}), 409
         return jsonify({"error": "Constraint failed"}), 400
 
+    # profile/password changes must not be served from a stale cached identity (this worker;
+    # the others notice the bumped auth_version on their next hit)
+    auth_cache.invalidate_coach(coach.id)
+
+    if coach.time_zone_status == STATUS_PENDING:
+        notify_pending()
+
     return jsonify(coach.to_dict()), 200
 
 
@@ -151,6 +242,7 @@ def delete_coach(coach_id):
     coach = Coach.query.get_or_404(coach_id)
     db.session.delete(coach)
     db.session.commit()
+    auth_cache.invalidate_coach(coach_id)
     return jsonify({"message": f"Coach {coach_id} deleted"}), 200
 
 
@@ -165,6 +257,15 @@ def login_coach():
 
     coach = Coach.query.filter_by(email=email).first()
     if coach and coach.check_password(password):
+        # transparently upgrade hashes made with old cost parameters
+        if coach.password_needs_rehash():
+            try:
+                coach.password = password
+            except PasswordPoolBusy:
+                pass  # the password checked out: log in now, upgrade the hash next time
+            else:
+                db.session.commit()
+                auth_cache.invalidate_coach(coach.id)
         token = coach.generate_token()
         return jsonify({
             "token": token,
@@ -180,3 +281,71 @@ def login_coach():
 @token_required
 def get_my_profile(current_coach):
     return jsonify(current_coach.to_dict()), 200
+
+
+DASHBOARD_WINDOWS = (7, 28)
+
+
+@coaches_bp.route("/me/dashboard", methods=["GET"])
+@token_required
+def get_my_dashboard(current_coach):
+    """
+    Every client of the logged-in coach with workouts_count, last_workout_at
+    and workouts/volume/density over the last 7 and 28 UTC days (today
+    included). Two queries whatever the number of clients or workouts:
+      1. the clients, with their latest created_at as a correlated MAX that
+         the (client_id, created_at, id) index answers with one seek each
+      2. the daily workout_rollups of those clients, summed per client
+    """
+    today = datetime.utcnow().date()
+    last_workout_at = (db.select(db.func.max(Workout.created_at))
+                       .where(Workout.client_id == Client.id)
+                       .scalar_subquery())
+    clients = db.session.execute(
+        db.select(Client.id, Client.name, Client.last_name, Client.profile_name,
+                  Client.workouts_count, last_workout_at.label("last_workout_at"))
+        .where(Client.coach_id == current_coach.id)
+        .order_by(Client.id.asc())
+    ).all()
+    coach_client_ids = db.select(Client.id).where(Client.coach_id == current_coach.id)
+    totals = window_totals(coach_client_ids, today, DASHBOARD_WINDOWS)
+    empty = {}
+    for n in DASHBOARD_WINDOWS:
+        empty.update({f"workouts_{n}d": 0, f"volume_{n}d": 0.0, f"density_{n}d": 0.0})
+
+    items = []
+    for c in clients:
+        d = {
+            "id": c.id,
+            "name": c.name,
+            "last_name": c.last_name,
+            "profile_name": c.profile_name,
+            "workouts_count": c.workouts_count or 0,
+            "last_workout_at": c.last_workout_at.isoformat() if c.last_workout_at else None,
+        }
+        d.update(totals.get(c.id, empty))
+        items.append(d)
+    return json_response({"coach_id": current_coach.id, "as_of": today.isoformat(), "clients": items})
+
+
+@coaches_bp.route("/me/calendar", methods=["GET"])
+@token_required
+def get_my_calendar(current_coach):
+    """
+    ?from= &to= (local dates, default: the 28 days up to the coach's today) &period=day|week
+    -> {"coach_id", "period", "from", "to", "clients": [{"client_id", "time_zone",
+        "items": [...same as /clients/<id>/calendar...]}, ...]}
+    Each client's workouts are bucketed in that client's own time zone, so
+    "Monday" means the client's Monday. Clients without workouts in the
+    range are left out. One query whatever the number of clients or zones.
+    """
+    start, end, period = parse_range(request.args, local_today(current_coach.time_zone))
+    coach_client_ids = db.select(Client.id).where(Client.coach_id == current_coach.id)
+    found = calendar(coach_client_ids, start, end, period)
+    return json_response({
+        "coach_id": current_coach.id,
+        "period": period,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "clients": [{"client_id": cid, **found[cid]} for cid in sorted(found)],
+    })
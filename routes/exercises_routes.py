@@ -1,9 +1,15 @@
 # exercises_routes.py
-from flask import Blueprint, jsonify, request
-from sqlalchemy.orm import joinedload
+from flask import Blueprint, abort, current_app, jsonify, request
+from sqlalchemy.orm import joinedload, selectinload
 
 from models.exercise_model import Exercise
-from models.load_weight_model import LoadWeight
+from utils.exercise_catalog import (
+    EXERCISE_COLLECTIONS, EXERCISE_FIELDS, EXERCISE_ROWS, MINIMAL_FIELDS, exercise_catalog,
+)
+from utils.exercise_search import SearchError, facet_index, parse_filters
+from utils.exercise_similarity import similarity_index
+from utils.serializers import FieldsError, json_response
+from utils.weight_ladders import weight_ladders
 
 exercises_bp = Blueprint("exercises", __name__, url_prefix="/exercises")
 
@@ -11,25 +17,42 @@ exercises_bp = Blueprint("exercises", __name__, url_prefix="/exercises")
 def eager_options():
     """
     Eager-load all relationships we serialize to avoid N+1 queries.
+    load_type is many-to-one, so it is joined (still one row per exercise).
+    Each collection gets its own SELECT ... WHERE exercise_id IN (...):
+    joining all five at once returns the product of their sizes per exercise.
+    Catalog reads go through utils/exercise_catalog.py; this is for ORM callers.
     """
     return (
         joinedload(Exercise.load_type),
-        joinedload(Exercise.muscular_groups),
-        joinedload(Exercise.primary_muscles),
-        joinedload(Exercise.secondary_muscles),
-        joinedload(Exercise.joint_actions),
-        joinedload(Exercise.equipments),
+        selectinload(Exercise.muscular_groups),
+        selectinload(Exercise.primary_muscles),
+        selectinload(Exercise.secondary_muscles),
+        selectinload(Exercise.joint_actions),
+        selectinload(Exercise.equipments),
     )
 
 
+@exercises_bp.errorhandler(FieldsError)
+@exercises_bp.errorhandler(SearchError)
+def fields_error(e):
+    return jsonify({"error": str(e)}), 400
+
+
 @exercises_bp.route("/", methods=["GET"])
 def list_exercises():
     """
     GET /exercises/            -> minimal list (id, name, load_type_id)
-    GET /exercises/?full=1     -> full list with all fields (uses Exercise.to_dict)
+    GET /exercises/?full=1     -> full list with all fields (same shape as Exercise.to_dict)
+    GET /exercises/?fields=id,name,body_part,equipments -> only those fields
     Optional: basic pagination ?page=1&page_size=50 (works for both modes)
+    Pages come pre-serialized from utils/exercise_catalog.py.
     """
     full = (request.args.get("full") or "").lower() in ("1", "true", "yes")
+    names, collections = EXERCISE_ROWS.parse_fields(
+        request.args.get("fields"), EXERCISE_FIELDS if full else MINIMAL_FIELDS, extra=EXERCISE_COLLECTIONS
+    )
+    if full and not request.args.get("fields"):
+        collections = tuple(EXERCISE_COLLECTIONS)
 
     # pagination (optional)
     try:
@@ -41,27 +64,46 @@ def list_exercises():
     except ValueError:
         page_size = 100
 
-    query = Exercise.query
-    if full:
-        # only eager load when we need full objects
-        for opt in eager_options():
-            query = query.options(opt)
-
-    # simple pagination
-    items = (
-        query.order_by(Exercise.id.asc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
+    # served from the in-memory catalog snapshot: no SQL between version checks
+    catalog = exercise_catalog.snapshot()
+    if not request.args.get("fields"):
+        return current_app.response_class(catalog.page_json(full, page, page_size), mimetype="application/json")
+    return json_response(catalog.page_items(page, page_size, names + collections))
+
+
+@exercises_bp.route("/search", methods=["GET"])
+def search_exercises():
+    """
+    GET /exercises/search?body_part=Upper Body&movement_pattern=Push,Pull&equipment=2,4&equipment_match=all
+    Facets: body_part, movement_pattern, plane_motion, resistance_modality,
+    equipment (ids), primary_muscle (ids). Values within a facet are ORed
+    (<facet>_match=all to require every one), facets are ANDed.
+    Returns {"total", "items", "facets": {facet: [{value, [name], count}]}};
+    items take ?full=1 / ?fields= like the list. Answered from bitmap indexes
+    over the catalog snapshot, no SQL.
+    """
+    full = (request.args.get("full") or "").lower() in ("1", "true", "yes")
+    names, collections = EXERCISE_ROWS.parse_fields(
+        request.args.get("fields"), EXERCISE_FIELDS if full else MINIMAL_FIELDS, extra=EXERCISE_COLLECTIONS
     )
+    if full and not request.args.get("fields"):
+        collections = tuple(EXERCISE_COLLECTIONS)
 
-    if full:
-        return jsonify([e.to_dict() for e in items]), 200
+    try:
+        page = max(int(request.args.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+    try:
+        page_size = max(min(int(request.args.get("page_size", 100)), 500), 1)
+    except ValueError:
+        page_size = 100
 
-    # minimal list for fast navigation
-    return jsonify(
-        [{"id": e.id, "name": e.name, "load_type_id": e.load_type_id} for e in items]
-    ), 200
+    catalog = exercise_catalog.snapshot()
+    index = facet_index(catalog)
+    bits, facets = index.search(parse_filters(request.args))
+    fields = names + collections
+    items = [{n: catalog.by_id[i][n] for n in fields} for i in index.ids(bits, (page - 1) * page_size, page_size)]
+    return json_response({"total": bits.bit_count(), "items": items, "facets": facets})
 
 
 @exercises_bp.route("/<int:exercise_id>/", methods=["GET"])
@@ -69,12 +111,39 @@ def get_exercise(exercise_id: int):
     """
     Full detail for a single exercise (always full).
     """
-    query = Exercise.query
-    for opt in eager_options():
-        query = query.options(opt)
+    body = exercise_catalog.snapshot().json_by_id.get(exercise_id)
+    if body is None:
+        abort(404)
+    return current_app.response_class(body, mimetype="application/json")
 
-    ex = query.get_or_404(exercise_id)
-    return jsonify(ex.to_dict()), 200
+
+@exercises_bp.route("/<int:exercise_id>/similar", methods=["GET"])
+def similar_exercises(exercise_id: int):
+    """
+    GET /exercises/<id>/similar?k=10&equipment=1,4
+    Substitutes ranked by cosine similarity of muscular group / primary muscle
+    involvement percentages. With ?equipment=, only exercises that need
+    nothing outside that set are returned.
+    """
+    k = max(min(request.args.get("k", default=10, type=int), 100), 1)
+    equipment = None
+    if "equipment" in request.args:
+        try:
+            equipment = {int(v) for v in request.args["equipment"].split(",") if v.strip()}
+        except ValueError:
+            return jsonify({"error": "equipment takes ids"}), 400
+
+    catalog = exercise_catalog.snapshot()
+    ranked = similarity_index(catalog).similar(exercise_id, k, equipment)
+    if ranked is None:
+        abort(404)
+    return json_response({
+        "exercise_id": exercise_id,
+        "items": [
+            {**{n: catalog.by_id[i][n] for n in MINIMAL_FIELDS}, "score": round(score, 4)}
+            for i, score in ranked
+        ],
+    })
 
 
 @exercises_bp.route("/<int:exercise_id>/weights", methods=["GET"])
@@ -86,19 +155,12 @@ def exercise_weights(exercise_id: int):
     if unit not in ("kg", "lbs"):
         unit = "kg"
 
-    # we only need load_type_id here; to keep it simple reuse the eager query
-    query = Exercise.query
-    for opt in eager_options():
-        query = query.options(opt)
-    ex = query.get_or_404(exercise_id)
+    # load_type_id from the catalog snapshot, weights from the cached ladder: no SQL
+    catalog = exercise_catalog.snapshot()
+    ex = catalog.get(exercise_id)
+    if ex is None:
+        abort(404)
 
-    q = (
-        LoadWeight.query
-        .filter(LoadWeight.load_type_id == ex.load_type_id, LoadWeight.unit == unit)
-        .order_by(LoadWeight.value.asc())
-    )
-    rows = q.all()
-    return jsonify(
-        [{"id": w.id, "value": w.value, "unit": w.unit, "load_type_id": w.load_type_id} for w in rows]
-    ), 200
+    ladder = weight_ladders(catalog).get(ex["load_type_id"], unit)
+    return current_app.response_class(ladder.json(), mimetype="application/json")
 
@@ -1,32 +1,32 @@
 # routes/load_weights_routes.py
-from flask import Blueprint, request, jsonify
-from sqlalchemy.orm import joinedload
-from models.load_weight_model import LoadWeight
-from models.exercise_model import Exercise
+from flask import Blueprint, request, jsonify, abort
+from utils.exercise_catalog import exercise_catalog
+from utils.serializers import json_response
+from utils.weight_ladders import parse_targets, weight_ladders
 
 load_weights_bp = Blueprint('load_weights', __name__, url_prefix='/load-weights')
 
+MAX_SNAP_TARGETS = 1000
+
+
 def normalize_unit(u: str) -> str:
     if not u:
         return 'kg'
     u = u.lower().strip()
     return 'kg' if u not in ('kg', 'lbs') else u
 
-def paginate(query, page: int, page_size: int):
-    items = (query
-             .offset((page - 1) * page_size)
-             .limit(page_size)
-             .all())
-    return items
+def paginate(ladder, page: int, page_size: int):
+    """One page of a cached weight ladder (see utils/weight_ladders.py)."""
+    return list(ladder.page(page, page_size))
 
 @load_weights_bp.route('/', methods=['GET'])
 def list_load_weights():
     """
     GET /load-weights/?unit=kg|lbs&load_type_id=<int>&page=1&page_size=500
-    Returns load weights ordered ascending.
+    Returns load weights ordered ascending, from the in-process ladders (no SQL).
     """
     unit = normalize_unit(request.args.get('unit'))
-    load_type_id = request.args.get('load_type_id', type=int)
+    load_type_id = request.args.get('load_type_id', type=int) or None
 
     # pagination (optional)
     try:
@@ -38,17 +38,9 @@ def list_load_weights():
     except ValueError:
         page_size = 500
 
-    q = LoadWeight.query.filter(LoadWeight.unit == unit)
-    if load_type_id:
-        q = q.filter(LoadWeight.load_type_id == load_type_id)
-
-    q = q.order_by(LoadWeight.value.asc())
-    rows = paginate(q, page, page_size)
-
-    return jsonify([
-        {'id': r.id, 'value': r.value, 'unit': r.unit, 'load_type_id': r.load_type_id}
-        for r in rows
-    ]), 200
+    # load_type_id=None -> the ladder of every load type in this unit
+    ladder = weight_ladders(exercise_catalog.snapshot()).get(load_type_id, unit)
+    return json_response(paginate(ladder, page, page_size))
 
 @load_weights_bp.route('/by-exercise/<int:exercise_id>/', methods=['GET'])
 def list_load_weights_by_exercise(exercise_id: int):
@@ -58,11 +50,13 @@ def list_load_weights_by_exercise(exercise_id: int):
     """
     unit = normalize_unit(request.args.get('unit'))
 
-    ex = (Exercise.query
-          .options(joinedload(Exercise.load_type))
-          .get_or_404(exercise_id))
+    catalog = exercise_catalog.snapshot()
+    ex = catalog.get(exercise_id)
+    if ex is None:
+        abort(404)
+    load_type_id = ex['load_type_id']
 
-    if not ex.load_type_id:
+    if not load_type_id:
         return jsonify({'error': 'Exercise has no load_type_id'}), 400
 
     # pagination (optional)
@@ -75,13 +69,50 @@ def list_load_weights_by_exercise(exercise_id: int):
     except ValueError:
         page_size = 500
 
-    q = (LoadWeight.query
-         .filter(LoadWeight.unit == unit,
-                 LoadWeight.load_type_id == ex.load_type_id)
-         .order_by(LoadWeight.value.asc()))
-    rows = paginate(q, page, page_size)
+    ladder = weight_ladders(catalog).get(load_type_id, unit)
+    return json_response(paginate(ladder, page, page_size))
+
+@load_weights_bp.route('/snap', methods=['POST'])
+def snap_load_weights():
+    """
+    POST /load-weights/snap
+      {"load_type_id": 1 | "exercise_id": 3, "unit": "kg",
+       "targets": [52.3, {"rm": 100, "rm_percentage": 75}, ...]}
+    -> {"load_type_id", "unit", "items": [{"target", "nearest", "floor", "ceil"}, ...]}
+    Every target is snapped with bisect on the cached ladder (ties go to the
+    lighter weight; floor/ceil are null off the ends). Invalid targets get
+    {"target": null, "error": ...} in place, the rest are still answered.
+    """
+    data = request.get_json(silent=True) or {}
+    unit = normalize_unit(data.get('unit'))
+    targets = data.get('targets')
+    if not isinstance(targets, list) or not targets:
+        return jsonify({'error': 'targets must be a non-empty list'}), 400
+    if len(targets) > MAX_SNAP_TARGETS:
+        return jsonify({'error': f'At most {MAX_SNAP_TARGETS} targets per call'}), 400
+
+    catalog = exercise_catalog.snapshot()
+    load_type_id = data.get('load_type_id')
+    if data.get('exercise_id') is not None:
+        try:
+            ex = catalog.get(int(data['exercise_id']))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'exercise_id must be an integer'}), 400
+        if ex is None:
+            abort(404)
+        load_type_id = ex['load_type_id']
+    try:
+        load_type_id = int(load_type_id)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'load_type_id (integer) or exercise_id is required'}), 400
 
-    return jsonify([
-        {'id': r.id, 'value': r.value, 'unit': r.unit, 'load_type_id': r.load_type_id}
-        for r in rows
-    ]), 200
+    ladder = weight_ladders(catalog).get(load_type_id, unit)
+    values, errors = parse_targets(targets)
+    items = []
+    for i, target in enumerate(values):
+        if i in errors:
+            items.append({'target': None, 'error': errors[i]})
+            continue
+        nearest, floor, ceil = ladder.snap(target)
+        items.append({'target': target, 'nearest': nearest, 'floor': floor, 'ceil': ceil})
+    return json_response({'load_type_id': load_type_id, 'unit': unit, 'items': items})
@@ -1,13 +1,26 @@
 # routes/workouts_routes.py
-from flask import Blueprint, request, jsonify
+import math
+from datetime import datetime
+import numpy as np
+from flask import Blueprint, request, jsonify, abort
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from werkzeug.exceptions import BadRequest
 from db import db
 from models.workout_model import Workout
 from models.client_model import Client
+from models.exercise_model import Exercise
+from utils.serializers import FieldsError, RowSerializer, json_response, ndjson_response, wants_ndjson
+from utils.pagination import CursorError, cursor_page, decode_cursor
+from utils.workout_batch import DERIVED_INT_FIELDS, INT_RANGE, compute_batch, insert_rows
+from utils import workout_rollups
+from utils.workout_schedule import ScheduleError, coerce_optional, parse_window
 
 workouts_bp = Blueprint("workouts", __name__, url_prefix="/workouts")
 
+MAX_BATCH_WORKOUTS = 5000
+MAX_SCHEDULE_LIMIT = 1000
+
 # ---------- helpers ----------
 
 def _json():
@@ -32,30 +45,46 @@ def _model_to_dict(w: Workout) -> dict:
         "created_at": getattr(w, "created_at", None).isoformat() if getattr(w, "created_at", None) else None,
     }
 
+def _with_exercise_name(query):
+    """Fetch exercise names in the same SELECT (to_dict reads w.exercise.name) instead of one lazy load per exercise."""
+    return query.options(joinedload(Workout.exercise).load_only(Exercise.id, Exercise.name))
+
 def _set_attrs_from_payload(instance, payload, allowed_fields):
     for key in allowed_fields:
         if key in payload:
             setattr(instance, key, payload[key])
 
+def _in_range(val, field, errors):
+    """Integer columns are 32-bit on Postgres; same bound as the batch endpoint."""
+    if not INT_RANGE[0] <= val <= INT_RANGE[1]:
+        errors.append(f"{field} is out of range")
+        return None
+    return val
+
 def _to_int(val, field, errors):
-    """Coerce to int; record error if invalid/empty."""
+    """Coerce to int; record error if invalid/empty, fractional, non-finite or out of range."""
     if val is None or val == "":
         errors.append(f"{field} is required and must be a number")
         return None
     try:
-        return int(val)
-    except (TypeError, ValueError):
+        if isinstance(val, float) and not val.is_integer():
+            raise ValueError(val)
+        return _in_range(int(val), field, errors)
+    except (TypeError, ValueError, OverflowError):
         errors.append(f"{field} must be an integer")
         return None
 
 def _to_float(val, field, errors):
-    """Coerce to float; record error if invalid/empty."""
+    """Coerce to float; record error if invalid/empty, non-finite or out of range."""
     if val is None or val == "":
         errors.append(f"{field} is required and must be a number")
         return None
     try:
-        return float(val)
-    except (TypeError, ValueError):
+        val = float(val)
+        if not math.isfinite(val):
+            raise ValueError(val)
+        return _in_range(val, field, errors)
+    except (TypeError, ValueError, OverflowError):
         errors.append(f"{field} must be a number")
         return None
 
@@ -96,19 +125,23 @@ def _compute_derived(data, errors):
     # total_rest: allow caller to provide either total_rest directly OR rest_per_set
     rest_per_set = request.json.get("rest_per_set") if request.is_json else None
     if rest_per_set not in (None, ""):
-        try:
-            rps = int(rest_per_set)
-            data["total_rest"] = max(0, (sets if sets is not None else 0) - 1) * rps
-        except (TypeError, ValueError):
+        rps = _to_int(rest_per_set, "rest_per_set", [])
+        if rps is None:
             errors.append("rest_per_set must be an integer if provided")
+            data["total_rest"] = 0
+        else:
+            data["total_rest"] = max(0, (sets if sets is not None else 0) - 1) * rps
     else:
         # Coerce provided total_rest if present, else 0
         traw = data.get("total_rest", 0)
-        try:
-            data["total_rest"] = int(traw)
-        except (TypeError, ValueError):
+        total_rest = _to_int(0 if traw in (None, "") else traw, "total_rest", [])
+        if total_rest is None:
             errors.append("total_rest must be an integer")
-            data["total_rest"] = 0
+        data["total_rest"] = total_rest or 0
+
+    for field in DERIVED_INT_FIELDS:
+        if isinstance(data[field], int) and not INT_RANGE[0] <= data[field] <= INT_RANGE[1]:
+            errors.append(f"{field} is out of range")
 
     # density
     denom = (data["tut"] or 0) + (data["total_rest"] or 0)
@@ -156,6 +189,36 @@ ALLOWED_CREATE_FIELDS = {
 ALLOWED_UPDATE_FIELDS = ALLOWED_CREATE_FIELDS
 
 
+# ---------- list serialization ----------
+# Same keys as Workout.to_dict, selected as plain columns (exercise_name via an outer join).
+WORKOUT_FIELDS = (
+    "id", "exercise_id", "exercise_name", "client_id", "units",
+    "rm", "rm_percentage", "max_repetitions", "rir_repetitions",
+    "cc_tempo", "iso_tempo_one", "ecc_tempo", "iso_tempo_two",
+    "reps", "sets", "exercise_time", "rom",
+    "weight", "repetitions", "total_tempo", "tut", "total_rest", "density",
+    "created_at", "scheduled_for", "notes", "duration_sec", "rpe",
+)
+WORKOUT_ROWS = RowSerializer(
+    Workout,
+    {name: (Exercise.name if name == "exercise_name" else getattr(Workout, name)) for name in WORKOUT_FIELDS},
+    joins={"exercise_name": lambda stmt: stmt.outerjoin(Exercise, Exercise.id == Workout.exercise_id)},
+)
+
+
+def _workout_fields():
+    """?fields=id,weight,reps -> validated column tuple (400 on unknown names)."""
+    names, _ = WORKOUT_ROWS.parse_fields(request.args.get("fields"), WORKOUT_FIELDS)
+    return names
+
+
+@workouts_bp.errorhandler(FieldsError)
+@workouts_bp.errorhandler(CursorError)
+@workouts_bp.errorhandler(ScheduleError)
+def bad_query_param(e):
+    return jsonify({"error": str(e)}), 400
+
+
 # ---------- routes ----------
 
 @workouts_bp.route("/", methods=["POST"])
@@ -186,6 +249,7 @@ def create_workout():
 
     # Make sure repetitions (NOT NULL) is provided & numeric
     data["repetitions"] = _to_int(data.get("repetitions"), "repetitions", errors)
+    coerce_optional(data, errors)
 
     # If any coercion/validation failed, return 400 with details
     if errors:
@@ -196,6 +260,9 @@ def create_workout():
 
     try:
         db.session.add(w)
+        db.session.flush()  # created_at default
+        Client.bump_workouts_count(client.id, +1)
+        workout_rollups.apply(added=[workout_rollups.source(w)])
         db.session.commit()
     except IntegrityError as ie:
         db.session.rollback()
@@ -204,30 +271,170 @@ def create_workout():
     return jsonify(_model_to_dict(w)), 201
 
 
+@workouts_bp.route("/batch", methods=["POST"])
+def create_workouts_batch():
+    """
+    POST /workouts/batch
+      {"workouts": [{...same fields as POST /workouts/...}, ...], "atomic": false}
+    -> {"created": n, "ids": [ascending], "errors": [{"index": i, "errors": [...]}, ...]}
+    Rows are validated and their derived metrics computed column-wise
+    (utils/workout_batch.py); client and exercise ids are checked with one
+    query. Valid rows go in with a single executemany INSERT and one
+    workouts_count UPDATE for all clients, in one transaction (the driver
+    may split the INSERT into a few multi-row statements). With
+    "atomic": true nothing is inserted when any row is invalid.
+    201 when every row was created, 207 when some were, 400 when none.
+    """
+    data = _json()
+    items = data.get("workouts")
+    atomic = data.get("atomic")
+    if atomic is None:
+        atomic = False
+    elif not isinstance(atomic, bool):
+        return jsonify({"error": "atomic must be true or false"}), 400
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "workouts must be a non-empty list"}), 400
+    if len(items) > MAX_BATCH_WORKOUTS:
+        return jsonify({"error": f"At most {MAX_BATCH_WORKOUTS} workouts per call"}), 400
+
+    cols, errors = compute_batch(items)
+
+    # every referenced client/exercise id, checked in one round trip
+    client_ids, exercise_ids = cols["client_id"], cols["exercise_id"]
+    wanted_clients = {int(v) for v in client_ids[~np.isnan(client_ids)]}
+    wanted_exercises = {int(v) for v in exercise_ids[~np.isnan(exercise_ids)]}
+    found = db.session.execute(db.union_all(
+        db.select(db.literal("c"), Client.id).where(Client.id.in_(wanted_clients)),
+        db.select(db.literal("e"), Exercise.id).where(Exercise.id.in_(wanted_exercises)),
+    )).all()
+    known_clients = {i for kind, i in found if kind == "c"}
+    known_exercises = {i for kind, i in found if kind == "e"}
+    for i in np.flatnonzero(~np.isin(client_ids, list(known_clients)) & ~np.isnan(client_ids)):
+        errors[i].append(f"Client {int(client_ids[i])} not found")
+    for i in np.flatnonzero(~np.isin(exercise_ids, list(known_exercises)) & ~np.isnan(exercise_ids)):
+        errors[i].append(f"Exercise {int(exercise_ids[i])} not found")
+
+    failed = [{"index": i, "errors": errs} for i, errs in enumerate(errors) if errs]
+    valid = [i for i, errs in enumerate(errors) if not errs]
+    if not valid or (failed and atomic):
+        return jsonify({"error": "Validation failed", "created": 0, "ids": [], "errors": failed}), 400
+
+    rows = insert_rows(cols, valid)
+    created_at = datetime.utcnow()
+    deltas = {}
+    for row in rows:
+        row["created_at"] = created_at
+        deltas[row["client_id"]] = deltas.get(row["client_id"], 0) + 1
+    stmt = Workout.__table__.insert().returning(Workout.__table__.c.id)
+    try:
+        ids = sorted(db.session.execute(stmt, rows).scalars())
+        Client.bump_workouts_counts(deltas)
+        workout_rollups.apply(added=rows)
+        db.session.commit()
+    except IntegrityError as ie:
+        db.session.rollback()
+        return jsonify({"error": "Invalid data or constraint failed", "details": str(ie.orig)}), 400
+
+    return jsonify({"created": len(ids), "ids": ids, "errors": failed}), 207 if failed else 201
+
+
 @workouts_bp.route("/", methods=["GET"])
 def list_workouts():
-    q = Workout.query
+    """
+    ?client_id=&exercise_id=&limit=50&offset=0
+    ?fields=id,weight,reps -> sparse rows; only those columns are SELECTed.
+    ?cursor= (empty for the first page) -> keyset pagination on (created_at, id),
+      newest first; returns {"items": [...], "next_cursor": "..."|null}.
+    """
+    names = _workout_fields()
+    cursor = request.args.get("cursor")
+    hidden_created_at = cursor is not None and "created_at" not in names
+    if hidden_created_at:
+        names = names + ("created_at",)  # needed for the next cursor
+    q = WORKOUT_ROWS.select(names)
 
     client_id = request.args.get("client_id", type=int)
     if client_id is not None:
-        q = q.filter(Workout.client_id == client_id)
+        q = q.where(Workout.client_id == client_id)
 
     exercise_id = request.args.get("exercise_id", type=int)
     if exercise_id is not None:
-        q = q.filter(Workout.exercise_id == exercise_id)
+        q = q.where(Workout.exercise_id == exercise_id)
 
     limit = request.args.get("limit", default=50, type=int)
     limit = max(1, min(limit, 200))
     offset = request.args.get("offset", default=0, type=int)
     offset = max(0, offset)
 
-    items = q.order_by(Workout.id.desc()).offset(offset).limit(limit).all()
-    return jsonify([_model_to_dict(w) for w in items]), 200
+    if cursor is not None:
+        # rows without created_at (legacy) have no position in this ordering
+        q = q.where(Workout.created_at.isnot(None))
+        if cursor:
+            created_at, last_id = decode_cursor(cursor, (str, int))
+            try:
+                created_at = datetime.fromisoformat(created_at)
+            except (TypeError, ValueError):
+                raise CursorError("Invalid cursor")
+            q = q.where(db.tuple_(Workout.created_at, Workout.id) < db.tuple_(created_at, last_id))
+        rows = db.session.execute(q.order_by(Workout.created_at.desc(), Workout.id.desc()).limit(limit + 1))
+        page = cursor_page(WORKOUT_ROWS.rows_to_dicts(names, rows), limit, lambda d: (d["created_at"], d["id"]))
+        if hidden_created_at:
+            for d in page["items"]:
+                d.pop("created_at", None)
+        return json_response(page)
+
+    rows = db.session.execute(q.order_by(Workout.id.desc()).offset(offset).limit(limit))
+    return json_response(WORKOUT_ROWS.rows_to_dicts(names, rows))
+
+
+@workouts_bp.route("/schedule", methods=["GET"])
+def list_scheduled_workouts():
+    """
+    ?coach_id= (all of the coach's clients) or ?client_id=, required
+    ?from=&to= ISO dates (whole UTC days, inclusive) or datetimes; default the next 7 days
+    ?fields= / ?limit=200 / ?cursor= as on GET /workouts/
+    -> {"items": [...], "next_cursor": "..."|null}, ordered by (scheduled_for, id).
+    Served by ix_workouts_client_scheduled: one index range scan per client.
+    """
+    coach_id = request.args.get("coach_id", type=int)
+    client_id = request.args.get("client_id", type=int)
+    if coach_id is not None:
+        clients = db.select(Client.id).where(Client.coach_id == coach_id)
+    elif client_id is not None:
+        clients = [client_id]
+    else:
+        return jsonify({"error": "coach_id or client_id is required"}), 400
+
+    lo, hi = parse_window(request.args)
+    limit = max(1, min(request.args.get("limit", default=200, type=int), MAX_SCHEDULE_LIMIT))
+    names = _workout_fields()
+    hidden = tuple(f for f in ("scheduled_for", "id") if f not in names)
+    q = (WORKOUT_ROWS.select(names + hidden)
+         .where(Workout.client_id.in_(clients), Workout.scheduled_for >= lo, Workout.scheduled_for < hi))
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        scheduled_for, last_id = decode_cursor(cursor, (str, int))
+        try:
+            scheduled_for = datetime.fromisoformat(scheduled_for)
+        except (TypeError, ValueError):
+            raise CursorError("Invalid cursor")
+        # the plain bound keeps the index range tight; the tuple breaks ties on id
+        q = q.where(Workout.scheduled_for >= scheduled_for,
+                    db.tuple_(Workout.scheduled_for, Workout.id) > db.tuple_(scheduled_for, last_id))
+
+    rows = db.session.execute(q.order_by(Workout.scheduled_for, Workout.id).limit(limit + 1))
+    page = cursor_page(WORKOUT_ROWS.rows_to_dicts(names + hidden, rows), limit,
+                       lambda d: (d["scheduled_for"], d["id"]))
+    for d in page["items"]:
+        for f in hidden:
+            d.pop(f, None)
+    return json_response(page)
 
 
 @workouts_bp.route("/<int:workout_id>", methods=["GET"])
 def get_workout(workout_id: int):
-    w = Workout.query.get_or_404(workout_id)
+    w = _with_exercise_name(Workout.query).get_or_404(workout_id)
     return jsonify(_model_to_dict(w)), 200
 
 
@@ -235,6 +442,8 @@ def get_workout(workout_id: int):
 def update_workout(workout_id: int):
     data = _json()
     w = Workout.query.get_or_404(workout_id)
+    old_client_id = w.client_id
+    old_source = workout_rollups.source(w)
 
     # if moving workout to a different client, validate it exists
     if "client_id" in data:
@@ -255,6 +464,11 @@ def update_workout(workout_id: int):
         except (TypeError, ValueError):
             return jsonify({"error": "exercise_id must be an integer"}), 400
 
+    errors = []
+    coerce_optional(data, errors)
+    if errors:
+        return jsonify({"error": "Validation failed", "details": errors}), 400
+
     # If any of the dependent fields are present, recompute derived
     depends = {"cc_tempo","iso_tempo_one","ecc_tempo","iso_tempo_two","reps","sets","weight","total_rest","tut","total_tempo"}
     if any(k in data for k in depends) or any(k in data for k in ("rm","rm_percentage","max_repetitions","rir_repetitions","exercise_time","rom")):
@@ -290,6 +504,17 @@ def update_workout(workout_id: int):
 
     _set_attrs_from_payload(w, data, ALLOWED_UPDATE_FIELDS)
 
+    # keep clients.workouts_count in step when a workout moves between clients
+    if w.client_id != old_client_id:
+        Client.bump_workouts_count(old_client_id, -1)
+        Client.bump_workouts_count(w.client_id, +1)
+
+    new_source = workout_rollups.source(w)
+    if new_source != old_source:
+        workout_rollups.apply(removed=[old_source], added=[new_source])
+    if w.client_id == old_client_id:
+        Client.touch_workouts(w.client_id)
+
     try:
         db.session.commit()
     except IntegrityError as ie:
@@ -303,13 +528,27 @@ def update_workout(workout_id: int):
 def delete_workout(workout_id: int):
     w = Workout.query.get_or_404(workout_id)
     db.session.delete(w)
+    Client.bump_workouts_count(w.client_id, -1)
+    workout_rollups.apply(removed=[workout_rollups.source(w)])
     db.session.commit()
     return jsonify({"status": "deleted", "id": workout_id}), 200
 
 
 @workouts_bp.route("/by-client/<int:client_id>", methods=["GET"])
 def list_workouts_by_client(client_id: int):
-    Client.query.get_or_404(client_id)  # ensure client exists
-    q = Workout.query.filter_by(client_id=client_id).order_by(Workout.id.desc())
-    items = q.all()
-    return jsonify([_model_to_dict(w) for w in items]), 200
+    """
+    Full workout history of a client, newest first (?fields= supported).
+    ?stream=1 or Accept: application/x-ndjson -> chunked NDJSON, constant memory.
+    """
+    # ensure client exists (id probe only, no ORM object)
+    if db.session.execute(db.select(Client.id).where(Client.id == client_id)).first() is None:
+        abort(404)
+    names = _workout_fields()
+    q = WORKOUT_ROWS.select(names).where(Workout.client_id == client_id).order_by(Workout.id.desc())
+
+    # full history can be huge: stream it line by line instead of building one list
+    if wants_ndjson():
+        return ndjson_response(WORKOUT_ROWS, names, q)
+
+    rows = db.session.execute(q)
+    return json_response(WORKOUT_ROWS.rows_to_dicts(names, rows))
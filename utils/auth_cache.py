@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy.orm import make_transient_to_detached
+
+from db import db
+
+
+class AuthCache:
+    """
+    Per-process cache used by token_required:
+      - verified JWT -> coach_id, kept until the token's own `exp`
+      - coach_id -> column snapshot of the Coach row, kept for AUTH_CACHE_TTL seconds
+
+    Snapshots are plain dicts; on a hit they are re-attached to the current
+    session with merge(load=False), so no SELECT is issued and no ORM instance
+    is shared between sessions/threads. Writes in this process invalidate
+    immediately. Other workers cannot be told, so every hit is confirmed with
+    one primary-key read of coaches.auth_version (bumped by each update): a
+    changed version or a deleted row drops the snapshot and falls back to a
+    full load. The cache therefore saves the row load and ORM construction,
+    not the round trip, and is never staler than the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = OrderedDict()   # token -> (coach_id, expires_at)
+        self._coaches = OrderedDict()  # coach_id -> (snapshot, expires_at)
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- config ----------
+
+    @staticmethod
+    def _ttl():
+        return current_app.config.get('AUTH_CACHE_TTL', 30)
+
+    @staticmethod
+    def _maxsize():
+        return current_app.config.get('AUTH_CACHE_SIZE', 1024)
+
+    def enabled(self):
+        return self._ttl() > 0
+
+    # ---------- internals ----------
+
+    def _get(self, store, key):
+        now = time.time()
+        with self._lock:
+            entry = store.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del store[key]
+                self.misses += 1
+                return None
+            store.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _put(self, store, key, value, expires_at):
+        maxsize = self._maxsize()
+        with self._lock:
+            store[key] = (value, expires_at)
+            store.move_to_end(key)
+            while len(store) > maxsize:
+                store.popitem(last=False)
+
+    # ---------- tokens ----------
+
+    def coach_id_for_token(self, token):
+        if not self.enabled():
+            return None
+        return self._get(self._tokens, token)
+
+    def put_token(self, token, coach_id, exp):
+        if self.enabled():
+            self._put(self._tokens, token, coach_id, float(exp))
+
+    # ---------- coaches ----------
+
+    def get_coach(self, coach_id):
+        """Cached Coach attached to the current session, or None on a miss."""
+        if not self.enabled():
+            return None
+        snapshot = self._get(self._coaches, coach_id)
+        if snapshot is None:
+            return None
+        from models.coach_model import Coach  # local import to avoid circulars
+        current = db.session.execute(
+            db.select(Coach.auth_version).where(Coach.id == coach_id)).scalar()
+        if current != snapshot['auth_version']:  # updated or deleted by another worker
+            self.invalidate_coach(coach_id)
+            return None
+        coach = Coach(**snapshot)
+        make_transient_to_detached(coach)
+        return db.session.merge(coach, load=False)
+
+    def put_coach(self, coach):
+        if not self.enabled():
+            return
+        snapshot = {c.key: getattr(coach, c.key) for c in coach.__mapper__.column_attrs}
+        self._put(self._coaches, coach.id, snapshot, time.time() + self._ttl())
+
+    def invalidate_coach(self, coach_id):
+        with self._lock:
+            self._coaches.pop(coach_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self._coaches.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'tokens': len(self._tokens),
+                'coaches': len(self._coaches),
+            }
+
+
+auth_cache = AuthCache()
@@ -0,0 +1,160 @@
+import logging
+import re
+
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from db import db
+from models.client_model import Client
+
+logger = logging.getLogger(__name__)
+
+# searchable columns and their bm25 weight (SQLite); order is the FTS column order
+SEARCH_COLUMNS = (("name", 10.0), ("last_name", 10.0), ("profile_name", 5.0), ("email", 2.0), ("city", 1.0))
+FTS_TABLE = "clients_fts"
+TRGM_INDEX = "ix_clients_search_trgm"
+MIN_TRGM_TOKEN = 3  # pg_trgm cannot use the index for shorter patterns
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokens(term):
+    return _TOKEN_RE.findall((term or "").lower())
+
+
+# ---------- setup ----------
+
+def _fts_columns():
+    return ", ".join(name for name, _ in SEARCH_COLUMNS)
+
+
+def _fts_values(prefix):
+    return ", ".join(f"{prefix}.{name}" for name, _ in SEARCH_COLUMNS)
+
+
+def _install_fts5(conn):
+    """
+    FTS5 table holding 'c<coach_id>' + the searchable columns, keyed by
+    rowid = clients.id and maintained by triggers, so every writer (routes,
+    worker, bulk loads) keeps it in sync. Returns True if it was just created.
+    """
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"), {"n": FTS_TABLE}
+    ).first()
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"coach_key, {_fts_columns()}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+    ))
+    insert = (f"INSERT INTO {FTS_TABLE}(rowid, coach_key, {_fts_columns()}) "
+              f"VALUES (new.id, 'c' || new.coach_id, {_fts_values('new')});")
+    delete = f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id;"
+    conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON clients BEGIN {insert} END"))
+    conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON clients BEGIN {delete} END"))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF coach_id, {_fts_columns()} ON clients "
+        f"BEGIN {delete} {insert} END"
+    ))
+    return exists is None
+
+
+def _search_expression():
+    """lower(name || ' ' || last_name || ...), the expression the trigram index is built on."""
+    # literal_column keeps the SQL identical to the index expression in _install_trgm
+    parts = [db.func.coalesce(getattr(Client, name), db.literal_column("''")) for name, _ in SEARCH_COLUMNS]
+    expr = parts[0]
+    for part in parts[1:]:
+        expr = expr.op("||")(db.literal_column("' '")).op("||")(part)
+    return db.func.lower(expr)
+
+
+def _install_trgm(conn):
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    expr = " || ' ' || ".join(f"coalesce({name}, '')" for name, _ in SEARCH_COLUMNS)
+    conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS {TRGM_INDEX} ON clients USING gin (lower({expr}) gin_trgm_ops)"
+    ))
+    return False
+
+
+def install(engine):
+    """
+    Create the search index for this database; returns the backend name
+    ('fts5', 'trgm') or None when unavailable (ILIKE fallback).
+    """
+    installers = {"sqlite": ("fts5", _install_fts5), "postgresql": ("trgm", _install_trgm)}
+    if engine.dialect.name not in installers:
+        return None
+    backend, installer = installers[engine.dialect.name]
+    try:
+        with engine.begin() as conn:
+            created = installer(conn)
+            if created:
+                rebuild(conn)
+    except DBAPIError as e:
+        logger.warning("Client search index unavailable (%s), falling back to ILIKE: %s", backend, e)
+        return None
+    return backend
+
+
+def rebuild(conn):
+    """Refill the FTS5 table from clients (no-op for pg_trgm, which indexes the table itself)."""
+    if conn.dialect.name != "sqlite":
+        return 0
+    conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    return conn.execute(text(
+        f"INSERT INTO {FTS_TABLE}(rowid, coach_key, {_fts_columns()}) "
+        f"SELECT id, 'c' || coach_id, {_fts_columns()} FROM clients"
+    )).rowcount
+
+
+# ---------- queries ----------
+
+def _fts5_matches(words, coach_id, top):
+    # the coach is a token in the index, so scoping happens inside the FTS lookup;
+    # the search words are limited to the client columns so they never match coach_key
+    query = "{%s} : (%s)" % (" ".join(name for name, _ in SEARCH_COLUMNS),
+                             " AND ".join(f'"{w}"*' for w in words))
+    if coach_id is not None:
+        query = f"coach_key : c{int(coach_id)} AND ({query})"
+    weights = ", ".join(str(weight) for _, weight in SEARCH_COLUMNS)
+    sql = (f"SELECT rowid AS id, bm25({FTS_TABLE}, 0.0, {weights}) AS rank "
+           f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :query")
+    params = {"query": query}
+    if top is not None:
+        sql += " ORDER BY rank LIMIT :top"
+        params["top"] = top
+    return text(sql).bindparams(**params).columns(id=db.Integer, rank=db.Float).subquery("client_matches")
+
+
+def _trgm_matches(words, term, coach_id, top):
+    expr = _search_expression()
+    rank = (-db.func.word_similarity(term.lower(), expr)).label("rank")
+    stmt = db.select(Client.id.label("id"), rank).where(*[expr.contains(w, autoescape=True) for w in words])
+    if coach_id is not None:
+        stmt = stmt.where(Client.coach_id == coach_id)
+    if top is not None:
+        stmt = stmt.order_by(rank).limit(top)
+    return stmt.subquery("client_matches")
+
+
+def ranked_matches(term, coach_id=None, top=None):
+    """
+    Subquery of (id, rank) for clients matching every word of `term`
+    (lower rank = better), limited to the best `top` when given, or None
+    when the index cannot serve it and the caller should use ilike_filter().
+    """
+    words = tokens(term)
+    if not words:
+        return None
+    backend = current_app.config.get("CLIENT_SEARCH_BACKEND")
+    if backend == "fts5":
+        return _fts5_matches(words, coach_id, top)
+    if backend == "trgm" and min(len(w) for w in words) >= MIN_TRGM_TOKEN:
+        return _trgm_matches(words, term, coach_id, top)
+    return None
+
+
+def ilike_filter(term):
+    like = f"%{term.strip()}%"
+    return db.or_(*[getattr(Client, name).ilike(like) for name, _ in SEARCH_COLUMNS])
@@ -0,0 +1,277 @@
+import threading
+import time
+from itertools import chain
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from db import db
+from models.association_model import (
+    exercise_primary_muscle,
+    exercise_secondary_muscle,
+    exercise_muscular_group,
+    exercise_joint_action,
+    exercise_equipment,
+)
+from models.catalog_version_model import CatalogVersion
+from models.equipment_model import Equipment
+from models.exercise_model import Exercise
+from models.joint_action import JointAction
+from models.load_type_model import LoadType
+from models.load_weight_model import LoadWeight
+from models.muscle_model import Muscle
+from models.muscular_group_model import MuscularGroup
+from utils.serializers import RowSerializer, dumps
+
+# Scalar fields of Exercise.to_dict, selected as plain columns (load_type name via an outer join)
+EXERCISE_FIELDS = (
+    "id", "name", "load_type_id", "load_type", "type_training", "movement_category",
+    "body_part", "muscle_action", "movement_pattern", "plane_motion",
+    "joint_involvement", "joint_position", "resistance_modality",
+)
+MINIMAL_FIELDS = ("id", "name", "load_type_id")
+EXERCISE_ROWS = RowSerializer(
+    Exercise,
+    {name: (LoadType.name if name == "load_type" else getattr(Exercise, name)) for name in EXERCISE_FIELDS},
+    joins={"load_type": lambda stmt: stmt.outerjoin(LoadType, LoadType.id == Exercise.load_type_id)},
+)
+
+# collection name -> (association table, target fk column, target model), in Exercise.to_dict order
+EXERCISE_COLLECTIONS = {
+    "muscular_groups": (exercise_muscular_group, exercise_muscular_group.c.muscular_group_id, MuscularGroup),
+    "primary_muscles": (exercise_primary_muscle, exercise_primary_muscle.c.muscle_id, Muscle),
+    "secondary_muscles": (exercise_secondary_muscle, exercise_secondary_muscle.c.muscle_id, Muscle),
+    "equipments": (exercise_equipment, exercise_equipment.c.equipment_id, Equipment),
+    "joint_actions": (exercise_joint_action, exercise_joint_action.c.joint_action_id, JointAction),
+}
+
+# ORM writes to any of these bump CatalogVersion in the same transaction
+# (LoadWeight: the weight ladders in utils/weight_ladders.py hang off the snapshot too)
+CATALOG_MODELS = (Exercise, LoadType, LoadWeight, Muscle, MuscularGroup, JointAction, Equipment)
+
+DEFAULT_PAGE_SIZE = 100
+
+
+class CatalogSnapshot:
+    """
+    The whole exercise catalog at one CatalogVersion, built once and never
+    mutated: full dicts (Exercise.to_dict shape) and their pre-serialized
+    JSON by id, minimal JSON by id, and the default-size pages of both
+    list modes already joined. Callers must not modify returned dicts.
+    Structures computed from a snapshot (facet bitmaps, similarity matrix,
+    weight ladders) hang off it through derived(), so they are rebuilt
+    exactly when the catalog changes.
+    """
+
+    def __init__(self, version, items):
+        self.version = version
+        self.ids = tuple(d["id"] for d in items)
+        self.by_id = {d["id"]: d for d in items}
+        self.json_by_id = {d["id"]: dumps(d) for d in items}
+        self._minimal_json = {d["id"]: dumps({n: d[n] for n in MINIMAL_FIELDS}) for d in items}
+        self._pages = {}
+        for full in (False, True):
+            for start in range(0, max(len(self.ids), 1), DEFAULT_PAGE_SIZE):
+                page = start // DEFAULT_PAGE_SIZE + 1
+                self._pages[(full, page)] = self._join(full, self.ids[start:start + DEFAULT_PAGE_SIZE])
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def derived(self, key, factory):
+        """factory(self), built once per snapshot and key (concurrent first calls build it once)."""
+        value = self._derived.get(key)
+        if value is None:
+            with self._derived_lock:
+                value = self._derived.get(key)
+                if value is None:
+                    value = self._derived[key] = factory(self)
+        return value
+
+    def get(self, exercise_id):
+        return self.by_id.get(exercise_id)
+
+    def page_ids(self, page, page_size):
+        start = (page - 1) * page_size
+        return self.ids[start:start + page_size]
+
+    def page_json(self, full, page, page_size):
+        """JSON array bytes for one page of the minimal or full list."""
+        if page_size == DEFAULT_PAGE_SIZE:
+            cached = self._pages.get((full, page))
+            if cached is not None:
+                return cached
+        return self._join(full, self.page_ids(page, page_size))
+
+    def page_items(self, page, page_size, names):
+        """One page projected to `names` (fresh dicts, safe to hand out)."""
+        return [{n: self.by_id[i][n] for n in names} for i in self.page_ids(page, page_size)]
+
+    def _join(self, full, ids):
+        source = self.json_by_id if full else self._minimal_json
+        return b"[" + b",".join(source[i] for i in ids) + b"]"
+
+
+def _load_per_collection():
+    """Exercises (+ load type name), then one (exercise_id, id, name) query per collection."""
+    items = EXERCISE_ROWS.rows_to_dicts(
+        EXERCISE_FIELDS, db.session.execute(EXERCISE_ROWS.select(EXERCISE_FIELDS).order_by(Exercise.id.asc()))
+    )
+    by_id = {d["id"]: d for d in items}
+    for d in items:
+        for name in EXERCISE_COLLECTIONS:
+            d[name] = []
+    for name, (assoc, fk, target) in EXERCISE_COLLECTIONS.items():
+        rows = db.session.execute(
+            db.select(assoc.c.exercise_id, target.id, target.name)
+            .join(target, target.id == fk)
+            .order_by(assoc.c.exercise_id, target.id)
+        )
+        for exercise_id, item_id, item_name in rows:
+            d = by_id.get(exercise_id)
+            if d is not None:
+                d[name].append({"id": item_id, "name": item_name})
+    return items
+
+
+def _collection_json(name, dialect):
+    """Correlated subquery: the exercise's `name` collection as a JSON array of {id, name}."""
+    assoc, fk, target = EXERCISE_COLLECTIONS[name]
+    if dialect == "postgresql":
+        agg = db.func.coalesce(
+            db.func.json_agg(db.func.json_build_object("id", target.id, "name", target.name)),
+            db.literal_column("'[]'::json"),
+        )
+    else:
+        agg = db.func.json_group_array(db.func.json_object("id", target.id, "name", target.name))
+    subq = (db.select(agg)
+            .select_from(assoc)
+            .join(target, target.id == fk)
+            .where(assoc.c.exercise_id == Exercise.id)
+            .scalar_subquery())
+    return db.type_coerce(subq, db.JSON).label(name)
+
+
+def _load_json_subquery():
+    """One statement, one row per exercise: every collection aggregated to JSON in the database."""
+    dialect = db.engine.dialect.name
+    stmt = EXERCISE_ROWS.select(EXERCISE_FIELDS).add_columns(
+        *[_collection_json(name, dialect) for name in EXERCISE_COLLECTIONS]
+    ).order_by(Exercise.id.asc())
+    items = []
+    for row in db.session.execute(stmt):
+        d = dict(row._mapping)
+        for name in EXERCISE_COLLECTIONS:
+            d[name] = sorted(d[name] or [], key=lambda item: item["id"])
+        items.append(d)
+    return items
+
+
+# CATALOG_LOAD_STRATEGY ('auto' or a key below). Both work on SQLite and Postgres; see
+# benchmarks/bench_exercise_loading.py. json_subquery returns one row per exercise instead
+# of one per tag and needs a single round trip, which pays off over a network; in-process
+# SQLite has no round-trip cost and per_collection is slightly faster there.
+LOAD_STRATEGIES = {
+    "per_collection": _load_per_collection,
+    "json_subquery": _load_json_subquery,
+}
+NETWORKED_JSON_DIALECTS = ("postgresql",)
+
+
+def load_strategy():
+    strategy = current_app.config.get("CATALOG_LOAD_STRATEGY", "auto")
+    if strategy in LOAD_STRATEGIES:
+        return strategy
+    return "json_subquery" if db.engine.dialect.name in NETWORKED_JSON_DIALECTS else "per_collection"
+
+
+def load_snapshot(version, strategy=None):
+    """Read the whole catalog (never a cartesian join) and freeze it as a CatalogSnapshot."""
+    return CatalogSnapshot(version, LOAD_STRATEGIES[strategy or load_strategy()]())
+
+
+class ExerciseCatalog:
+    """
+    Process-local holder of the current CatalogSnapshot.
+
+    The version row is read at most once per CATALOG_CHECK_INTERVAL seconds,
+    so reads in between issue no SQL at all; a changed version triggers a
+    rebuild. Commits in this process that touched catalog models invalidate
+    immediately; other workers pick the change up on their next check.
+    While one thread rebuilds, the others keep serving the previous snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_until = 0.0
+        self.builds = 0
+
+    @staticmethod
+    def _interval():
+        return current_app.config.get('CATALOG_CHECK_INTERVAL', 5)
+
+    def snapshot(self):
+        snap = self._snapshot
+        if snap is not None and time.monotonic() < self._checked_until:
+            return snap
+        if not self._lock.acquire(blocking=snap is None):
+            return snap  # someone else is checking/rebuilding
+        try:
+            if self._snapshot is not None and time.monotonic() < self._checked_until:
+                return self._snapshot
+            version = CatalogVersion.current()  # read before the data, see load_snapshot
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = load_snapshot(version)
+                self.builds += 1
+            self._checked_until = time.monotonic() + self._interval()
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        """Force a version check on the next read."""
+        self._checked_until = 0.0
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+            self._checked_until = 0.0
+
+    def stats(self):
+        snap = self._snapshot
+        return {
+            'version': snap.version if snap else None,
+            'exercises': len(snap) if snap else 0,
+            'builds': self.builds,
+        }
+
+
+exercise_catalog = ExerciseCatalog()
+
+
+# ---------- write tracking ----------
+
+@event.listens_for(Session, 'before_flush')
+def _bump_catalog_version(session, flush_context, instances):
+    if session.info.get('catalog_changed'):
+        return
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, CATALOG_MODELS):
+            session.connection().execute(CatalogVersion.bump_statement())
+            session.info['catalog_changed'] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_catalog(session):
+    if session.info.pop('catalog_changed', False):
+        exercise_catalog.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_catalog_change(session):
+    session.info.pop('catalog_changed', None)
@@ -0,0 +1,122 @@
+# facet name -> (field in the snapshot dict, is a collection of {id, name})
+FACETS = {
+    "body_part": ("body_part", False),
+    "movement_pattern": ("movement_pattern", False),
+    "plane_motion": ("plane_motion", False),
+    "resistance_modality": ("resistance_modality", False),
+    "equipment": ("equipments", True),
+    "primary_muscle": ("primary_muscles", True),
+}
+
+
+class SearchError(ValueError):
+    pass
+
+
+class FacetIndex:
+    """
+    Bitmap index over one CatalogSnapshot. Bit i stands for snapshot.ids[i];
+    each facet value maps to a Python int with the bits of the exercises that
+    have it, so filters are |/& on ints and counts are int.bit_count().
+    Scalar facets are keyed by their string value, collection facets
+    (equipment, primary_muscle) by item id.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.all = (1 << len(snapshot.ids)) - 1
+        self.bits = {facet: {} for facet in FACETS}
+        self.labels = {facet: {} for facet in FACETS}
+        for pos, exercise_id in enumerate(snapshot.ids):
+            d = snapshot.by_id[exercise_id]
+            bit = 1 << pos
+            for facet, (field, is_collection) in FACETS.items():
+                bits, labels = self.bits[facet], self.labels[facet]
+                if is_collection:
+                    for item in d[field]:
+                        bits[item["id"]] = bits.get(item["id"], 0) | bit
+                        labels[item["id"]] = item["name"]
+                elif d[field] is not None:
+                    bits[d[field]] = bits.get(d[field], 0) | bit
+                    labels[d[field]] = d[field]
+
+    def match(self, facet, values, match_all=False):
+        """Bits of exercises having any (or, with match_all, every) of `values`."""
+        bits = self.bits[facet]
+        if match_all:
+            out = self.all
+            for v in values:
+                out &= bits.get(v, 0)
+            return out
+        out = 0
+        for v in values:
+            out |= bits.get(v, 0)
+        return out
+
+    def search(self, filters):
+        """
+        filters: {facet: (values, match_all)}; facets are ANDed together.
+        Returns (result bits, facet counts). Counts for a facet apply every
+        *other* filter, so they show what picking another value would give.
+        """
+        masks = {facet: self.match(facet, values, match_all) for facet, (values, match_all) in filters.items()}
+        result = self.all
+        for m in masks.values():
+            result &= m
+
+        counts = {}
+        for facet in FACETS:
+            base = self.all
+            for other, m in masks.items():
+                if other != facet:
+                    base &= m
+            counts[facet] = sorted(
+                ({"value": value, "name": self.labels[facet][value], "count": (base & bits).bit_count()}
+                 for value, bits in self.bits[facet].items()),
+                key=lambda c: (-c["count"], str(c["name"])),
+            )
+            if not FACETS[facet][1]:
+                for c in counts[facet]:
+                    del c["name"]
+        return result, counts
+
+    def ids(self, bits, offset, limit):
+        """Exercise ids for set bits, in catalog (id) order, skipping `offset` and stopping after `limit`."""
+        out = []
+        ids = self.snapshot.ids
+        flags = bin(bits)[:1:-1]  # bit 0 first; one str.find per hit beats shifting a big int
+        pos = flags.find("1")
+        while pos != -1 and len(out) < limit:
+            if offset:
+                offset -= 1
+            else:
+                out.append(ids[pos])
+            pos = flags.find("1", pos + 1)
+        return out
+
+
+def facet_index(snapshot):
+    """FacetIndex for `snapshot`, rebuilt only when the catalog snapshot changed."""
+    return snapshot.derived("facet_index", FacetIndex)
+
+
+def parse_filters(args):
+    """
+    ?body_part=Upper Body,Lower Body&equipment=1,2&equipment_match=all
+    Values are comma-separated (or repeated params); collection facets take ids.
+    """
+    filters = {}
+    for facet, (_, is_collection) in FACETS.items():
+        raw = [part.strip() for value in args.getlist(facet) for part in value.split(",") if part.strip()]
+        if not raw:
+            continue
+        if is_collection:
+            try:
+                raw = [int(v) for v in raw]
+            except ValueError:
+                raise SearchError(f"{facet} takes ids")
+        match = (args.get(f"{facet}_match") or "any").lower()
+        if match not in ("any", "all"):
+            raise SearchError(f"{facet}_match must be 'any' or 'all'")
+        filters[facet] = (raw, match == "all")
+    return filters
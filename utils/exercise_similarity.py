@@ -0,0 +1,91 @@
+import numpy as np
+
+from db import db
+from models.association_model import exercise_muscular_group, exercise_primary_muscle
+
+# (association table, column id, percentage column) blocks of the involvement vector
+BLOCKS = (
+    (exercise_muscular_group, exercise_muscular_group.c.muscular_group_id, exercise_muscular_group.c.mg_percentage),
+    (exercise_primary_muscle, exercise_primary_muscle.c.muscle_id, exercise_primary_muscle.c.pm_percentage),
+)
+
+
+def _unit_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class SimilarityIndex:
+    """
+    Dense exercise x muscle involvement matrix for one CatalogSnapshot.
+
+    Columns are every muscular group (mg_percentage) followed by every
+    primary muscle (pm_percentage). Each block is L2-normalized per row
+    before the rows are normalized again, so both blocks weigh the same and
+    a dot product is the cosine similarity. Exercises without percentages
+    are all-zero rows and never match. Equipment is kept as a boolean
+    exercise x equipment matrix for the "only what I have" constraint.
+    """
+
+    def __init__(self, snapshot, percentages):
+        self.snapshot = snapshot
+        self.position = {exercise_id: i for i, exercise_id in enumerate(snapshot.ids)}
+        n = len(snapshot.ids)
+
+        blocks = []
+        for rows in percentages:
+            columns = {col for _, col, _ in rows}
+            col_index = {col: j for j, col in enumerate(sorted(columns))}
+            block = np.zeros((n, len(col_index)), dtype=np.float32)
+            for exercise_id, col, pct in rows:
+                i = self.position.get(exercise_id)
+                if i is not None and pct:
+                    block[i, col_index[col]] = pct
+            blocks.append(_unit_rows(block))
+        self.matrix = _unit_rows(np.hstack(blocks)) if blocks else np.zeros((n, 0), dtype=np.float32)
+
+        equipment_ids = sorted({eq["id"] for d in snapshot.by_id.values() for eq in d["equipments"]})
+        self.equipment_col = {eq_id: j for j, eq_id in enumerate(equipment_ids)}
+        self.equipment = np.zeros((n, len(equipment_ids)), dtype=bool)
+        for exercise_id, i in self.position.items():
+            for eq in snapshot.by_id[exercise_id]["equipments"]:
+                self.equipment[i, self.equipment_col[eq["id"]]] = True
+
+    def available_mask(self, equipment_ids):
+        """Exercises needing only equipment from `equipment_ids` (or none at all)."""
+        missing = np.ones(len(self.equipment_col), dtype=bool)
+        for eq_id in equipment_ids:
+            j = self.equipment_col.get(eq_id)
+            if j is not None:
+                missing[j] = False
+        return ~self.equipment[:, missing].any(axis=1)
+
+    def similar(self, exercise_id, k, equipment_ids=None):
+        """[(exercise_id, score)] best first; None if the exercise is unknown."""
+        i = self.position.get(exercise_id)
+        if i is None:
+            return None
+        scores = self.matrix @ self.matrix[i]
+        scores[i] = -np.inf
+        if equipment_ids is not None:
+            scores[~self.available_mask(equipment_ids)] = -np.inf
+        scores[scores <= 0] = -np.inf
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        ids = self.snapshot.ids
+        return [(ids[j], float(scores[j])) for j in top if np.isfinite(scores[j])]
+
+
+def load_percentages():
+    """(exercise_id, column id, percentage) rows of each block, one query per table."""
+    return [list(db.session.execute(db.select(assoc.c.exercise_id, col, pct))) for assoc, col, pct in BLOCKS]
+
+
+def similarity_index(snapshot):
+    """SimilarityIndex for `snapshot`; reads the percentage tables only when the catalog changed."""
+    return snapshot.derived("similarity_index", lambda snap: SimilarityIndex(snap, load_percentages()))
@@ -0,0 +1,131 @@
+import math
+
+from h3.api import basic_int as h3
+
+from db import db
+from utils.timezone_utils import city_coordinates
+
+# Resolutions materialized as h3_r<N> columns on coaches/clients.
+# Average hexagon edge: r5 ~ 9.9 km, r7 ~ 1.4 km, r9 ~ 0.2 km.
+H3_RESOLUTIONS = (5, 7, 9)
+DEFAULT_RESOLUTION = 7
+MAX_K = 30
+# *near endpoints: ?limit= default / cap (nearest first)
+DEFAULT_NEAR_LIMIT = 100
+MAX_NEAR_LIMIT = 500
+
+
+def h3_column(model, resolution):
+    return getattr(model, f'h3_r{resolution}')
+
+
+def set_location(obj, lat, lng):
+    """Store coordinates and their precomputed H3 cells (or clear them all)."""
+    obj.latitude = lat
+    obj.longitude = lng
+    for res in H3_RESOLUTIONS:
+        cell = h3.latlng_to_cell(lat, lng, res) if lat is not None and lng is not None else None
+        setattr(obj, f'h3_r{res}', cell)
+
+
+def parse_lat_lng(lat, lng):
+    """Return (lat, lng) floats or raise ValueError with a user-facing message."""
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        raise ValueError("latitude and longitude must be numbers")
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        raise ValueError("latitude/longitude out of range")
+    return lat, lng
+
+
+def apply_location(obj, data, city_changed):
+    """
+    Update obj's coordinates from an incoming payload.
+    Explicit latitude/longitude win; otherwise a changed city falls back to the
+    gazetteer / resolved_cities coordinates. Returns an error string or None.
+    """
+    if data.get('latitude') not in (None, '') or data.get('longitude') not in (None, ''):
+        try:
+            lat, lng = parse_lat_lng(data.get('latitude'), data.get('longitude'))
+        except ValueError as e:
+            return str(e)
+        set_location(obj, lat, lng)
+    elif city_changed:
+        coords = city_coordinates(obj.city)
+        set_location(obj, *(coords or (None, None)))
+    return None
+
+
+def cells_near(lat, lng, k, resolution=DEFAULT_RESOLUTION):
+    """All H3 cells within k rings of the point's cell."""
+    return h3.grid_disk(h3.latlng_to_cell(lat, lng, resolution), k)
+
+
+def near_query(model, lat, lng, k, resolution=DEFAULT_RESOLUTION):
+    """Filter `model` to rows whose h3_r<resolution> cell is within k rings (index lookup, no distance math)."""
+    return model.query.filter(h3_column(model, resolution).in_(cells_near(lat, lng, k, resolution)))
+
+
+def nearest_first(query, model, lat, lng, limit):
+    """
+    Order a near_query() by distance to the point and keep `limit` rows. Ranked
+    in SQL by an equirectangular approximation (plain arithmetic, no trig
+    functions needed in the database); callers compute exact distances for
+    the rows they get.
+    """
+    dlat = model.latitude - lat
+    dlng = (model.longitude - lng) * math.cos(math.radians(lat))
+    return query.order_by(dlat * dlat + dlng * dlng, model.id).limit(limit)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 6371.0088 * 2 * math.asin(math.sqrt(a))
+
+
+def parse_near_args(args):
+    """
+    Shared parsing for ?lat=&lng= | ?city=, &k=&res=&limit= on the *near endpoints.
+    Returns (lat, lng, k, res, limit) or raises ValueError.
+    """
+    if args.get('lat') not in (None, '') or args.get('lng') not in (None, ''):
+        lat, lng = parse_lat_lng(args.get('lat'), args.get('lng'))
+    elif args.get('city'):
+        coords = city_coordinates(args['city'])
+        if not coords:
+            raise ValueError(f"Unknown city '{args['city']}' – pass lat/lng instead")
+        lat, lng = coords
+    else:
+        raise ValueError("lat & lng or city is required")
+
+    res = args.get('res', default=DEFAULT_RESOLUTION, type=int)
+    if res not in H3_RESOLUTIONS:
+        raise ValueError(f"res must be one of {', '.join(map(str, H3_RESOLUTIONS))}")
+    k = max(0, min(args.get('k', default=1, type=int), MAX_K))
+    limit = max(1, min(args.get('limit', default=DEFAULT_NEAR_LIMIT, type=int), MAX_NEAR_LIMIT))
+    return lat, lng, k, res, limit
+
+
+def backfill_locations(models):
+    """
+    Fill latitude/longitude/h3_* for rows that only have a city, one local
+    lookup and one UPDATE per distinct city. Returns the number of rows updated.
+    """
+    updated = 0
+    for model in models:
+        cities = [r[0] for r in db.session.query(model.city).filter(model.latitude.is_(None)).distinct()]
+        for city in cities:
+            coords = city_coordinates(city)
+            if not coords:
+                continue
+            lat, lng = coords
+            values = {'latitude': lat, 'longitude': lng}
+            values.update({f'h3_r{res}': h3.latlng_to_cell(lat, lng, res) for res in H3_RESOLUTIONS})
+            updated += (db.session.query(model)
+                        .filter(model.latitude.is_(None), model.city == city)
+                        .update(values, synchronize_session=False))
+        db.session.commit()
+    return updated
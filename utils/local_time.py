@@ -0,0 +1,107 @@
+import threading
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+from utils.timezone_utils import DEFAULT_TIME_ZONE
+
+# Offset tables cover these UTC years; instants outside use the first/last offset.
+TABLE_YEARS = (1970, 2070)
+DAY = 86400
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = datetime(1970, 1, 1, 0, 0, 1) - _EPOCH
+
+
+class OffsetTable:
+    """
+    UTC offsets of one IANA zone as two sorted int64 arrays: `starts` (UTC
+    seconds at which an offset takes effect) and `offsets` (seconds east of
+    UTC). Built once per zone by sampling zoneinfo daily and bisecting each
+    day where the offset changes down to the second, so converting any
+    number of instants is a single searchsorted.
+    """
+
+    def __init__(self, name):
+        try:
+            tz = ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError, TypeError):
+            name, tz = DEFAULT_TIME_ZONE, ZoneInfo(DEFAULT_TIME_ZONE)
+        self.name = name
+
+        def offset(seconds):
+            local = datetime.fromtimestamp(int(seconds), tz=timezone.utc).astimezone(tz)
+            return int(local.utcoffset().total_seconds())
+
+        first = int((datetime(TABLE_YEARS[0], 1, 1) - _EPOCH).total_seconds())
+        last = int((datetime(TABLE_YEARS[1], 1, 1) - _EPOCH).total_seconds())
+        samples = np.arange(first, last, DAY, dtype=np.int64)
+        sampled = np.array([offset(s) for s in samples], dtype=np.int64)
+
+        starts, offsets = [np.iinfo(np.int64).min], [int(sampled[0])]
+        for d in np.flatnonzero(sampled[1:] != sampled[:-1]).tolist():
+            lo, hi = int(samples[d]), int(samples[d + 1])  # offset(lo) != offset(hi)
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if offset(mid) == sampled[d]:
+                    lo = mid
+                else:
+                    hi = mid
+            starts.append(hi)
+            offsets.append(int(sampled[d + 1]))
+        self.starts = np.array(starts, dtype=np.int64)
+        self.offsets = np.array(offsets, dtype=np.int64)
+
+    def to_local(self, utc_seconds):
+        """Local wall-clock seconds for an int64 array of UTC seconds."""
+        return utc_seconds + self.offsets[np.searchsorted(self.starts, utc_seconds, side="right") - 1]
+
+
+_lock = threading.Lock()
+_tables = {}
+
+
+def offset_table(name):
+    """Cached OffsetTable for `name` (unknown names behave as UTC)."""
+    table = _tables.get(name)
+    if table is None:
+        with _lock:
+            table = _tables.get(name)
+            if table is None:
+                table = _tables[name] = OffsetTable(name)
+    return table
+
+
+def utc_seconds(values):
+    """Naive-UTC created_at values (ISO strings as SQLite returns them, or datetimes) -> int64 seconds."""
+    if not len(values):
+        return np.empty(0, dtype=np.int64)
+    if isinstance(values[0], str):
+        return np.array(values, dtype="datetime64[us]").astype("datetime64[s]").astype(np.int64)
+    return np.fromiter(((v - _EPOCH) // _SECOND for v in values), dtype=np.int64, count=len(values))
+
+
+def local_days(utc, zones):
+    """
+    Local calendar day (int64 days since 1970-01-01) of each instant in `utc`
+    (int64 UTC seconds), `zones[i]` being the IANA zone of row i. Rows are
+    converted per distinct zone with that zone's offset table.
+    """
+    zones = np.asarray(zones, dtype=object)
+    local = np.empty_like(utc)
+    names, codes = np.unique(zones, return_inverse=True)
+    for k, name in enumerate(names.tolist()):
+        mask = codes == k
+        local[mask] = offset_table(name).to_local(utc[mask])
+    return local // DAY
+
+
+def week_starts(days):
+    """Monday of the ISO week holding each day (int64 days since 1970-01-01, a Thursday)."""
+    return days - (days + 3) % 7
+
+
+def local_today(name):
+    """Today's date in zone `name`."""
+    now = int((datetime.utcnow() - _EPOCH).total_seconds())
+    return (np.datetime64(0, "D") + int(offset_table(name).to_local(np.array([now]))[0] // DAY)).item()
@@ -0,0 +1,38 @@
+import base64
+import json
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(*values) -> str:
+    """Opaque, URL-safe token for the last row's sort key."""
+    raw = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, types: tuple) -> list:
+    """Values of a cursor, one per type in `types` (int excludes bool); CursorError otherwise."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise CursorError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise CursorError("Invalid cursor")
+    for value, kind in zip(values, types):
+        if not isinstance(value, kind) or isinstance(value, bool):
+            raise CursorError("Invalid cursor")
+    return values
+
+
+def cursor_page(items, limit, key):
+    """
+    items were fetched with LIMIT limit+1: trim the probe row and build
+    {"items", "next_cursor"} (next_cursor is None on the last page).
+    """
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = encode_cursor(*key(items[-1])) if has_more and items else None
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,129 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app, has_app_context
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the hashing queue is full (or a job timed out); mapped to 503."""
+
+
+def _config(key, default):
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def password_method() -> str:
+    """werkzeug method string for new hashes, e.g. 'pbkdf2:sha256:1000000'."""
+    iterations = _config('PASSWORD_HASH_ITERATIONS', None) or DEFAULT_PBKDF2_ITERATIONS
+    return f"pbkdf2:sha256:{iterations}"
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """True if a stored hash was made with different cost parameters than password_method()."""
+    return bool(password_hash) and password_hash.split('$', 1)[0] != password_method()
+
+
+class _Pool:
+    """
+    Lazily created ProcessPoolExecutor (spawn context, re-created after fork
+    or when a worker process dies) with a bounded number of in-flight jobs.
+    When the bound is hit we raise PasswordPoolBusy immediately instead of
+    queueing behind a login burst.
+
+    Executor and bound are per process, so this only sheds load when one
+    process serves concurrent requests (threaded/async workers); see
+    PASSWORD_POOL_WORKERS in app.py. Spawned children re-import __main__:
+    a script that imports the app and registers/logs in coaches with the
+    pool enabled needs an `if __name__ == "__main__":` guard, otherwise the
+    first hash fails with multiprocessing's "bootstrapping phase" error.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._slots = None
+
+    def _ensure(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = None
+                self._slots = threading.BoundedSemaphore(_config('PASSWORD_POOL_MAX_QUEUE', 8))
+                self._pid = os.getpid()
+            if self._executor is None:
+                workers = _config('PASSWORD_POOL_WORKERS', 2)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor, self._slots
+
+    def _discard(self, executor):
+        """Drop a broken executor (a worker was killed) so the next call builds a fresh one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, fn, *args):
+        try:
+            return self._run(fn, *args)
+        except BrokenProcessPool:
+            pass
+        try:
+            return self._run(fn, *args)  # once more on a fresh executor
+        except BrokenProcessPool:
+            raise PasswordPoolBusy()
+
+    def _run(self, fn, *args):
+        executor, slots = self._ensure()
+        if not slots.acquire(blocking=False):
+            raise PasswordPoolBusy()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            slots.release()
+            self._discard(executor)
+            raise
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=_config('PASSWORD_POOL_TIMEOUT', 10.0))
+        except FutureTimeout:
+            raise PasswordPoolBusy()
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_pool = _Pool()
+
+
+def _pool_enabled():
+    return _config('PASSWORD_POOL_WORKERS', 0) > 0
+
+
+def hash_password(plain_password: str) -> str:
+    method = password_method()
+    if not _pool_enabled():
+        return generate_password_hash(plain_password, method=method)
+    return _pool.run(generate_password_hash, plain_password, method)
+
+
+def verify_password(password_hash: str, plain_password: str) -> bool:
+    if not _pool_enabled():
+        return check_password_hash(password_hash, plain_password)
+    return _pool.run(check_password_hash, password_hash, plain_password)
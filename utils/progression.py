@@ -0,0 +1,203 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from flask import current_app
+
+from db import db
+from models.client_model import Client
+from models.workout_model import Workout
+
+FORMULAS = ("epley", "brzycki")
+DEFAULT_WINDOW = 4           # sessions in the rolling average
+DEFAULT_PLATEAU_WINDOW = 6   # sessions without a new best before flagging a plateau
+DEFAULT_TOLERANCE = 0.01     # a "new best" must beat the previous one by more than 1%
+
+
+def estimate_1rm(weight, reps, rir, formula="epley"):
+    """
+    Estimated 1RM per set (NaN where it can't be estimated). Reps in reserve
+    are added to the reps done, so a set of 5 @ 2 RIR is treated as a 7RM.
+      epley:   weight * (1 + reps / 30), weight itself for a 1RM
+      brzycki: weight * 36 / (37 - reps), only below 37 reps
+    """
+    to_failure = reps + np.maximum(rir, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if formula == "brzycki":
+            est = weight * 36.0 / (37.0 - to_failure)
+            valid = to_failure < 37
+        else:
+            est = np.where(to_failure == 1, weight, weight * (1.0 + to_failure / 30.0))
+            valid = True
+    return np.where(valid & (weight > 0) & (reps > 0), est, np.nan)
+
+
+def _windows(values, group_start, size):
+    """(n, size) matrix of each value and the size-1 before it in its group, NaN-padded."""
+    i = np.arange(len(values))
+    idx = i[:, None] - np.arange(size)[None, :]
+    return np.where(idx >= group_start[:, None], values[np.maximum(idx, 0)], np.nan)
+
+
+def analyze(columns, formula="epley", window=DEFAULT_WINDOW,
+            plateau_window=DEFAULT_PLATEAU_WINDOW, tolerance=DEFAULT_TOLERANCE):
+    """
+    Progression per exercise from columnar workouts (exercise_id, day,
+    weight, reps, rir arrays ordered by exercise then time). A session is one
+    exercise on one day, scored by its best set's e1RM. Each session gets a
+    rolling mean over the last `window` sessions and a plateau flag: none of
+    the last `plateau_window` sessions beat the best before them by more
+    than `tolerance`. Everything runs as array operations over all
+    exercises at once; the result is a list of JSON-ready dicts.
+    """
+    ex, day, weight, reps, rir = columns
+    est = estimate_1rm(weight, reps, rir, formula)
+    keep = ~np.isnan(est)
+    ex, day, weight, reps, rir, est = ex[keep], day[keep], weight[keep], reps[keep], rir[keep], est[keep]
+    if not len(est):
+        return []
+
+    # sessions: best set of each (exercise, day) run
+    new_session = np.r_[True, (ex[1:] != ex[:-1]) | (day[1:] != day[:-1])]
+    session = np.cumsum(new_session) - 1
+    order = np.lexsort((est, session))
+    best = order[np.r_[session[order][1:] != session[order][:-1], True]]
+    ex, day, weight, reps, rir, est = ex[best], day[best], weight[best], reps[best], rir[best], est[best]
+
+    # exercise groups over sessions
+    new_group = np.r_[True, ex[1:] != ex[:-1]]
+    starts = np.flatnonzero(new_group)
+    group = np.cumsum(new_group) - 1
+    group_start = starts[group]
+
+    rolling = np.nanmean(_windows(est, group_start, window), axis=1)
+    recent_max = np.nanmax(_windows(est, group_start, plateau_window), axis=1)
+    # running best within each group: lift every group above all earlier ones, accumulate, undo
+    lift = group * (np.nanmax(est) + 1.0)
+    running_best = np.maximum.accumulate(est + lift) - lift
+    i = np.arange(len(est))
+    before = i - plateau_window
+    has_history = before >= group_start
+    prior_best = running_best[np.maximum(before, 0)]
+    plateau = has_history & (recent_max <= prior_best * (1.0 + tolerance))
+
+    cols = {
+        "date": day.astype(str).tolist(),
+        "e1rm": np.round(est, 1).tolist(),
+        "rolling": np.round(rolling, 1).tolist(),
+        "plateau": plateau.tolist(),
+        "weight": weight.tolist(),
+        "reps": reps.astype(int).tolist(),
+        "rir": rir.astype(int).tolist(),
+    }
+    ends = np.r_[starts[1:], len(est)].tolist()
+    best_per_group = np.round(np.maximum.reduceat(est, starts), 1).tolist()
+    out = []
+    for g, (lo, hi) in enumerate(zip(starts.tolist(), ends)):
+        series = [dict(zip(cols, row)) for row in zip(*(c[lo:hi] for c in cols.values()))]
+        last = series[-1]
+        out.append({
+            "exercise_id": int(ex[lo]),
+            "sessions": hi - lo,
+            "best_e1rm": best_per_group[g],
+            "latest_e1rm": last["e1rm"],
+            "latest_rolling": last["rolling"],
+            "plateau": last["plateau"],
+            "series": series,
+        })
+    return out
+
+
+def _days(values):
+    """created_at values -> datetime64[D]. SQLite hands back ISO strings, which NumPy parses in bulk;
+    drivers returning datetime objects go through ordinals (np.array of datetimes is ~25x slower)."""
+    if isinstance(values[0], str):
+        return np.array(values, dtype="datetime64[us]").astype("datetime64[D]")
+    ordinals = np.fromiter((v.toordinal() for v in values), dtype=np.int64, count=len(values))
+    return (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+
+
+_EPOCH_ORDINAL = np.datetime64("1970-01-01", "D").astype(object).toordinal()
+
+
+def load_columns(client_id):
+    """One SELECT of the columns analyze() needs, as NumPy arrays."""
+    # created_at as the raw driver value: skips SQLAlchemy's per-row datetime parsing on SQLite
+    created_at = db.type_coerce(Workout.created_at, db.String)
+    rows = db.session.execute(
+        db.select(Workout.exercise_id, created_at, Workout.weight, Workout.reps, Workout.rir_repetitions)
+        .where(Workout.client_id == client_id, Workout.created_at.isnot(None))
+        .order_by(Workout.exercise_id, Workout.created_at, Workout.id)
+    ).all()
+    if not rows:
+        empty = np.empty(0)
+        return (empty.astype(np.int64), empty.astype("datetime64[D]"), empty, empty, empty)
+    ex, created_at, weight, reps, rir = zip(*rows)
+    return (
+        np.array(ex, dtype=np.int64),
+        _days(created_at),
+        np.array(weight, dtype=np.float64),
+        np.array(reps, dtype=np.float64),
+        np.array(rir, dtype=np.float64),
+    )
+
+
+class ProgressionCache:
+    """
+    Per-process LRU of analyze() results keyed by (client_id, parameters).
+    Each entry remembers the client's workouts_version when it was computed;
+    a lookup reads the current version (one primary-key SELECT) and
+    recomputes when it moved, so every worker sees new, edited or deleted
+    workouts on its next request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (client_id, params) -> (version, result)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _maxsize():
+        return current_app.config.get("PROGRESSION_CACHE_SIZE", 256)
+
+    def get(self, client_id, version, params):
+        key = (client_id, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        result = analyze(load_columns(client_id), *params)
+        maxsize = self._maxsize()
+        with self._lock:
+            self._entries[key] = (version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+progression_cache = ProgressionCache()
+
+
+def client_progression(client_id, formula="epley", window=DEFAULT_WINDOW,
+                       plateau_window=DEFAULT_PLATEAU_WINDOW, tolerance=DEFAULT_TOLERANCE):
+    """analyze() for a client, memoized; None when the client doesn't exist."""
+    version = db.session.execute(
+        db.select(Client.workouts_version).where(Client.id == client_id)
+    ).scalar_one_or_none()
+    if version is None:
+        return None
+    return progression_cache.get(client_id, version, (formula, window, plateau_window, tolerance))
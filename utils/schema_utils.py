@@ -0,0 +1,46 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+
+
+def _default_sql(column):
+    arg = column.server_default.arg
+    if hasattr(arg, 'text'):
+        return arg.text
+    return "'" + str(arg).replace("'", "''") + "'"
+
+
+def add_missing_columns(engine, metadata):
+    """
+    Additive-only schema sync for databases created before a column existed.
+    db.create_all() creates missing tables but never alters existing ones, so
+    new columns (nullable or with a server_default) and missing indexes are
+    added here. Nothing is ever dropped or altered.
+    Returns the (table, column) pairs that were added, so callers can backfill.
+    """
+    insp = inspect(engine)
+    existing_tables = set(insp.get_table_names())
+    added = []
+
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            have_columns = {c['name'] for c in insp.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in have_columns:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {_default_sql(column)}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                conn.execute(text(ddl))
+                added.append((table.name, column.name))
+
+            have_indexes = {ix['name'] for ix in insp.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in have_indexes:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+
+    return added
@@ -0,0 +1,135 @@
+import json
+from datetime import date, datetime
+from functools import lru_cache
+
+from flask import current_app, request, stream_with_context
+
+from db import db
+
+try:  # optional, noticeably faster for large lists
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+# ---------- JSON ----------
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """Like jsonify(payload), status but through the fast encoder."""
+    return current_app.response_class(dumps(payload), status=status, mimetype='application/json')
+
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_ndjson() -> bool:
+    """Streaming requested via Accept: application/x-ndjson or ?stream=1."""
+    if (request.args.get('stream') or '').lower() in ('1', 'true', 'yes'):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def ndjson_response(serializer, names, stmt, chunk_rows=1000):
+    """
+    Stream `stmt` as one JSON object per line. Rows are read with yield_per
+    (a server-side cursor on Postgres), so memory stays flat regardless of
+    result size and the first bytes go out after the first chunk.
+    """
+    encode = serializer.encoder(names)
+
+    def generate():
+        result = db.session.execute(stmt.execution_options(yield_per=chunk_rows))
+        for partition in result.partitions():
+            yield b''.join(dumps(encode(row)) + b'\n' for row in partition)
+
+    return current_app.response_class(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+# ---------- compiled row encoders ----------
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+# compiled encoders kept per RowSerializer (distinct ?fields= projections)
+ENCODER_CACHE_SIZE = 128
+
+
+class FieldsError(ValueError):
+    pass
+
+
+class RowSerializer:
+    """
+    Per-model projection + encoder.
+
+    `columns` is an ordered {output_name: column expression} map; `joins`
+    maps an output name to a callable that adds the join it needs. For a
+    given field tuple, select() builds a SELECT of just those columns and
+    encoder() compiles (once, LRU-cached) a function turning a result row
+    into the output dict, so serialization is one dict literal per row.
+    """
+
+    def __init__(self, model, columns, joins=None):
+        self.model = model
+        self.columns = dict(columns)
+        self.joins = joins or {}
+        # ?fields= subsets are caller-controlled: keep a bounded number of compiled encoders
+        self._encoders = lru_cache(maxsize=ENCODER_CACHE_SIZE)(self._compile)
+
+    def parse_fields(self, raw, default, extra=()):
+        """
+        ?fields=a,b,c -> validated tuple (always includes 'id' first), in the
+        declared column order whatever order was asked for, so permutations
+        share one encoder and output keys follow the declared order.
+        Names in `extra` are accepted but are not columns (e.g. collections
+        the caller loads itself); they are returned separately, and are
+        empty when no ?fields= was given (the caller picks its default).
+        """
+        if not raw:
+            return tuple(default), ()
+        names = [n.strip() for n in raw.split(',') if n.strip()]
+        unknown = [n for n in names if n not in self.columns and n not in extra]
+        if unknown:
+            raise FieldsError(f"Unknown fields: {', '.join(unknown)}")
+        wanted = set(names) | {'id'}
+        cols = ['id'] + [n for n in self.columns if n in wanted and n != 'id']
+        return tuple(cols), tuple(n for n in dict.fromkeys(names) if n in extra)
+
+    def select(self, names):
+        stmt = db.select(*[self.columns[n].label(n) for n in names]).select_from(self.model)
+        for name in names:
+            if name in self.joins:
+                stmt = self.joins[name](stmt)
+        return stmt
+
+    def encoder(self, names):
+        return self._encoders(tuple(names))
+
+    def _compile(self, names):
+        parts = []
+        for i, name in enumerate(names):
+            col_type = getattr(self.columns[name], 'type', None)
+            python_type = None
+            try:
+                python_type = col_type.python_type if col_type is not None else None
+            except NotImplementedError:
+                pass
+            if python_type in (datetime, date):
+                parts.append(f"{name!r}: _iso(row[{i}])")
+            else:
+                parts.append(f"{name!r}: row[{i}]")
+        src = "def encode(row):\n    return {" + ", ".join(parts) + "}\n"
+        namespace = {'_iso': _iso}
+        exec(compile(src, f"<encoder {self.model.__name__}:{','.join(names)}>", 'exec'), namespace)
+        return namespace['encode']
+
+    def rows_to_dicts(self, names, rows):
+        encode = self.encoder(names)
+        return [encode(r) for r in rows]
@@ -1,15 +1,294 @@
-from geopy.geocoders import Nominatim
-from timezonefinder import TimezoneFinder
+import csv
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
 
-geolocator = Nominatim(user_agent="coach_app")
-tf = TimezoneFinder()
+from flask import current_app, has_app_context
+from sqlalchemy.exc import IntegrityError
 
-def get_time_zone_for_city(city_name: str) -> str:
+from db import db
+from models.resolved_city_model import ResolvedCity
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), "data", "cities.csv")
+DEFAULT_TIME_ZONE = 'UTC'
+
+
+# ---------- helpers ----------
+
+def normalize_city(city_name: str) -> str:
+    """Case-, accent- and whitespace-insensitive key for a city string."""
+    if not city_name:
+        return ''
+    folded = unicodedata.normalize('NFKD', city_name)
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    parts = [' '.join(p.split()) for p in folded.casefold().split(',')]
+    return ', '.join(p for p in parts if p)
+
+
+def _config(key, default=None):
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+class _LRU:
+    """Tiny thread-safe LRU mapping city_key -> time zone."""
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_lru = _LRU()
+# city_key -> monotonic expiry of a remote miss, so an unknown city doesn't hit Nominatim on every write
+_misses = _LRU()
+
+
+# ---------- gazetteer ----------
+
+class Gazetteer:
+    """
+    Offline city lookup loaded from a CSV with the columns
+    name,country,latitude,longitude,time_zone.
+    Entries are indexed by "name" and "name, country" (normalized);
+    for bare names the first row in the file wins.
+    """
+
+    def __init__(self, entries=None):
+        self._index = {}
+        for entry in entries or ():
+            self.add(entry)
+
+    def add(self, entry):
+        name_key = normalize_city(entry['name'])
+        if not name_key or not entry.get('time_zone'):
+            return
+        self._index.setdefault(name_key, entry)
+        if entry.get('country'):
+            self._index.setdefault(f"{name_key}, {normalize_city(entry['country'])}", entry)
+
+    def lookup(self, city_key: str):
+        if not city_key:
+            return None
+        hit = self._index.get(city_key)
+        if hit is None and ',' in city_key:
+            # "Madrid, Comunidad de Madrid, Spain" -> try "madrid, spain" then "madrid"
+            parts = city_key.split(', ')
+            hit = self._index.get(f"{parts[0]}, {parts[-1]}") or self._index.get(parts[0])
+        return hit
+
+    def __len__(self):
+        return len(self._index)
+
+    @classmethod
+    def from_csv(cls, path):
+        entries = []
+        with open(path, newline='', encoding='utf-8') as fh:
+            for row in csv.DictReader(fh):
+                try:
+                    lat = float(row['latitude']) if row.get('latitude') else None
+                    lng = float(row['longitude']) if row.get('longitude') else None
+                except ValueError:
+                    lat = lng = None
+                entries.append({
+                    'name': row.get('name', '').strip(),
+                    'country': (row.get('country') or '').strip(),
+                    'latitude': lat,
+                    'longitude': lng,
+                    'time_zone': (row.get('time_zone') or '').strip(),
+                })
+        return cls(entries)
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """Load the gazetteer once per process (CITY_GAZETTEER_PATH overrides the bundled file)."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                path = _config('CITY_GAZETTEER_PATH') or DEFAULT_GAZETTEER_PATH
+                try:
+                    _gazetteer = Gazetteer.from_csv(path)
+                except OSError as e:
+                    logger.warning("Could not load city gazetteer %s: %s", path, e)
+                    _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+# ---------- persistent cache ----------
+
+def _load_resolved(city_key):
+    row = (db.session.query(ResolvedCity.time_zone)
+           .filter(ResolvedCity.city_key == city_key)
+           .first())
+    return row[0] if row else None
+
+
+def _store_resolved(city_key, time_zone, latitude, longitude, source):
+    """
+    Persist on its own connection so the caller's session/transaction
+    (e.g. a create_client that later 409s) is not affected.
+    """
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(ResolvedCity.__table__.insert().values(
+                city_key=city_key,
+                time_zone=time_zone,
+                latitude=latitude,
+                longitude=longitude,
+                source=source,
+            ))
+    except IntegrityError:
+        pass  # another worker resolved the same city first
+
+
+# ---------- geocoder fallback ----------
+# geopy / timezonefinder are imported and built on first use only, so workers
+# that never geocode don't pay for the polygon data. preload_timezone_finder()
+# lets the gunicorn master load it once and share it copy-on-write.
+
+_geolocator = None
+_timezone_finder = None
+_init_lock = threading.Lock()
+
+
+def get_geolocator():
+    global _geolocator
+    if _geolocator is None:
+        with _init_lock:
+            if _geolocator is None:
+                from geopy.geocoders import Nominatim
+                _geolocator = Nominatim(user_agent="coach_app")
+    return _geolocator
+
+
+def get_timezone_finder(in_memory: bool = False):
+    global _timezone_finder
+    if _timezone_finder is None:
+        with _init_lock:
+            if _timezone_finder is None:
+                from timezonefinder import TimezoneFinder
+                _timezone_finder = TimezoneFinder(in_memory=in_memory)
+    return _timezone_finder
+
+
+def preload_timezone_finder():
+    """
+    Build the TimezoneFinder with its polygon data read into memory. Call this
+    in the gunicorn master (see gunicorn.conf.py) so forked workers inherit it.
+    """
+    finder = get_timezone_finder(in_memory=True)
+    get_geolocator()
+    return finder
+
+
+def _geocode_time_zone(city_name):
     try:
-        location = geolocator.geocode(city_name)
+        location = get_geolocator().geocode(city_name)
         if location:
-            timezone_str = tf.timezone_at(lng=location.longitude, lat=location.latitude)
-            return timezone_str if timezone_str else 'UTC'
+            timezone_str = get_timezone_finder().timezone_at(lng=location.longitude, lat=location.latitude)
+            if timezone_str:
+                return timezone_str, location.latitude, location.longitude
     except Exception as e:
-        print(f"Error finding time zone for {city_name}: {e}")
-    return 'UTC'
+        logger.warning("Nominatim lookup failed for %r: %s", city_name, e)
+    return None
+
+
+# ---------- public API ----------
+
+def resolve_city(city_name: str, allow_remote: bool = True):
+    """
+    Resolve a city to a time zone: LRU -> resolved_cities table -> gazetteer
+    -> Nominatim (only if allow_remote and TIMEZONE_GEOCODER_FALLBACK is on).
+    Returns the time zone string, or None if the city is unknown.
+    """
+    city_key = normalize_city(city_name)
+    if not city_key:
+        return None
+
+    tz = _lru.get(city_key)
+    if tz:
+        return tz
+
+    tz = _load_resolved(city_key)
+    if tz:
+        _lru.put(city_key, tz)
+        return tz
+
+    entry = get_gazetteer().lookup(city_key)
+    if entry:
+        tz = entry['time_zone']
+        _store_resolved(city_key, tz, entry['latitude'], entry['longitude'], 'gazetteer')
+        _lru.put(city_key, tz)
+        return tz
+
+    if allow_remote and _config('TIMEZONE_GEOCODER_FALLBACK', True):
+        if (_misses.get(city_key) or 0) > time.monotonic():
+            return None
+        hit = _geocode_time_zone(city_name)
+        if hit:
+            tz, lat, lng = hit
+            _store_resolved(city_key, tz, lat, lng, 'nominatim')
+            _lru.put(city_key, tz)
+            return tz
+        _misses.put(city_key, time.monotonic() + _config('TIMEZONE_MISS_TTL', 3600.0))
+
+    return None
+
+
+def get_time_zone_for_city(city_name: str) -> str:
+    tz = resolve_city(city_name)
+    if tz:
+        return tz
+    logger.warning("Could not resolve time zone for %r; defaulting to %s", city_name, DEFAULT_TIME_ZONE)
+    return DEFAULT_TIME_ZONE
+
+
+def city_coordinates(city_name: str):
+    """(latitude, longitude) for a city from local data only (resolved_cities, then gazetteer), or None."""
+    city_key = normalize_city(city_name)
+    if not city_key:
+        return None
+    row = (db.session.query(ResolvedCity.latitude, ResolvedCity.longitude)
+           .filter(ResolvedCity.city_key == city_key)
+           .first())
+    if row and row[0] is not None and row[1] is not None:
+        return row[0], row[1]
+    entry = get_gazetteer().lookup(city_key)
+    if entry and entry['latitude'] is not None and entry['longitude'] is not None:
+        return entry['latitude'], entry['longitude']
+    return None
+
+
+def clear_cache():
+    """Drop the in-process LRU and remembered misses (the resolved_cities table is left untouched)."""
+    _lru.clear()
+    _misses.clear()
@@ -0,0 +1,123 @@
+import logging
+import os
+import threading
+
+from flask import current_app
+
+from db import db
+from models.client_model import Client
+from models.coach_model import Coach
+from utils.timezone_utils import DEFAULT_TIME_ZONE, resolve_city
+
+logger = logging.getLogger(__name__)
+
+STATUS_RESOLVED = 'resolved'
+STATUS_PENDING = 'pending'
+STATUS_FAILED = 'failed'
+
+_PENDING_MODELS = (Client, Coach)
+
+
+def is_deferred(app=None) -> bool:
+    app = app or current_app
+    return app.config.get('TIMEZONE_RESOLUTION_MODE', 'sync') == 'deferred'
+
+
+def time_zone_for_write(city_name: str):
+    """
+    Time zone + status to store on a client/coach write.
+    sync mode: resolve now (may hit Nominatim); an unknown city is stored
+    as DEFAULT_TIME_ZONE with status 'failed', as the worker does.
+    deferred mode: only local lookups (LRU / DB / gazetteer) run inline;
+    anything that would need the network is stored as pending for the worker.
+    """
+    if not is_deferred():
+        tz = resolve_city(city_name)
+        if tz:
+            return tz, STATUS_RESOLVED
+        logger.warning("Could not resolve time zone for %r; storing %s", city_name, DEFAULT_TIME_ZONE)
+        return DEFAULT_TIME_ZONE, STATUS_FAILED
+
+    tz = resolve_city(city_name, allow_remote=False)
+    if tz:
+        return tz, STATUS_RESOLVED
+    return DEFAULT_TIME_ZONE, STATUS_PENDING
+
+
+def resolve_pending(batch_size: int = 100) -> int:
+    """
+    Resolve one batch of pending rows across clients and coaches.
+    Each distinct city is resolved once, then every pending row with that
+    city is updated with a single UPDATE per table. Returns the number of
+    distinct cities processed.
+    """
+    cities = set()
+    for model in _PENDING_MODELS:
+        rows = (db.session.query(model.city)
+                .filter(model.time_zone_status == STATUS_PENDING)
+                .distinct()
+                .limit(batch_size)
+                .all())
+        cities.update(r[0] for r in rows)
+
+    for city in cities:
+        tz = resolve_city(city)
+        values = {
+            'time_zone': tz or DEFAULT_TIME_ZONE,
+            'time_zone_status': STATUS_RESOLVED if tz else STATUS_FAILED,
+        }
+        for model in _PENDING_MODELS:
+            (db.session.query(model)
+             .filter(model.time_zone_status == STATUS_PENDING, model.city == city)
+             .update(values, synchronize_session=False))
+
+    db.session.commit()
+    return len(cities)
+
+
+class _Worker:
+    """
+    One daemon thread per process. Started lazily (and re-started after a
+    fork) so gunicorn --preload never leaves it running only in the master.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def notify(self, app):
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._wake = threading.Event()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, args=(app,), name='timezone-resolver', daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self, app):
+        interval = app.config.get('TIMEZONE_WORKER_INTERVAL', 5.0)
+        batch_size = app.config.get('TIMEZONE_WORKER_BATCH_SIZE', 100)
+        while True:
+            self._wake.wait(timeout=interval)
+            self._wake.clear()
+            with app.app_context():
+                try:
+                    while resolve_pending(batch_size):
+                        pass
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning("Deferred time zone resolution failed: %s", e)
+                finally:
+                    db.session.remove()
+
+
+_worker = _Worker()
+
+
+def notify_pending():
+    """Wake (or start) this process's resolver thread after a pending row was committed."""
+    _worker.notify(current_app._get_current_object())
@@ -0,0 +1,103 @@
+import math
+from bisect import bisect_left, bisect_right
+
+from db import db
+from models.load_weight_model import LoadWeight
+from utils.serializers import dumps
+
+
+class Ladder:
+    """
+    Available weights of one (load_type_id, unit), ascending. `values` is the
+    sorted float sequence bisect works on; `rows` holds the matching output
+    dicts (same shape as LoadWeight.to_dict). Never mutated once built.
+    """
+
+    def __init__(self, rows):
+        self.rows = tuple(rows)
+        self.values = tuple(r["value"] for r in self.rows)
+        self._json = None
+
+    def page(self, page, page_size):
+        start = (page - 1) * page_size
+        return self.rows[start:start + page_size]
+
+    def json(self):
+        """The whole ladder pre-serialized (exercise_weights returns it unpaginated)."""
+        if self._json is None:
+            self._json = dumps(list(self.rows))
+        return self._json
+
+    def snap(self, target):
+        """(nearest, floor, ceil) available values for `target`; floor/ceil are None off the ends."""
+        values = self.values
+        if not values:
+            return None, None, None
+        i = bisect_right(values, target)
+        floor = values[i - 1] if i else None
+        j = bisect_left(values, target)
+        ceil = values[j] if j < len(values) else None
+        if floor is None:
+            nearest = ceil
+        elif ceil is None:
+            nearest = floor
+        else:
+            nearest = floor if target - floor <= ceil - target else ceil  # ties go down
+        return nearest, floor, ceil
+
+
+EMPTY = Ladder(())
+
+
+class WeightLadders:
+    """
+    All load_weights grouped into Ladders, keyed (load_type_id, unit), plus
+    (None, unit) for every load type together. Built from one SELECT and tied
+    to a catalog snapshot: LoadWeight writes bump the catalog version
+    (utils/exercise_catalog.CATALOG_MODELS), which replaces the snapshot and
+    with it these ladders.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        grouped = {}
+        rows = db.session.execute(
+            db.select(LoadWeight.id, LoadWeight.value, LoadWeight.unit, LoadWeight.load_type_id)
+            .order_by(LoadWeight.value.asc(), LoadWeight.id.asc())
+        )
+        for id_, value, unit, load_type_id in rows:
+            d = {"id": id_, "value": value, "unit": unit, "load_type_id": load_type_id}
+            grouped.setdefault((load_type_id, unit), []).append(d)
+            grouped.setdefault((None, unit), []).append(d)
+        self._ladders = {key: Ladder(rows) for key, rows in grouped.items()}
+
+    def get(self, load_type_id, unit):
+        return self._ladders.get((load_type_id, unit), EMPTY)
+
+
+def weight_ladders(snapshot):
+    """WeightLadders for `snapshot`, reloaded only when the catalog changed."""
+    return snapshot.derived("weight_ladders", WeightLadders)
+
+
+def parse_targets(raw):
+    """
+    Targets as numbers or {"rm": 100, "rm_percentage": 75} (-> 75.0).
+    Returns (targets, errors) with errors as {index: message}.
+    """
+    targets, errors = [], {}
+    for i, item in enumerate(raw):
+        try:
+            if isinstance(item, dict):
+                target = float(item["rm"]) * float(item["rm_percentage"]) / 100.0
+            elif isinstance(item, bool):
+                raise TypeError
+            else:
+                target = float(item)
+            if not math.isfinite(target):  # nan/inf, or rm * rm_percentage overflowing
+                raise ValueError(item)
+        except (KeyError, TypeError, ValueError):
+            errors[i] = "expected a number or {rm, rm_percentage}"
+            target = None
+        targets.append(target)
+    return targets, errors
@@ -0,0 +1,133 @@
+import numpy as np
+
+from utils.workout_schedule import OPTIONAL_FIELDS, coerce_optional
+
+# Same fields and coercion as routes/workouts_routes._compute_derived, applied
+# to a whole batch at once: every column is one NumPy array.
+INT_FIELDS = (
+    "exercise_id", "client_id",
+    "rm", "rm_percentage", "max_repetitions", "rir_repetitions",
+    "cc_tempo", "iso_tempo_one", "ecc_tempo", "iso_tempo_two",
+    "reps", "sets", "exercise_time", "rom", "repetitions",
+)
+FLOAT_FIELDS = ("weight",)
+DERIVED_INT_FIELDS = ("total_tempo", "tut", "total_rest")
+DERIVED_FLOAT_FIELDS = ("density",)
+# workouts' Integer columns are 32-bit on Postgres
+INT_RANGE = (-2**31, 2**31 - 1)
+
+
+def _blank(v):
+    return v is None or v == ""
+
+
+def _column(raw, field, errors, integer=True):
+    """
+    `raw` values as float64, NaN where blank or invalid (with the row's error
+    recorded). NumPy parses the whole column in one call; only a column that
+    holds something unparsable is walked cell by cell to find the bad rows.
+    Non-finite values, fractions in integer fields and values outside the
+    Integer column range are invalid too, with the same messages as
+    _to_int/_to_float in routes/workouts_routes.py.
+    """
+    kind = "an integer" if integer else "a number"
+    cells = [np.nan if _blank(v) else v for v in raw]
+    try:
+        values = np.asarray(cells, dtype=np.float64)
+        bad = ()
+    except (TypeError, ValueError):
+        values = np.empty(len(cells), dtype=np.float64)
+        bad = []
+        for i, v in enumerate(cells):
+            try:
+                values[i] = v
+            except (TypeError, ValueError):
+                values[i] = np.nan
+                bad.append(i)
+    for i in bad:
+        errors[i].append(f"{field} must be {kind}")
+    blank = np.array([_blank(v) for v in raw], dtype=bool)
+    for i in np.flatnonzero(blank):
+        errors[i].append(f"{field} is required and must be a number")
+
+    with np.errstate(invalid="ignore"):
+        finite = np.isfinite(values)
+        wrong = ~finite | (values != np.floor(values) if integer else False)
+        out_of_range = finite & ((values < INT_RANGE[0]) | (values > INT_RANGE[1]))
+    wrong[blank] = False
+    wrong[list(bad)] = False
+    for i in np.flatnonzero(wrong):
+        errors[i].append(f"{field} must be {kind}")
+    for i in np.flatnonzero(out_of_range & ~wrong):
+        errors[i].append(f"{field} is out of range")
+    values[wrong | out_of_range] = np.nan
+    return values
+
+
+def compute_batch(rows):
+    """
+    Validate a list of workout payloads and derive their metrics column-wise.
+
+    Returns (columns, errors): `columns` maps every stored field to an array
+    with one entry per input row (`units` and the
+    optional fields stay lists); `errors[i]` lists the
+    messages for row i, empty when the row is valid.
+    """
+    errors = [[] for _ in rows]
+    not_objects = [i for i, r in enumerate(rows) if not isinstance(r, dict)]
+    rows = [r if isinstance(r, dict) else {} for r in rows]
+
+    cols = {f: _column([r.get(f) for r in rows], f, errors) for f in INT_FIELDS if f != "exercise_time"}
+    cols["exercise_time"] = _column([r.get("exercise_time", 0) for r in rows], "exercise_time", errors)
+    cols["weight"] = _column([r.get("weight") for r in rows], "weight", errors, integer=False)
+
+    cols["units"] = [r.get("units") for r in rows]
+    for i, units in enumerate(cols["units"]):
+        if not units:
+            errors[i].append("units is required")
+
+    # optional fields are few and free-form: coerced row by row, stored as plain lists
+    optional = [coerce_optional({f: r[f] for f in OPTIONAL_FIELDS if f in r}, errors[i])
+                for i, r in enumerate(rows)]
+    for f in OPTIONAL_FIELDS:
+        cols[f] = [o.get(f) for o in optional]
+
+    # total_rest: rest_per_set when given, else total_rest (default 0)
+    has_rps = np.array([not _blank(r.get("rest_per_set")) for r in rows], dtype=bool)
+    rest_errors = [[] for _ in rows]
+    rps = _column([r.get("rest_per_set") if has_rps[i] else 0 for i, r in enumerate(rows)],
+                  "rest_per_set", rest_errors)
+    total_rest = _column([0 if has_rps[i] else r.get("total_rest", 0) for i, r in enumerate(rows)],
+                         "total_rest", rest_errors)
+    for i in range(len(rows)):
+        if rest_errors[i]:
+            errors[i].append("rest_per_set must be an integer if provided" if has_rps[i]
+                             else "total_rest must be an integer")
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total_tempo = cols["cc_tempo"] + cols["iso_tempo_one"] + cols["ecc_tempo"] + cols["iso_tempo_two"]
+        tut = total_tempo * cols["reps"] * cols["sets"]
+        total_rest = np.where(has_rps, np.maximum(0, cols["sets"] - 1) * rps, total_rest)
+        denom = tut + total_rest
+        volume = cols["weight"] * cols["reps"] * cols["sets"]
+        density = np.where(denom > 0, np.round(volume / np.where(denom > 0, denom, 1), 2), 0.0)
+
+    cols.update(total_tempo=total_tempo, tut=tut, total_rest=total_rest, density=density)
+    for f in DERIVED_INT_FIELDS:
+        for i in np.flatnonzero((cols[f] < INT_RANGE[0]) | (cols[f] > INT_RANGE[1])):
+            errors[i].append(f"{f} is out of range")
+    for i in not_objects:
+        errors[i] = ["must be a JSON object"]
+    return cols, errors
+
+
+def insert_rows(cols, indexes):
+    """Insert parameter dicts for the rows at `indexes`, as plain Python numbers."""
+    indexes = np.asarray(indexes, dtype=np.intp)
+    names = INT_FIELDS + DERIVED_INT_FIELDS + FLOAT_FIELDS + DERIVED_FLOAT_FIELDS
+    values = [cols[f][indexes].astype(np.int64).tolist() for f in INT_FIELDS + DERIVED_INT_FIELDS]
+    values += [cols[f][indexes].tolist() for f in FLOAT_FIELDS + DERIVED_FLOAT_FIELDS]
+    for f in ("units",) + OPTIONAL_FIELDS:
+        values.append([cols[f][i] for i in indexes.tolist()])
+    names += ("units",) + OPTIONAL_FIELDS
+    return [dict(zip(names, row)) for row in zip(*values)]
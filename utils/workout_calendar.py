@@ -0,0 +1,153 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from flask import current_app
+
+from db import db
+from models.client_model import Client
+from models.workout_model import Workout
+from utils.local_time import local_days, utc_seconds, week_starts
+
+PERIODS = ("day", "week")
+BUCKETING_STRATEGIES = ("sql", "offsets")
+# backends that can convert created_at to each client's zone inside the query
+SQL_TZ_DIALECTS = ("postgresql",)
+DEFAULT_DAYS = 28
+MAX_RANGE_DAYS = 400
+# no zone is further than this from UTC: the UTC prefilter on created_at is widened by it
+MAX_ZONE_OFFSET = timedelta(hours=14)
+# from/to bounds: the UTC window (+-14 h, +1 day) stays inside datetime's range
+DATE_RANGE = (date(1970, 1, 1), date(9998, 12, 31))
+_EPOCH_DAY = date(1970, 1, 1)
+
+
+class CalendarError(ValueError):
+    """Invalid ?from=/?to=/?period= on a calendar endpoint (-> 400)."""
+
+
+def parse_range(args, default_end):
+    """(start, end, period) from ?from=YYYY-MM-DD&to=YYYY-MM-DD&period=day|week; local dates, inclusive."""
+    period = args.get("period", "day")
+    if period not in PERIODS:
+        raise CalendarError(f"period must be one of: {', '.join(PERIODS)}")
+    try:
+        end = date.fromisoformat(args["to"]) if args.get("to") else default_end
+        start = date.fromisoformat(args["from"]) if args.get("from") else end - timedelta(days=DEFAULT_DAYS - 1)
+    except ValueError:
+        raise CalendarError("from/to must be dates (YYYY-MM-DD)")
+    except OverflowError:
+        start = date.min
+    if not (DATE_RANGE[0] <= start and end <= DATE_RANGE[1]):
+        raise CalendarError(f"from/to must be between {DATE_RANGE[0]} and {DATE_RANGE[1]}")
+    if start > end:
+        raise CalendarError("from must not be after to")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise CalendarError(f"At most {MAX_RANGE_DAYS} days per call")
+    return start, end, period
+
+
+def bucketing_strategy():
+    strategy = current_app.config.get("CALENDAR_BUCKETING", "auto")
+    if strategy in BUCKETING_STRATEGIES:
+        return strategy
+    return "sql" if db.engine.dialect.name in SQL_TZ_DIALECTS else "offsets"
+
+
+def _totals(bucket, workouts, volume, tut, total_rest, density_sum):
+    return {
+        "date": bucket.isoformat(),
+        "workouts": int(workouts),
+        "volume": round(float(volume), 2),
+        "tut": int(tut),
+        "total_rest": int(total_rest),
+        "density": round(float(density_sum) / workouts, 2) if workouts else 0.0,
+    }
+
+
+def _utc_window(start, end):
+    lo = datetime.combine(start, datetime.min.time()) - MAX_ZONE_OFFSET
+    hi = datetime.combine(end + timedelta(days=1), datetime.min.time()) + MAX_ZONE_OFFSET
+    return (Workout.created_at >= lo) & (Workout.created_at < hi)
+
+
+def _calendar_sql(client_ids, start, end, period):
+    """Postgres: created_at (naive UTC) -> client's wall clock -> date, grouped in the query."""
+    local = db.func.timezone(Client.time_zone, db.func.timezone("UTC", Workout.created_at))
+    local_day = db.cast(local, db.Date)
+    bucket = db.cast(db.func.date_trunc(period, local), db.Date)
+    q = (db.select(Workout.client_id, Client.time_zone, bucket,
+                   db.func.count(), db.func.sum(Workout.weight * Workout.reps * Workout.sets),
+                   db.func.sum(Workout.tut), db.func.sum(Workout.total_rest), db.func.sum(Workout.density))
+         .join(Client, Client.id == Workout.client_id)
+         .where(Workout.client_id.in_(client_ids), _utc_window(start, end), local_day.between(start, end))
+         .group_by(Workout.client_id, Client.time_zone, bucket)
+         .order_by(Workout.client_id, bucket))
+    out = {}
+    for client_id, time_zone, *totals in db.session.execute(q):
+        out.setdefault(client_id, {"time_zone": time_zone, "items": []})["items"].append(
+            _totals(*totals))
+    return out
+
+
+def _calendar_offsets(client_ids, start, end, period):
+    """
+    Any backend: fetch the window's rows as columns, convert every instant
+    with its zone's offset table (utils/local_time.py) and aggregate with
+    np.unique/bincount. No per-row time zone conversion in Python.
+    """
+    rows = db.session.execute(
+        db.select(Workout.client_id, Client.time_zone, db.type_coerce(Workout.created_at, db.String),
+                  Workout.weight, Workout.reps, Workout.sets, Workout.tut, Workout.total_rest, Workout.density)
+        .join(Client, Client.id == Workout.client_id)
+        .where(Workout.client_id.in_(client_ids), _utc_window(start, end))
+    ).all()
+    if not rows:
+        return {}
+    client, zones, created_at, weight, reps, sets, tut, total_rest, density = zip(*rows)
+    client = np.array(client, dtype=np.int64)
+    days = local_days(utc_seconds(created_at), zones)
+    keep = (days >= (start - _EPOCH_DAY).days) & (days <= (end - _EPOCH_DAY).days)
+    buckets = days if period == "day" else week_starts(days)
+
+    # key = client id and bucket packed in one int64; buckets are counted from the
+    # Monday before `start` so they stay small and non-negative
+    base = int(week_starts(np.int64((start - _EPOCH_DAY).days)))
+    keys, inverse = np.unique((client[keep] << 20) + (buckets[keep] - base), return_inverse=True)
+    weight, reps, sets = (np.array(c, dtype=np.float64)[keep] for c in (weight, reps, sets))
+    sums = [np.bincount(inverse, minlength=len(keys))]
+    for values in (weight * reps * sets, np.array(tut, dtype=np.float64)[keep],
+                   np.array(total_rest, dtype=np.float64)[keep], np.array(density, dtype=np.float64)[keep]):
+        sums.append(np.bincount(inverse, weights=values, minlength=len(keys)))
+
+    # rows out, still column-wise: one tolist() per field instead of per-bucket rounding/formatting
+    workouts, volume, tut, total_rest, density_sum = sums
+    columns = {
+        "date": (np.datetime64(base, "D") + (keys & 0xFFFFF)).astype(str).tolist(),
+        "workouts": workouts.tolist(),
+        "volume": np.round(volume, 2).tolist(),
+        "tut": tut.astype(np.int64).tolist(),
+        "total_rest": total_rest.astype(np.int64).tolist(),
+        "density": np.round(density_sum / np.maximum(workouts, 1), 2).tolist(),
+    }
+    zone_of = dict(zip(client.tolist(), zones))
+    out = {}
+    for client_id, item in zip((keys >> 20).tolist(), zip(*columns.values())):
+        entry = out.get(client_id)
+        if entry is None:
+            entry = out[client_id] = {"time_zone": zone_of[client_id], "items": []}
+        entry["items"].append(dict(zip(columns, item)))
+    return out
+
+
+def calendar(client_ids, start, end, period="day", strategy=None):
+    """
+    Workout totals per client and local day/week (Monday) between the local
+    dates `start` and `end` (inclusive), each client bucketed in its own
+    `time_zone`. `client_ids` may be a list or a subquery. Returns
+    {client_id: {"time_zone", "items": [{"date", "workouts", "volume",
+    "tut", "total_rest", "density"}, ...]}} for clients with workouts.
+    """
+    strategy = strategy or bucketing_strategy()
+    if strategy == "sql":
+        return _calendar_sql(client_ids, start, end, period)
+    return _calendar_offsets(client_ids, start, end, period)
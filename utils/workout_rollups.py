@@ -0,0 +1,181 @@
+from datetime import timedelta
+
+from db import db
+from models.workout_model import Workout
+from models.workout_rollup_model import WorkoutRollup
+
+PERIODS = ("day", "week")
+KEY = ("client_id", "period", "period_start", "exercise_id")
+METRICS = ("workouts", "volume", "tut", "total_rest", "density_sum")
+# workout columns a rollup row is derived from
+SOURCE_FIELDS = ("client_id", "exercise_id", "created_at", "weight", "reps", "sets", "tut", "total_rest", "density")
+
+
+def period_start(day, period):
+    """First day of the UTC day/ISO week (Monday) holding `day`."""
+    return day if period == "day" else day - timedelta(days=day.weekday())
+
+
+def source(w):
+    """The SOURCE_FIELDS of a Workout (or any object with those attributes) as a dict."""
+    return {f: getattr(w, f) for f in SOURCE_FIELDS}
+
+
+def _accumulate(acc, row, sign):
+    created_at = row["created_at"]
+    if created_at is None:
+        return
+    day = created_at.date()
+    weight, reps, sets = row["weight"] or 0, row["reps"] or 0, row["sets"] or 0
+    deltas = (sign, sign * weight * reps * sets, sign * (row["tut"] or 0),
+              sign * (row["total_rest"] or 0), sign * (row["density"] or 0.0))
+    for period in PERIODS:
+        key = (row["client_id"], period, period_start(day, period), row["exercise_id"])
+        cur = acc.get(key)
+        acc[key] = deltas if cur is None else tuple(a + b for a, b in zip(cur, deltas))
+
+
+def _upsert_statement():
+    table = WorkoutRollup.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c[k] for k in KEY],
+        set_={m: table.c[m] + stmt.excluded[m] for m in METRICS},
+    )
+
+
+def apply(removed=(), added=()):
+    """
+    Move the rollups by the workouts in `removed` (subtracted) and `added`
+    (dicts with SOURCE_FIELDS) inside the caller's transaction: one
+    executemany upsert for every touched (client, period, start, exercise)
+    key, then a DELETE of keys left without workouts.
+    """
+    acc = {}
+    for row in removed:
+        _accumulate(acc, row, -1)
+    for row in added:
+        _accumulate(acc, row, +1)
+    params = [dict(zip(KEY, key), **dict(zip(METRICS, deltas)))
+              for key, deltas in acc.items() if any(deltas)]
+    if not params:
+        return
+    stmt = _upsert_statement()
+    if stmt is not None:
+        db.session.execute(stmt, params)
+    else:
+        _update_or_insert(params)
+    if removed:
+        table = WorkoutRollup.__table__
+        clients = {p["client_id"] for p in params}
+        db.session.execute(table.delete().where(table.c.client_id.in_(clients), table.c.workouts <= 0))
+
+
+def _update_or_insert(params):
+    """Portable upsert for dialects without ON CONFLICT: UPDATE, INSERT when nothing matched."""
+    table = WorkoutRollup.__table__
+    update = (table.update()
+              .where(*(table.c[k] == db.bindparam(f"k_{k}") for k in KEY))
+              .values({m: table.c[m] + db.bindparam(f"d_{m}") for m in METRICS}))
+    for p in params:
+        bound = {f"k_{k}": p[k] for k in KEY}
+        bound.update({f"d_{m}": p[m] for m in METRICS})
+        if db.session.execute(update, bound).rowcount == 0:
+            db.session.execute(table.insert(), p)
+
+
+def rebuild(batch=20000):
+    """Recompute every rollup from the workouts table (caller commits); returns rows written."""
+    table = WorkoutRollup.__table__
+    acc = {}
+    rows = db.session.execute(
+        db.select(*(getattr(Workout, f) for f in SOURCE_FIELDS)).execution_options(yield_per=batch)
+    ).mappings()
+    for row in rows:
+        _accumulate(acc, row, +1)
+    db.session.execute(table.delete())
+    params = [dict(zip(KEY, key), **dict(zip(METRICS, deltas))) for key, deltas in acc.items()]
+    for i in range(0, len(params), batch):
+        db.session.execute(table.insert(), params[i:i + batch])
+    return len(params)
+
+
+def ensure():
+    """Fill the rollups once when the table is new (empty) but workouts already exist."""
+    has_rollups = db.session.execute(db.select(WorkoutRollup.client_id).limit(1)).first()
+    if has_rollups is None and db.session.execute(db.select(Workout.id).limit(1)).first() is not None:
+        rebuild()
+        db.session.commit()
+
+
+def series(client_id, period, exercise_id=None, start=None, end=None, by_exercise=False):
+    """
+    Rollup rows of one client for charts, oldest first: summed over exercises
+    unless `exercise_id` is given or `by_exercise` is set. Reads only
+    workout_rollups (primary key prefix client_id, period, period_start).
+    """
+    t = WorkoutRollup
+    group = [t.period_start] + ([t.exercise_id] if by_exercise else [])
+    q = (db.select(*group, *(db.func.sum(getattr(t, m)) for m in METRICS))
+         .where(t.client_id == client_id, t.period == period)
+         .group_by(*group)
+         .order_by(*group))
+    if exercise_id is not None:
+        q = q.where(t.exercise_id == exercise_id)
+    if start is not None:
+        q = q.where(t.period_start >= period_start(start, period))
+    if end is not None:
+        q = q.where(t.period_start <= end)
+    items = []
+    for row in db.session.execute(q):
+        workouts, volume, tut, total_rest, density_sum = row[len(group):]
+        d = {"period_start": row[0].isoformat()}
+        if by_exercise:
+            d["exercise_id"] = row[1]
+        d.update({
+            "workouts": workouts,
+            "volume": round(volume, 2),
+            "tut": tut,
+            "total_rest": total_rest,
+            "density": round(density_sum / workouts, 2) if workouts else 0.0,
+        })
+        items.append(d)
+    return items
+
+
+def window_totals(client_ids, today, windows=(7, 28)):
+    """
+    {client_id: {"workouts_<n>d", "volume_<n>d", "density_<n>d", ...}} over the
+    last n UTC days (today included) for every n in `windows`, from the daily
+    rollups in one grouped query. `client_ids` may be a list or a subquery.
+    """
+    t = WorkoutRollup
+    cols = []
+    for n in windows:
+        recent = t.period_start >= today - timedelta(days=n - 1)
+        cols += [
+            db.func.sum(db.case((recent, t.workouts), else_=0)),
+            db.func.sum(db.case((recent, t.volume), else_=0.0)),
+            db.func.sum(db.case((recent, t.density_sum), else_=0.0)),
+        ]
+    q = (db.select(t.client_id, *cols)
+         .where(t.client_id.in_(client_ids), t.period == "day",
+                t.period_start >= today - timedelta(days=max(windows) - 1))
+         .group_by(t.client_id))
+    out = {}
+    for client_id, *sums in db.session.execute(q):
+        d = {}
+        for k, n in enumerate(windows):
+            workouts, volume, density_sum = sums[3 * k:3 * k + 3]
+            d[f"workouts_{n}d"] = workouts
+            d[f"volume_{n}d"] = round(volume, 2)
+            d[f"density_{n}d"] = round(density_sum / workouts, 2) if workouts else 0.0
+        out[client_id] = d
+    return out
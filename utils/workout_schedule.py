@@ -0,0 +1,94 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+# Optional workout fields accepted on create/update/batch, stored as nullable columns.
+OPTIONAL_FIELDS = ("scheduled_for", "notes", "duration_sec", "rpe")
+RPE_RANGE = (0.0, 10.0)
+MAX_DURATION_SEC = 2**31 - 1  # Integer column
+DEFAULT_DAYS = 7
+MAX_RANGE_DAYS = 400
+
+
+class ScheduleError(ValueError):
+    """Invalid ?from=/?to= on /workouts/schedule (-> 400)."""
+
+
+def parse_datetime(value):
+    """ISO date or datetime -> naive UTC datetime (aware values are converted, naive ones taken as UTC)."""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00") if value.endswith("Z") else value)
+    else:
+        raise ValueError(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def coerce_optional(data, errors):
+    """
+    Coerce the OPTIONAL_FIELDS present in `data` in place (null clears a
+    field); record one message per invalid field in `errors`.
+    """
+    if data.get("scheduled_for") not in (None, ""):
+        try:
+            data["scheduled_for"] = parse_datetime(data["scheduled_for"])
+        except (TypeError, ValueError, OverflowError):
+            errors.append("scheduled_for must be an ISO 8601 date or datetime")
+    elif "scheduled_for" in data:
+        data["scheduled_for"] = None
+
+    if data.get("notes") is not None and not isinstance(data["notes"], str):
+        errors.append("notes must be a string")
+
+    if data.get("duration_sec") not in (None, ""):
+        value = data["duration_sec"]
+        try:
+            if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+                raise ValueError(value)
+            data["duration_sec"] = int(value)
+            if not 0 <= data["duration_sec"] <= MAX_DURATION_SEC:
+                errors.append(f"duration_sec must be between 0 and {MAX_DURATION_SEC}")
+        except (TypeError, ValueError, OverflowError):
+            errors.append("duration_sec must be an integer")
+    elif "duration_sec" in data:
+        data["duration_sec"] = None
+
+    if data.get("rpe") not in (None, ""):
+        try:
+            data["rpe"] = float(data["rpe"])
+            if not RPE_RANGE[0] <= data["rpe"] <= RPE_RANGE[1]:
+                errors.append(f"rpe must be between {RPE_RANGE[0]:g} and {RPE_RANGE[1]:g}")
+        except (TypeError, ValueError):
+            errors.append("rpe must be a number")
+    elif "rpe" in data:
+        data["rpe"] = None
+    return data
+
+
+def _bound(value, end):
+    """A ?from=/?to= value: a date means its whole (UTC) day, so an end date is inclusive."""
+    if len(value) == 10:
+        day = date.fromisoformat(value)
+        return datetime.combine(day + timedelta(days=1) if end else day, time.min)
+    return parse_datetime(value)
+
+
+def parse_window(args, now=None):
+    """
+    [lo, hi) in naive UTC from ?from=&to= (ISO dates or datetimes). Defaults
+    to the DEFAULT_DAYS days starting today (UTC).
+    """
+    try:
+        lo = _bound(args["from"], end=False) if args.get("from") else datetime.combine(
+            (now or datetime.utcnow()).date(), time.min)
+        hi = _bound(args["to"], end=True) if args.get("to") else lo + timedelta(days=DEFAULT_DAYS)
+    except ValueError:
+        raise ScheduleError("from/to must be ISO 8601 dates or datetimes")
+    except OverflowError:
+        raise ScheduleError("from/to out of range")
+    if lo >= hi:
+        raise ScheduleError("from must be before to")
+    if hi - lo > timedelta(days=MAX_RANGE_DAYS):
+        raise ScheduleError(f"At most {MAX_RANGE_DAYS} days per call")
+    return lo, hi